@@ -30,6 +30,7 @@
 from machine import Pin, SPI
 import framebuf
 import utime
+from epd_mode import ControllerState, FULL, FAST, GRAY4
 
 # Display resolution
 EPD_WIDTH       = 400
@@ -107,6 +108,9 @@ class EPD_4in2:
         self.buffer_4Gray = bytearray(self.height * self.width // 4)
         self.image1Gray = framebuf.FrameBuffer(self.buffer_1Gray, self.width, self.height, framebuf.MONO_HLSB)
         self.image4Gray = framebuf.FrameBuffer(self.buffer_4Gray, self.width, self.height, framebuf.GS2_HMSB)
+
+        # Mode the controller is set up for, to skip redundant inits
+        self.state = ControllerState()
         
         self.EPD_4IN2_V2_Init()
         self.EPD_4IN2_V2_Clear()
@@ -129,6 +133,7 @@ class EPD_4in2:
 
     # Hardware reset
     def reset(self):
+        self.state.reset()
         self.digital_write(self.reset_pin, 1)
         self.delay_ms(20) 
         self.digital_write(self.reset_pin, 0)
@@ -193,7 +198,11 @@ class EPD_4in2:
         self.send_command(0x20) #Activate Display Update Sequence
         self.ReadBusy()
             
-    def EPD_4IN2_V2_Init(self):
+    def EPD_4IN2_V2_Init(self, force=False):
+        # Already set up (force=True resets anyway)
+        if not force and not self.state.need_init(FULL):
+            return
+
         # EPD hardware init start
         self.reset()
         self.ReadBusy()
@@ -228,8 +237,14 @@ class EPD_4in2:
         self.send_data(0x00)
         self.send_data(0x00)  
         self.ReadBusy()
+        self.state.initialised(FULL)
+
+    def EPD_4IN2_V2_Init_Fast(self, mode, force=False):
+        # Already set up for this speed - no reset, temperature load or
+        # BUSY waits (force=True resets anyway)
+        if not force and not self.state.need_init(FAST, mode):
+            return
 
-    def EPD_4IN2_V2_Init_Fast(self, mode):
         self.reset()
         self.ReadBusy()
 
@@ -275,6 +290,7 @@ class EPD_4in2:
         self.send_data(0x00)
         self.send_data(0x00)  
         self.ReadBusy()
+        self.state.initialised(FAST, mode)
 
     def Lut(self):
         self.send_command(0x32)
@@ -295,7 +311,11 @@ class EPD_4in2:
         self.send_command(0x2c)
         self.send_data(self.LUT_ALL[232])
         
-    def EPD_4IN2_V2_Init_4Gray(self):
+    def EPD_4IN2_V2_Init_4Gray(self, force=False):
+        # Gray LUT already loaded (force=True resets anyway)
+        if not force and not self.state.need_init(GRAY4):
+            return
+
         # EPD hardware init start
         self.reset()
         self.ReadBusy()
@@ -338,8 +358,32 @@ class EPD_4in2:
         self.send_data(0x00)
         self.send_data(0x00)  
         self.ReadBusy()
-            
+        self.state.initialised(GRAY4)
+
+    def leave_partial(self):
+        # A partial update replaced the black/white update control and
+        # border registers - put them back before a full-frame refresh
+        if self.state.leave_partial():
+            self.send_command(0x21)  # Display update control
+            self.send_data(0x40)
+            self.send_data(0x00)
+
+            self.send_command(0x3C)  # BorderWavefrom
+            self.send_data(0x05)
+
+            # The partial update loaded its own LUT, and 0xC7 loads none -
+            # load the fast temperature and LUT again
+            mode, speed = self.state.base
+            if mode == FAST:
+                self.send_command(0x1A)
+                self.send_data(0x6E if speed == self.Seconds_1_5S else 0x5A)
+                self.send_command(0x22)  # Load temperature value
+                self.send_data(0x91)
+                self.send_command(0x20)
+                self.ReadBusy()
+
     def EPD_4IN2_V2_Clear(self):
+        self.leave_partial()
         high = self.height
         if( self.width % 8 == 0) :
             wide =  self.width // 8
@@ -357,6 +401,7 @@ class EPD_4in2:
         self.TurnOnDisplay()
         
     def EPD_4IN2_V2_Display(self,Image):                
+        self.leave_partial()
         self.send_command(0x24)
         self.send_data1(Image)
 
@@ -366,6 +411,7 @@ class EPD_4in2:
         self.TurnOnDisplay()
 
     def EPD_4IN2_V2_Display_Fast(self, image):
+        self.leave_partial()
         self.send_command(0x24)
         self.send_data1(image)
 
@@ -374,36 +420,49 @@ class EPD_4in2:
 
         self.TurnOnDisplay_Fast()
         
-    def EPD_4IN2_V2_PartialDisplay(self, Image):
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x80)
-
-        self.send_command(0x21)  # Display update control
-        self.send_data(0x00)
-        self.send_data(0x00)
-
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x80)
-
+    def SetRows(self, y_start, y_end):
+        # RAM window over full-width rows y_start..y_end (inclusive), cursor
+        # at its top left
         self.send_command(0x44) 
         self.send_data(0x00)
         self.send_data(0x31)  
         
         self.send_command(0x45) 
-        self.send_data(0x00)
-        self.send_data(0x00)  
-        self.send_data(0x2B)
-        self.send_data(0x01)
+        self.send_data(y_start & 0xFF)
+        self.send_data(y_start >> 8)  
+        self.send_data(y_end & 0xFF)
+        self.send_data(y_end >> 8)
 
         self.send_command(0x4E) 
         self.send_data(0x00)
 
         self.send_command(0x4F) 
+        self.send_data(y_start & 0xFF)
+        self.send_data(y_start >> 8) 
+
+    def EPD_4IN2_V2_PartialDisplay(self, Image, y=0, h=None):
+        # Only rows y..y+h-1 of Image are written to RAM (default: all);
+        # the rest of the RAM still holds the last frame
+        if h is None:
+            h = self.height - y
+        self.send_command(0x3C)  # BorderWavefrom
+        self.send_data(0x80)
+
+        self.send_command(0x21)  # Display update control
         self.send_data(0x00)
-        self.send_data(0x00) 
+        self.send_data(0x00)
+
+        self.send_command(0x3C)  # BorderWavefrom
+        self.send_data(0x80)
+        self.state.partial()
+
+        self.SetRows(y, y + h - 1)
 
+        stride = self.width // 8
         self.send_command(0x24) # WRITE_RAM
-        self.send_data1(Image)  
+        self.send_data1(memoryview(Image)[y * stride:(y + h) * stride])
+        if h != self.height:
+            self.SetRows(0, self.height - 1)  # Full-frame writes expect it
         self.TurnOnDisplay_Partial()
 
         
@@ -480,6 +539,7 @@ class EPD_4in2:
     def Sleep(self):
         self.send_command(0x10)  # DEEP_SLEEP
         self.send_data(0x01)
+        self.state.sleep()  # Only a reset (the next init) wakes it
     
 
 
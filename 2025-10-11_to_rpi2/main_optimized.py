@@ -6,6 +6,11 @@ import time, utime, os, uos, esp32, machine, sys, _thread, queue   # ← NEW
 from machine import Pin, SPI, lightsleep, SoftSPI, I2C
 from display42 import EPD_4in2
 from tca8418 import TCA8418
+from text_buffer import GapBuffer
+from page_store import PageStore
+from row_renderer import RowRenderer
+import panel_image
+from refresh_scheduler import RefreshScheduler, PARTIAL, FULL
 from wifi_transfer import send_file_to_server
 from todoist_upload import upload_to_todoist
 
@@ -47,6 +52,8 @@ POWER_BTN = Pin(0, Pin.IN, Pin.PULL_UP)
 epd         = None
 keyboard    = None
 max_w = max_h = 0
+row_renderer = None   # RowRenderer: redraws only the changed text rows
+refresh_scheduler = None  # RefreshScheduler: partial or fast full refresh
 
 # --- async display globals (NEW) ---
 display_queue           = queue.Queue(maxsize=10)
@@ -55,8 +62,8 @@ display_lock            = _thread.allocate_lock()
 # ----------------------------------
 
 # Text buffer - stores pure text without positioning
-text_buffer   = []   # list of characters incl. newlines
-cursor_index  = 0    # logical cursor position
+text_buffer   = GapBuffer()   # UTF-8 gap buffer incl. newlines
+cursor_index  = 0    # cursor as a byte offset into text_buffer
 
 # Page tracking
 current_page_index    = 0
@@ -65,11 +72,15 @@ current_subpage_index = 0
 # File paths
 STORAGE_BASE = "saved_files"
 ACTIVE_FILE  = ""
+page_store   = None   # PageStore for ACTIVE_FILE (see active_pages())
 
 # System files
 CURSOR_FILE     = "cursor_position.txt"
 SCREEN_BUFFER   = "screen_buffer.txt"
 ERROR_LOG       = "error_log.txt"
+# Precompiled panel images (make_panel_image.py); drawn at runtime if absent
+SPLASH_FILE     = "splash.bin"
+SCREENSAVER_FILE= "linson.bin"
 
 # State flags
 display_dirty   = True
@@ -118,9 +129,9 @@ def display_worker_thread():
 
             with display_lock:
                 if upd.update_type == 'partial':
-                    epd.EPD_4IN2_V2_PartialDisplay(epd.buffer_1Gray)
+                    scheduled_refresh(upd.region)
                 elif upd.update_type == 'full':
-                    epd.EPD_4IN2_V2_Display_Fast(epd.buffer_1Gray)
+                    full_refresh()
 
             last_update = utime.ticks_ms()
 
@@ -141,10 +152,16 @@ def stop_display_thread():
     time.sleep_ms(200)
 
 def request_display_update(update_type='partial', priority=0, region=None):
+    """Queue a display update; False if the queue was full"""
     try:
         display_queue.put(DisplayUpdate(update_type, priority, region), block=False)
+        return True
     except:
-        pass
+        # The dropped rows are already marked drawn - redraw them all on
+        # the next refresh so they don't stay stale on the panel
+        if row_renderer:
+            row_renderer.forget()
+        return False
 
 
 #───────────────────────────────────────────────#
@@ -217,7 +234,7 @@ def save_screen_buffer():
     """Save current screen content to buffer file"""
     try:
         with open(SCREEN_BUFFER, "w") as f:
-            f.write(''.join(text_buffer))
+            f.write(text_buffer.text())
     except Exception as e:
         log_exception(e, "save_screen_buffer")
 
@@ -248,14 +265,20 @@ class TextLayout:
         return word_start, word_end
     
     @staticmethod
-    def calculate_lines(text, max_width):
-        """Calculate line breaks with word wrapping"""
+    def calculate_lines(text, max_width, max_lines=None):
+        """Calculate line breaks with word wrapping
+
+        Stops early once max_lines lines are complete (if given).
+        """
         lines = []
         current_line = []
         current_x = MARGIN_LEFT
         i = 0
         
         while i < len(text):
+            if max_lines is not None and len(lines) >= max_lines:
+                return lines
+
             if text[i] == '\n':
                 lines.append(current_line[:])
                 current_line = []
@@ -329,6 +352,24 @@ class TextLayout:
         
         return pages if pages else [[]]
 
+    @staticmethod
+    def get_screen_page(text, max_width, max_height, page_num=0):
+        """Lay out only up to one screen page and return its characters
+
+        Same result as get_screen_pages(...)[page_num] (or [] past the
+        end), but wrapping stops once that screen is filled.
+        """
+        lines_per_page = max(1, (max_height - MARGIN_TOP) // CHAR_HEIGHT)
+        first = page_num * lines_per_page
+        lines = TextLayout.calculate_lines(text, max_width, first + lines_per_page)
+
+        page = []
+        current_y = MARGIN_TOP
+        for line in lines[first:first + lines_per_page]:
+            page.extend([(x, current_y, ch) for x, ch in line])
+            current_y += CHAR_HEIGHT
+        return page
+
     @staticmethod
     def get_cursor_screen_pos(text, cursor_index, max_width, max_height):
         """Convert cursor index to screen position"""
@@ -427,6 +468,8 @@ class PageManager:
 
 def clear_display_buffer():
     epd.image1Gray.fill(0xFF)
+    if row_renderer:
+        row_renderer.forget()
 
 def render_text_page(page_chars):
     clear_display_buffer()
@@ -437,22 +480,28 @@ def render_text_page(page_chars):
 def render_cursor(x, y):
     epd.image1Gray.fill_rect(x, y + CHAR_HEIGHT - 2, CHAR_WIDTH, 2, epd.black)
 
+def cursor_char_index(current_text):
+    """
+    cursor_index as an index into current_text
+
+    The gap buffer counts UTF-8 bytes and TextLayout counts characters;
+    they only differ once the note holds non-ASCII text.
+    """
+    if len(current_text) == len(text_buffer):
+        return cursor_index
+    return len(text_buffer.text(0, cursor_index))
+
 def refresh_display():
     """Draw into buffer, then queue async refresh."""
     global display_dirty
-    current_text = ''.join(text_buffer)
-    pages = TextLayout.get_screen_pages(current_text, max_w, max_h)
+    current_text = text_buffer.text()
+    render_text_page(TextLayout.get_screen_page(current_text, max_w, max_h, 0))
 
-    if pages:
-        render_text_page(pages[0])
-    else:
-        clear_display_buffer()
-
-    cx, cy, _ = TextLayout.get_cursor_screen_pos(current_text, cursor_index, max_w, max_h)
+    cx, cy, _ = TextLayout.get_cursor_screen_pos(current_text, cursor_char_index(current_text),
+                                                 max_w, max_h)
     render_cursor(cx, cy)
 
-    request_display_update('partial')      # ← async call
-    display_dirty = False
+    display_dirty = not request_display_update('partial')      # ← async call
 
 def full_refresh_blocking():
     """Used for rare full updates (menus, splash)."""
@@ -461,6 +510,10 @@ def full_refresh_blocking():
 
 # show_linson, status, etc. unchanged except:
 def show_linson():
+    """Screensaver, streamed from flash if it has been built"""
+    with display_lock:
+        if panel_image.show(epd, SCREENSAVER_FILE):
+            return
     clear_display_buffer()
     epd.image1Gray.fill(0x00)
     txt = "Linson"
@@ -470,46 +523,85 @@ def show_linson():
     full_refresh_blocking()
 
 
+def scheduled_refresh(region=None):
+    """
+    Partial refresh, or fast full once ghosting is over budget
+
+    Args:
+        region: (x, y, w, h) full-width row band to send, or None for the
+                whole frame
+    """
+    start = utime.ticks_ms()
+    mode = refresh_scheduler.choose(region)
+    if mode == PARTIAL and region is not None:
+        epd.EPD_4IN2_V2_PartialDisplay(epd.buffer_1Gray, region[1], region[3])
+    elif mode == PARTIAL:
+        epd.EPD_4IN2_V2_PartialDisplay(epd.buffer_1Gray)
+    else:
+        epd.EPD_4IN2_V2_Display_Fast(epd.buffer_1Gray)
+    refresh_scheduler.record(mode, region, utime.ticks_diff(utime.ticks_ms(), start))
+
 def partial_refresh():
     """Partial display refresh"""
     try:
-        epd.EPD_4IN2_V2_PartialDisplay(epd.buffer_1Gray)
+        scheduled_refresh()
     except Exception as e:
         log_exception(e, "partial_refresh")
 
 def full_refresh():
     """Full display refresh"""
+    start = utime.ticks_ms()
     epd.EPD_4IN2_V2_Display_Fast(epd.buffer_1Gray)
+    refresh_scheduler.record(FULL, None, utime.ticks_diff(utime.ticks_ms(), start))
+
+def page_chars_to_lines(page_chars):
+    """Group get_screen_page() characters into (x, y, line_text) rows"""
+    rows = {}
+    for x, y, ch in page_chars:
+        if ch == '\n':
+            continue
+        row = rows.get(y)
+        if row is None:
+            rows[y] = [x, [ch]]
+        else:
+            row[1].append(ch)
+    return [(x, y, ''.join(chars)) for y, (x, chars) in rows.items()]
 
 def render_buffer_async():
-    """Render current state to buffer without blocking"""
+    """
+    Render current state to buffer without blocking
+    Only the text rows whose line or cursor changed are cleared and drawn
+
+    Returns:
+        (x, y, w, h) band covering the redrawn rows, the whole screen if
+        everything was redrawn, or None if nothing changed
+    """
     # This runs in main thread but doesn't do actual display update
-    with display_manager.lock:
-        # Render current text
-        current_text = ''.join(text_buffer)
-        pages = TextLayout.get_screen_pages(current_text, max_w, max_h)
-        
-        if pages:
-            render_text_page(pages[0])
-        else:
-            clear_display_buffer()
-        
-        # Add cursor
+    with display_lock:
+        current_text = text_buffer.text()
+        page_lines = page_chars_to_lines(
+            TextLayout.get_screen_page(current_text, max_w, max_h, 0))
         cursor_x, cursor_y, _ = TextLayout.get_cursor_screen_pos(
-            current_text, cursor_index, max_w, max_h
+            current_text, cursor_char_index(current_text), max_w, max_h
         )
-        render_cursor(cursor_x, cursor_y)
+        rows = row_renderer.render(page_lines, (cursor_x, cursor_y))
+
+    if rows is None:
+        return (0, 0, max_w, max_h)
+    if not rows:
+        return None
+    return (0, rows[0], max_w, rows[-1] + CHAR_HEIGHT - rows[0])
 
 def refresh_display_async():
     """Request async display refresh"""
     global display_dirty
     
-    # Render to buffer
-    render_buffer_async()
+    # Render to buffer (only the rows that changed)
+    region = render_buffer_async()
     
-    # Request update
-    display_manager.request_update()
-    display_dirty = False
+    # Request update (retried from the main loop if the queue was full)
+    display_dirty = (region is not None
+                     and not request_display_update('partial', region=region))
 
 # Replace existing refresh_display with async version
 
@@ -550,8 +642,7 @@ def insert_char_no_render(ch: str):
     """Insert character without refreshing display"""
     global text_buffer, cursor_index, file_dirty
     
-    text_buffer.insert(cursor_index, ch)
-    cursor_index += 1
+    cursor_index = text_buffer.insert(cursor_index, ch)
     file_dirty = True
 
 def backspace_no_render():
@@ -559,8 +650,7 @@ def backspace_no_render():
     global text_buffer, cursor_index, file_dirty
     
     if cursor_index > 0:
-        cursor_index -= 1
-        text_buffer.pop(cursor_index)
+        cursor_index = text_buffer.backspace(cursor_index)
         file_dirty = True
 
 def cursor_newline_no_render():
@@ -574,23 +664,12 @@ def delete_word_no_render():
     if cursor_index == 0:
         return
     
-    # Find start of current word
-    i = cursor_index - 1
+    # Find start of current word (skips trailing spaces first)
+    word_start = text_buffer.word_start(cursor_index)
     
-    # Skip trailing spaces
-    while i >= 0 and text_buffer[i] == ' ':
-        i -= 1
-    
-    # Find word boundary
-    while i >= 0 and text_buffer[i] not in ' \n':
-        i -= 1
-    
-    # Delete from word start to cursor
-    chars_to_delete = cursor_index - (i + 1)
-    for _ in range(chars_to_delete):
-        if cursor_index > 0:
-            cursor_index -= 1
-            text_buffer.pop(cursor_index)
+    # Delete from word start to cursor in one step
+    text_buffer.delete(word_start, cursor_index)
+    cursor_index = word_start
     
     file_dirty = True
 
@@ -618,7 +697,7 @@ def process_single_key(key_data):
 
 def flush_key_buffer():
     """Process all buffered keys and update display"""
-    global key_buffer, last_render_time
+    global key_buffer, last_render_time, display_dirty
     
     if not key_buffer:
         return
@@ -629,9 +708,10 @@ def flush_key_buffer():
     
     key_buffer.clear()
     
-    # Request display update
-    render_buffer_async()
-    display_manager.request_update()
+    # Request display update (nothing to send if no row changed)
+    region = render_buffer_async()
+    if region is not None and not request_display_update('partial', region=region):
+        display_dirty = True
     last_render_time = utime.ticks_ms()
 
 # Original versions with display refresh (keep for immediate operations)
@@ -640,7 +720,7 @@ def check_overflow():
     global current_subpage_index, text_buffer, cursor_index
     
     # Check if cursor position would be off screen
-    current_text = ''.join(text_buffer)
+    current_text = text_buffer.text()
     pages = TextLayout.get_screen_pages(current_text, max_w, max_h)
     
     if len(pages) > 1:
@@ -652,7 +732,7 @@ def check_overflow():
         
         # Move to next subpage
         current_subpage_index += 1
-        text_buffer = list(overflow_text)
+        text_buffer.load(overflow_text)
         cursor_index = len(text_buffer)
         
         # Clear and refresh display
@@ -668,14 +748,13 @@ def insert_char(ch: str):
     global current_subpage_index
     
     # Simply insert the character
-    text_buffer.insert(cursor_index, ch)
-    cursor_index += 1
+    cursor_index = text_buffer.insert(cursor_index, ch)
     
     # Check if we need to move to next subpage for DISPLAY only
     # Calculate where cursor would appear on screen
-    current_text = ''.join(text_buffer)
+    current_text = text_buffer.text()
     _, _, cursor_page = TextLayout.get_cursor_screen_pos(
-        current_text, cursor_index, max_w, max_h
+        current_text, cursor_char_index(current_text), max_w, max_h
     )
     
     # If cursor moved to next page visually, update display
@@ -699,8 +778,7 @@ def backspace():
     global current_page_index, current_subpage_index
     
     if cursor_index > 0:
-        cursor_index -= 1
-        text_buffer.pop(cursor_index)
+        cursor_index = text_buffer.backspace(cursor_index)
         display_dirty = True
         file_dirty = True
         save_cursor_position()
@@ -741,23 +819,12 @@ def delete_word():
     if cursor_index == 0:
         return
     
-    # Find start of current word
-    i = cursor_index - 1
-    
-    # Skip trailing spaces
-    while i >= 0 and text_buffer[i] == ' ':
-        i -= 1
-    
-    # Find word boundary
-    while i >= 0 and text_buffer[i] not in ' \n':
-        i -= 1
+    # Find start of current word (skips trailing spaces first)
+    word_start = text_buffer.word_start(cursor_index)
     
-    # Delete from word start to cursor
-    chars_to_delete = cursor_index - (i + 1)
-    for _ in range(chars_to_delete):
-        if cursor_index > 0:
-            cursor_index -= 1
-            text_buffer.pop(cursor_index)
+    # Delete from word start to cursor in one step
+    text_buffer.delete(word_start, cursor_index)
+    cursor_index = word_start
     
     display_dirty = True
     file_dirty = True
@@ -787,48 +854,40 @@ def save_current_page():
     """Save current buffer to file - only explicit newlines, no wrap formatting"""
     global file_dirty, file_last_flush, current_page_index
     
+    # Only this page is written (to its own segment, see PageStore); the
+    # buffer holds just user-entered text with explicit newlines
     try:
-        # Read the full file
-        with open(ACTIVE_FILE, "r", encoding='utf-8') as f:
-            full_content = f.read()
-    except:
-        full_content = ""
-    
-    # Split into explicit pages (marked by user with Shift+Enter)
-    pages = full_content.split('\n---\n')
-    
-    # Ensure we have enough pages
-    while len(pages) <= current_page_index:
-        pages.append("")
-    
-    # Simply save the text buffer as-is
-    # It contains only user-entered text with explicit newlines
-    pages[current_page_index] = ''.join(text_buffer)
-    
-    # Join pages back
-    new_content = '\n---\n'.join(pages)
-    
-    try:
-        with open(ACTIVE_FILE, "w", encoding='utf-8') as f:
-            f.write(new_content)
+        active_pages().write_page(current_page_index, text_buffer.write_to)
         file_dirty = False
         file_last_flush = utime.ticks_ms()
         save_screen_buffer()
     except Exception as e:
         log_exception(e, "save_current_page")
 
-def load_pages(path: str):
-    """Load file and split by page markers"""
+def close_active_file():
+    """Save and fold saved pages back into the note file, for other tools and the next open"""
+    if not ACTIVE_FILE:
+        return
+    if file_dirty:
+        save_current_page()
     try:
-        with open(path, "r", encoding='utf-8') as f:
-            content = f.read()
-    except:
-        return [""]
-    
-    if not content.strip():
-        return [""]
+        active_pages().compact()
+    except Exception as e:
+        log_exception(e, "close_active_file")
+
+def active_pages():
+    """PageStore of the active file"""
+    global page_store
     
-    return content.split('\n---\n')
+    if page_store is None or page_store.path != ACTIVE_FILE:
+        page_store = PageStore(ACTIVE_FILE)
+    return page_store
+
+def load_pages(path: str):
+    """Pages of a note - a PageStore, indexed like a list but read a page at a time"""
+    if path == ACTIVE_FILE:
+        return active_pages()
+    return PageStore(path)
 
 def load_specific_page(page_idx, subpage_idx=0):
     """Load a specific page into buffer - always load complete text"""
@@ -842,9 +901,9 @@ def load_specific_page(page_idx, subpage_idx=0):
     
     if page_idx < len(pages):
         # ALWAYS load the complete page text, including all newlines
-        text_buffer = list(pages[page_idx])
+        text_buffer.load(pages[page_idx])
     else:
-        text_buffer = []
+        text_buffer.clear()
     
     # Set cursor to end
     cursor_index = len(text_buffer)
@@ -876,23 +935,18 @@ def load_previous():
 
 def new_page_marker():
     """Insert explicit page break"""
-    global file_dirty, current_page_index, current_subpage_index
+    global file_dirty, current_page_index, current_subpage_index, cursor_index
     
     # Save current content
     save_current_page()
     
-    # Add page marker
-    try:
-        with open(ACTIVE_FILE, "a", encoding='utf-8') as f:
-            f.write('\n---\n')
-    except Exception as e:
-        log_exception(e, "new_page_marker")
-    
     current_page_index += 1
     current_subpage_index = 0
     text_buffer.clear()
     cursor_index = 0
-    file_dirty = True
+    
+    # Saving the empty page adds the marker
+    save_current_page()
     save_cursor_position()
 
 def render_file(path: str):
@@ -905,10 +959,9 @@ def render_file(path: str):
     except:
         content = "(Unable to load file)"
     
-    # Use TextLayout to properly render with word wrapping
-    pages = TextLayout.get_screen_pages(content, max_w, max_h)
-    if pages:
-        render_text_page(pages[0])
+    # Use TextLayout to properly render with word wrapping; only the
+    # first screen is shown, so stop wrapping once it is full
+    render_text_page(TextLayout.get_screen_page(content, max_w, max_h, 0))
     
     partial_refresh()
 
@@ -1243,8 +1296,7 @@ def idle_sleep():
         stop_display_thread()
         
         # Save state
-        if file_dirty:
-            save_current_page()
+        close_active_file()
         stop_display_thread() 
         save_cursor_position()
         
@@ -1277,8 +1329,7 @@ def shutdown():
     stop_display_thread()
     
     # Save work
-    if file_dirty:
-        save_current_page()
+    close_active_file()
     stop_display_thread() 
     # Show shutdown screen
     show_linson()
@@ -1310,8 +1361,7 @@ def action_open():
     global current_page_index, current_subpage_index
     
     # Save current work
-    action_save()
-    time.sleep_ms(50)
+    close_active_file()
     
     # Clear any pending keys
     while scan_keys():
@@ -1341,6 +1391,8 @@ def action_new():
     """Create new file"""
     global ACTIVE_FILE, text_buffer, cursor_index, current_page_index, current_subpage_index
     
+    close_active_file()
+    
     timestamp = utime.time() % 100000
     ACTIVE_FILE = f"{STORAGE_BASE}/note_{timestamp}.txt"
     open(ACTIVE_FILE, 'w').close()
@@ -1359,7 +1411,7 @@ def action_rename():
     global ACTIVE_FILE, file_dirty
     
     # Save current display state
-    saved_text = text_buffer[:]
+    saved_text = text_buffer.text()
     saved_cursor = cursor_index
     
     old_name = ACTIVE_FILE.split("/")[-1]
@@ -1377,7 +1429,9 @@ def action_rename():
     new_path = f"{STORAGE_BASE}/{new_name}"
     
     try:
+        close_active_file()
         os.rename(ACTIVE_FILE, new_path)
+        PageStore.discard_sidecars(ACTIVE_FILE)
         ACTIVE_FILE = new_path
         open(ACTIVE_FILE, 'a').close()
         file_dirty = False
@@ -1388,7 +1442,7 @@ def action_rename():
         log_exception(e, "action_rename")
         status("Rename failed!")
         # Restore display
-        text_buffer = saved_text
+        text_buffer.load(saved_text)
         cursor_index = saved_cursor
         refresh_display()
         
@@ -1396,9 +1450,8 @@ def action_upload():
     """Upload current file to home server with enhanced feedback"""
     global file_dirty
     
-    # Save current work first
-    if file_dirty:
-        save_current_page()
+    # Save current work first (the server gets one plain file)
+    close_active_file()
     
     # Get file size for display
     try:
@@ -1474,13 +1527,12 @@ def action_upload_todoist():
     """Upload current file to Todoist as a backup"""
     global file_dirty
     
-    # Save current work first
-    if file_dirty:
-        save_current_page()
+    # Save current work first (uploads one plain file)
+    close_active_file()
     
     # Get file info for display
     try:
-        char_count = len(''.join(text_buffer))
+        char_count = len(text_buffer.text())   # Characters, not bytes
     except:
         char_count = 0
     
@@ -1549,7 +1601,7 @@ def action_delete(path: str = None):
     If called with no path it deletes the ACTIVE_FILE.
     Returns True on success, False on cancel/error.
     """
-    global ACTIVE_FILE, text_buffer, cursor_index
+    global ACTIVE_FILE, text_buffer, cursor_index, page_store
     global current_page_index, current_subpage_index, file_dirty
 
     target = path or ACTIVE_FILE
@@ -1573,6 +1625,9 @@ def action_delete(path: str = None):
 
     try:
         os.remove(target)
+        PageStore.discard_sidecars(target)
+        if target == ACTIVE_FILE:
+            page_store = None  # Its saved pages go too
         status("File deleted")
 
         # If we just deleted the open file, fall back to a fresh note
@@ -1601,7 +1656,7 @@ def main():
     global current_page_index, current_subpage_index
     global in_paged_view
     global key_buffer, last_render_time
-    global display_manager
+    global display_manager, row_renderer, refresh_scheduler
     
     # Initialize display queue
     display_manager.init_queue()
@@ -1619,8 +1674,14 @@ def main():
     # Initialize display
     epd = EPD_4in2()
     epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S)
+    refresh_scheduler = RefreshScheduler(epd.width, epd.height, CHAR_HEIGHT)
     clear_display_buffer()
-    full_refresh_blocking()         # ← make sure this is the blocking version
+    splash = panel_image.show(epd, SPLASH_FILE)
+    if splash is None:
+        full_refresh_blocking()     # ← make sure this is the blocking version
+    elif splash == panel_image.GRAY:
+        # The 4-gray splash left the gray LUT loaded
+        epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S)
     time.sleep_ms(100)
     print("Display initialized")
 
@@ -1629,6 +1690,7 @@ def main():
     # Set display dimensions
     max_w, max_h = epd.width, epd.height
     print(f"Display: {max_w}x{max_h}, char: {CHAR_WIDTH}x{CHAR_HEIGHT}")
+    row_renderer = RowRenderer(epd.image1Gray, max_w, CHAR_HEIGHT, CHAR_WIDTH)
     
     # Start display thread
     start_display_thread()
@@ -0,0 +1,148 @@
+"""
+refresh_scheduler.py - Pick the e-ink refresh mode for each screen update
+Keeps count of the ghosting partial refreshes leave on the panel and only
+asks for a fast full refresh when it is needed
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+PARTIAL = 'partial'   # Partial refresh of the changed rows
+FULL = 'full'         # Fast full refresh of the whole frame
+CLEAR = 'clear'       # Panel cleared to white
+SKIPPED = 'skipped'   # Partial refresh with nothing to send
+MODES = (PARTIAL, FULL, CLEAR, SKIPPED)
+
+
+class RefreshScheduler:
+    """
+    Chooses partial or fast full refreshes within a ghosting budget
+
+    The caller asks choose() which mode to use, does the refresh, and then
+    reports what actually happened with record().
+
+    Ghosting debt is the worse of the partial refreshes per band of rows
+    and the total area they redrew since the last full refresh: 0.0 on
+    clean glass, 1.0 at the budget. Below the budget a full refresh is
+    only chosen on a page change or an idle pause; while typing it waits
+    for a pause until hard_debt.
+    """
+
+    def __init__(self, width, height, band_height=15, max_partials=40,
+                 max_area=None, page_debt=0.25, idle_debt=0.1, hard_debt=2.0):
+        """
+        Args:
+            width: Panel width in pixels
+            height: Panel height in pixels
+            band_height: Rows per tracked band (CHAR_HEIGHT: one text row)
+            max_partials: Partial refreshes one band may have before a
+                          full refresh is forced
+            max_area: Pixels partial refreshes may redraw before a full
+                      refresh is forced (default: 8 whole screens)
+            page_debt: Debt at which a page change gets a full refresh
+            idle_debt: Debt at which an idle pause gets a full refresh
+            hard_debt: Debt at which a deferred full refresh can't wait
+                       for a pause any longer
+        """
+        self.width = width
+        self.height = height
+        self.band_height = band_height
+        self.max_partials = max_partials
+        self.max_area = max_area if max_area is not None else width * height * 8
+        self.page_debt = page_debt
+        self.idle_debt = idle_debt
+        self.hard_debt = hard_debt
+
+        self._bands = bytearray((height + band_height - 1) // band_height)
+        self._worst = 0   # Highest partial count of any band
+        self.area = 0     # Pixels redrawn by partials since the last full refresh
+
+        self.counts = {}   # Refreshes per mode (stats)
+        self.time_ms = {}  # Time spent per mode (stats)
+        for mode in MODES:
+            self.counts[mode] = 0
+            self.time_ms[mode] = 0
+
+    def _rows(self, region):
+        """(x, y, w, h) of region, or of the whole screen for None"""
+        if region is None:
+            return 0, 0, self.width, self.height
+        return region
+
+    def debt(self, region=None, weight=1):
+        """
+        Ghosting debt, 0.0 on clean glass and 1.0 at the budget
+
+        Args:
+            region: (x, y, w, h) of a partial refresh to count as already
+                    done (default: just the refreshes recorded so far)
+            weight: Partial refreshes that one counts as (see record())
+        """
+        worst = self._worst
+        area = self.area
+        if region is not None:
+            x, y, w, h = region
+            bh = self.band_height
+            for band in range(y // bh, min(len(self._bands), (y + h - 1) // bh + 1)):
+                if self._bands[band] + weight > worst:
+                    worst = self._bands[band] + weight
+            area += w * h * weight
+        return max(worst / self.max_partials, area / self.max_area)
+
+    def choose(self, region=None, page_change=False, weight=1, defer=False):
+        """
+        Pick the refresh mode for an update
+
+        Args:
+            region: (x, y, w, h) that changed, or None for the whole screen
+            page_change: The screen shows different content altogether
+                         (another page, the menu)
+            weight: Ghosting weight a partial refresh would have
+            defer: The user is typing; stay partial up to hard_debt and
+                   leave the full refresh to wants_cleanup()
+
+        Returns:
+            PARTIAL or FULL
+        """
+        if self.debt(self._rows(region), weight) > (self.hard_debt if defer else 1.0):
+            return FULL
+        if page_change and self.debt() >= self.page_debt:
+            return FULL
+        return PARTIAL
+
+    def wants_cleanup(self):
+        """True if an idle moment should be used for a full refresh"""
+        return self.debt() >= self.idle_debt
+
+    def record(self, mode, region=None, ms=0, weight=1):
+        """
+        Account for a refresh that was done
+
+        Args:
+            mode: One of MODES
+            region: (x, y, w, h) a partial refresh redrew, or None for the
+                    whole screen
+            ms: Time the refresh took
+            weight: Partial refreshes this one counts as; a shortened
+                    waveform leaves more ghosting than the built-in one
+        """
+        self.counts[mode] += 1
+        self.time_ms[mode] += ms
+
+        if mode == PARTIAL:
+            x, y, w, h = self._rows(region)
+            bands = self._bands
+            bh = self.band_height
+            for band in range(y // bh, min(len(bands), (y + h - 1) // bh + 1)):
+                bands[band] = min(255, bands[band] + weight)
+                if bands[band] > self._worst:
+                    self._worst = bands[band]
+            self.area += w * h * weight
+        elif mode == FULL or mode == CLEAR:
+            self.reset()
+
+    def reset(self):
+        """The panel was fully refreshed; no ghosting left"""
+        bands = self._bands
+        for band in range(len(bands)):
+            bands[band] = 0
+        self._worst = 0
+        self.area = 0
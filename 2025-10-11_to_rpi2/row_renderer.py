@@ -0,0 +1,165 @@
+"""
+row_renderer.py - Redraw only the text rows of the frame that changed
+Replaces clear-the-frame-and-draw-every-glyph on each editor refresh
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+
+class RowRenderer:
+    """
+    Incremental text renderer for a 1-bit framebuf.FrameBuffer
+
+    Draws black text and an underline cursor on white, as the editors'
+    render_text_page() and render_cursor() do. Remembers the line and
+    cursor last drawn on each row; anything else drawing into the frame
+    (menus, a full clear) must call forget().
+    """
+
+    def __init__(self, image, width, row_height, char_width, draw_text=None):
+        """
+        Args:
+            image: framebuf.FrameBuffer of the frame (MONO_HLSB)
+            width: Frame width in pixels
+            row_height: Height of a text row in pixels (CHAR_HEIGHT)
+            char_width: Width of the cursor cell in pixels (CHAR_WIDTH)
+            draw_text: Callable (line, x, y) drawing black text, e.g.
+                       GlyphAtlas.text (default: image.text)
+        """
+        self.image = image
+        self.width = width
+        self.row_height = row_height
+        self.char_width = char_width
+        self.draw_text = draw_text if draw_text is not None else self._framebuf_text
+        self._rows = None         # {y: (x, line, cursor x or None)}, None if unknown
+        self._columns = (0, 0)    # Pixel columns [x0, x1) the last render changed
+        self.rows_drawn = 0       # Rows redrawn so far (stats)
+        self.full_renders = 0     # Renders that started from a blank frame (stats)
+
+    def _framebuf_text(self, line, x, y):
+        self.image.text(line, x, y, 0)
+
+    def forget(self):
+        """Frame was drawn over by something else; redraw everything next time"""
+        self._rows = None
+
+    def render(self, page_lines, cursor):
+        """
+        Bring the frame up to date with a page of lines and the cursor
+
+        Args:
+            page_lines: (x, y, line_text) tuples, one per non-empty row
+            cursor: (x, y) of the cursor cell, or None for no cursor
+
+        Returns:
+            Sorted list of the row y coordinates redrawn, or None if the
+            whole frame was redrawn
+        """
+        rows = {}
+        for x, y, line in page_lines:
+            rows[y] = (x, line, None)
+        if cursor is not None:
+            cx, cy = cursor
+            x, line, _ = rows.get(cy, (0, "", None))
+            rows[cy] = (x, line, cx)
+
+        old = self._rows
+        self._rows = rows
+        image = self.image
+        h = self.row_height
+
+        if old is None:
+            image.fill(1)
+            for y in rows:
+                self._draw_row(y, rows[y])
+            self.full_renders += 1
+            self.rows_drawn += len(rows)
+            return None
+
+        changed = []
+        for y in rows:
+            if rows[y] != old.get(y):
+                changed.append(y)
+        for y in old:
+            if y not in rows:
+                changed.append(y)
+        changed.sort()
+
+        x0 = self.width
+        x1 = 0
+        for y in changed:
+            left, right = self._changed_columns(old.get(y), rows.get(y))
+            if left < x0:
+                x0 = left
+            if right > x1:
+                x1 = right
+        self._columns = (max(0, x0), min(self.width, x1))
+
+        for y in changed:
+            image.fill_rect(0, y, self.width, h, 1)
+            row = rows.get(y)
+            if row is not None:
+                self._draw_row(y, row)
+        self.rows_drawn += len(changed)
+        return changed
+
+    def region(self, rows, height):
+        """
+        Rectangle the last render() changed, for a windowed partial refresh
+
+        Args:
+            rows: What render() returned
+            height: Frame height in pixels
+
+        Returns:
+            (x, y, w, h): the whole frame after a full redraw, else the
+            changed columns of the redrawn rows, or None if nothing changed
+        """
+        if rows is None:
+            return (0, 0, self.width, height)
+        x0, x1 = self._columns
+        if not rows or x1 <= x0:
+            return None
+        return (x0, rows[0], x1 - x0, rows[-1] + self.row_height - rows[0])
+
+    def _changed_columns(self, old, new):
+        """
+        Pixel columns [left, right) that differ between two versions of a row
+
+        A changed line differs from its first differing character to the end
+        of the longer version; a moved cursor changes its old and new cells.
+        """
+        if old is None:
+            old = (new[0], "", None)
+        elif new is None:
+            new = (old[0], "", None)
+        ox, oline, ocx = old
+        nx, nline, ncx = new
+        cw = self.char_width
+        left = self.width
+        right = 0
+        if (ox, oline) != (nx, nline):
+            if ox == nx:
+                n = min(len(oline), len(nline))
+                i = 0
+                while i < n and oline[i] == nline[i]:
+                    i += 1
+                left = nx + i * cw
+            else:
+                left = min(ox, nx)
+            right = max(ox + len(oline) * cw, nx + len(nline) * cw)
+        if ocx != ncx:
+            for cx in (ocx, ncx):
+                if cx is not None:
+                    if cx < left:
+                        left = cx
+                    if cx + cw > right:
+                        right = cx + cw
+        return left, right
+
+    def _draw_row(self, y, row):
+        """Draw one row's text and cursor onto a white background"""
+        x, line, cx = row
+        if line:
+            self.draw_text(line, x, y)
+        if cx is not None:
+            self.image.fill_rect(cx, y + self.row_height - 2, self.char_width, 2, 0)
@@ -349,13 +349,12 @@ def request_display_update():
     global screensaver_active
 
     current_text = ''.join(text_buffer)
-    cx, cy, _ = TextLayout.get_cursor_screen_pos(current_text, cursor_index, DISPLAY_WIDTH, DISPLAY_HEIGHT)
 
+    # Slave locates the cursor from its own layout pass
     send_uart_command({
         "cmd": "RENDER_TEXT",
         "text": current_text,
-        "cursor_x": cx,
-        "cursor_y": cy
+        "cursor_index": cursor_index
     })
     screensaver_active = False
 
@@ -6,6 +6,7 @@
 import time, utime, machine, json
 from machine import Pin, SPI, UART
 from display42 import EPD_4in2
+import panel_image
 
 #───────────────────────────────────────────────#
 # ─────────── Constants & Config ───────────────#
@@ -17,6 +18,9 @@ CHAR_HEIGHT  = 15
 MARGIN_LEFT  = 5
 MARGIN_TOP   = 5
 
+# Precompiled screensaver (make_panel_image.py); drawn at runtime if absent
+SCREENSAVER_FILE = "linson.bin"
+
 # UART configuration
 UART_ID = 1
 UART_TX = 8   # GP8 (UART1 TX)
@@ -106,19 +110,27 @@ class TextLayout:
         return word_start, word_end
 
     @staticmethod
-    def calculate_lines(text, max_width):
-        """Calculate line breaks with word wrapping"""
+    def calculate_lines(text, max_width, line_starts=None):
+        """Calculate line breaks with word wrapping
+
+        If line_starts is a list, the text offset of each line is appended
+        to it so the cursor can be located without a second layout pass.
+        """
         lines = []
         current_line = []
         current_x = MARGIN_LEFT
+        line_start = 0
         i = 0
 
         while i < len(text):
             if text[i] == '\n':
                 lines.append(current_line[:])
+                if line_starts is not None:
+                    line_starts.append(line_start)
                 current_line = []
                 current_x = MARGIN_LEFT
                 i += 1
+                line_start = i
                 continue
 
             if text[i] == ' ':
@@ -150,16 +162,24 @@ class TextLayout:
                         i += 1
                     if i < word_end:
                         lines.append(current_line[:])
+                        if line_starts is not None:
+                            line_starts.append(line_start)
+                        line_start = i
                         current_line = []
                         current_x = MARGIN_LEFT
                 else:
                     # Start new line with this word
                     lines.append(current_line[:])
+                    if line_starts is not None:
+                        line_starts.append(line_start)
+                    line_start = i
                     current_line = []
                     current_x = MARGIN_LEFT
 
         if current_line:
             lines.append(current_line)
+            if line_starts is not None:
+                line_starts.append(line_start)
 
         return lines
 
@@ -167,6 +187,11 @@ class TextLayout:
     def get_screen_pages(text, max_width, max_height):
         """Calculate screen pages from text"""
         lines = TextLayout.calculate_lines(text, max_width)
+        return TextLayout.paginate(lines, max_height)
+
+    @staticmethod
+    def paginate(lines, max_height):
+        """Split lines from calculate_lines() into screen pages"""
         pages = []
         current_page = []
         current_y = MARGIN_TOP
@@ -187,6 +212,45 @@ class TextLayout:
 
         return pages if pages else [[]]
 
+    @staticmethod
+    def get_cursor_from_lines(text, lines, line_starts, cursor_index, max_height):
+        """Locate the cursor using line offsets from calculate_lines()
+
+        Binary-searches line_starts instead of re-wrapping text[:cursor_index].
+        A cursor just after a newline is placed at the start of the next line.
+
+        Returns:
+            (x, y, page_num) tuple
+        """
+        if cursor_index > len(text):
+            cursor_index = len(text)
+
+        # Last line starting at or before the cursor
+        lo, hi = 0, len(line_starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if line_starts[mid] <= cursor_index:
+                lo = mid + 1
+            else:
+                hi = mid
+        row = lo - 1
+
+        if row < 0:
+            row = 0
+            col = 0
+        elif cursor_index > 0 and text[cursor_index - 1] == '\n' and \
+                line_starts[row] != cursor_index:
+            # Empty last line after a trailing newline has no entry
+            row += 1
+            col = 0
+        else:
+            col = min(cursor_index - line_starts[row], len(lines[row]))
+
+        lines_per_page = max(1, (max_height - MARGIN_TOP) // CHAR_HEIGHT)
+        x = MARGIN_LEFT + col * CHAR_WIDTH
+        y = MARGIN_TOP + (row % lines_per_page) * CHAR_HEIGHT
+        return x, y, row // lines_per_page
+
 #───────────────────────────────────────────────#
 # ──────── Display Functions ───────────────────#
 #───────────────────────────────────────────────#
@@ -208,6 +272,9 @@ def render_cursor(x, y):
 
 def show_linson():
     """Display 'Linson' logo (screen saver)"""
+    # Streamed from flash if it has been built
+    if panel_image.show(epd, SCREENSAVER_FILE):
+        return
     clear_display_buffer()
     epd.image1Gray.fill(0x00)  # Black background
     txt = "Linson"
@@ -257,8 +324,13 @@ def handle_render_text(cmd):
     cursor_x = cmd.get("cursor_x", MARGIN_LEFT)
     cursor_y = cmd.get("cursor_y", MARGIN_TOP)
 
-    # Calculate layout
-    pages = TextLayout.get_screen_pages(text, max_w, max_h)
+    # Calculate layout once; a cursor_index is located in the same pass
+    line_starts = []
+    lines = TextLayout.calculate_lines(text, max_w, line_starts)
+    pages = TextLayout.paginate(lines, max_h)
+    if "cursor_index" in cmd:
+        cursor_x, cursor_y, _ = TextLayout.get_cursor_from_lines(
+            text, lines, line_starts, cmd["cursor_index"], max_h)
 
     # Render first page
     if pages:
@@ -281,7 +353,9 @@ def handle_show_screensaver(cmd):
 
 def handle_wake_up(cmd):
     """Handle wake-up command"""
-    # Clear the screensaver
+    # Clear the screensaver (a 4-gray one left the 4-gray LUT loaded)
+    if panel_image.image_kind(epd, SCREENSAVER_FILE) == panel_image.GRAY:
+        epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S)
     clear_display_buffer()
     full_refresh()
     send_uart_response({"status": "ok", "cmd": "WAKE_UP"})
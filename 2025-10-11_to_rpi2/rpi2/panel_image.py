@@ -0,0 +1,98 @@
+"""
+panel_image.py - Show precompiled full-screen images straight from flash
+Streams a raw file in the controller's own RAM layout to the 4.2" EPD in
+small chunks
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+import os
+
+MONO = 'mono'
+GRAY = 'gray'
+
+CHUNK = 1000   # Bytes per SPI write: 20 rows of the 4.2" panel
+
+
+def image_kind(epd, path):
+    """
+    Kind of a panel image file, told by its size (the files have no header)
+
+    A MONO file is width * height / 8 bytes, 1 = white, MSB leftmost, and
+    goes to RAM 0x24 and 0x26; a GRAY file is the 0x24 plane then the 0x26
+    plane (levels as in gray4.py). make_panel_image.py writes both.
+
+    Returns:
+        MONO, GRAY, or None if the file is missing or its size fits neither
+    """
+    try:
+        size = os.stat(path)[6]
+    except OSError:
+        return None
+    plane = epd.width * epd.height // 8
+    if size == plane:
+        return MONO
+    if size == 2 * plane:
+        return GRAY
+    return None
+
+
+def stream_plane(epd, f, command, nbytes, buf):
+    """
+    Copy nbytes from file f into controller RAM
+
+    Args:
+        epd: EPD_4in2 driver
+        f: File opened 'rb', positioned at the plane
+        command: RAM write command (0x24 or 0x26)
+        nbytes: Plane size in bytes
+        buf: Chunk bytearray, reused for every read
+    """
+    epd.send_command(command)
+    view = memoryview(buf)
+    epd.digital_write(epd.dc_pin, 1)
+    epd.digital_write(epd.cs_pin, 0)
+    while nbytes > 0:
+        n = f.readinto(view[:min(len(buf), nbytes)])
+        if not n:
+            break
+        epd.spi.write(view[:n])
+        nbytes -= n
+    epd.digital_write(epd.cs_pin, 1)
+
+
+def show(epd, path, chunk=CHUNK):
+    """
+    Show a panel image file with a full refresh
+
+    A mono image goes out as EPD_4IN2_V2_Display_Fast() would send it. A
+    gray image initializes the 4-gray mode first; black/white refreshes
+    afterwards need their init again.
+
+    Args:
+        epd: EPD_4in2 driver, initialized for a black/white mode
+        path: File written by make_panel_image.py
+        chunk: Bytes per SPI write
+
+    Returns:
+        MONO or GRAY as shown, or None if path isn't a panel image (the
+        caller draws the screen itself)
+    """
+    kind = image_kind(epd, path)
+    if kind is None:
+        return None
+    plane = epd.width * epd.height // 8
+    buf = bytearray(chunk)
+    with open(path, 'rb') as f:
+        if kind == GRAY:
+            epd.EPD_4IN2_V2_Init_4Gray()
+            stream_plane(epd, f, 0x24, plane, buf)
+            stream_plane(epd, f, 0x26, plane, buf)
+            epd.TurnOnDisplay_4GRAY()
+        else:
+            if hasattr(epd, 'leave_partial'):
+                epd.leave_partial()
+            stream_plane(epd, f, 0x24, plane, buf)
+            f.seek(0)
+            stream_plane(epd, f, 0x26, plane, buf)
+            epd.TurnOnDisplay_Fast()
+    return kind
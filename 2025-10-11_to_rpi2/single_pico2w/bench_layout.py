@@ -0,0 +1,96 @@
+"""
+bench_layout.py - Word-wrap benchmark: per-character loop vs str.find scan
+Times TextLayout.calculate_lines() (one interpreted step per character)
+against LayoutEngine, whose fixed-pitch wrap finds break points with
+str.find()/rfind(), on 2KB, 10KB and 50KB pages.
+
+Runs under desktop CPython and MicroPython (unix port or on the Pico):
+    python3 bench_layout.py
+    micropython bench_layout.py
+"""
+
+import gc
+
+from editor_base import TextLayout, LayoutEngine
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # Desktop CPython
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+DISPLAY_WIDTH = 400
+DISPLAY_HEIGHT = 300
+PAGE_SIZES = (2048, 10240, 51200)
+
+WORDS = ("the quick brown fox jumps over a lazy dog while typing notes on an "
+         "e-ink deck with a mechanical keyboard and supercalifragilistic "
+         "paragraphs").split()
+
+
+def make_text(size):
+    """Deterministic prose with short paragraphs and the odd long word"""
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        word = WORDS[i % len(WORDS)]
+        if i % 97 == 96:
+            word = "x" * 60  # Longer than a line - exercises hard breaks
+        sep = "\n" if i % 41 == 40 else " "
+        parts.append(word)
+        parts.append(sep)
+        length += len(word) + 1
+        i += 1
+    return "".join(parts)[:size]
+
+
+def time_us(func, repeats):
+    """Best-of-repeats wall time of func() in microseconds"""
+    best = None
+    for _ in range(repeats):
+        gc.collect()
+        start = ticks_us()
+        func()
+        elapsed = ticks_diff(ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run():
+    print("Word-wrap benchmark ({}x{})".format(DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    print("{:>7} {:>7} {:>14} {:>14} {:>8}".format(
+        "size", "lines", "char loop us", "find scan us", "speedup"))
+
+    for size in PAGE_SIZES:
+        text = make_text(size)
+        engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+        def reference():
+            TextLayout.calculate_lines(text, DISPLAY_WIDTH)
+
+        def fast():
+            engine.invalidate()
+            engine.update(text)
+
+        repeats = 5 if size <= 10240 else 2
+        ref_us = time_us(reference, repeats)
+        fast_us = time_us(fast, repeats)
+
+        # Both must produce the same lines
+        if engine.lines() != TextLayout.calculate_lines(text, DISPLAY_WIDTH):
+            print("MISMATCH at size {}".format(size))
+
+        print("{:>7} {:>7} {:>14} {:>14} {:>7.1f}x".format(
+            size, engine.line_count(), ref_us, fast_us, ref_us / max(1, fast_us)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,82 @@
+"""
+bench_render.py - Full-page render benchmark: framebuf.text() vs glyph atlas
+Times drawing one full editor page into the 400x300 1-bit frame with
+framebuf.text() (per character and per line, at MARGIN_LEFT) against
+GlyphAtlas byte copies at ALIGNED_MARGIN_LEFT.
+
+Needs framebuf, so runs under MicroPython (unix port or on the Pico):
+    micropython bench_render.py
+"""
+
+import framebuf
+
+from editor_base import LayoutEngine, MARGIN_LEFT, ALIGNED_MARGIN_LEFT
+from glyph_atlas import GlyphAtlas
+from bench_layout import make_text, time_us
+
+DISPLAY_WIDTH = 400
+DISPLAY_HEIGHT = 300
+REPEATS = 10
+
+
+def page_lines(margin_left):
+    """Lines of a full first screen page of prose"""
+    engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT, margin_left)
+    engine.update(make_text(2048))
+    return engine.page_lines(0)
+
+
+def run():
+    buf = bytearray(DISPLAY_WIDTH * DISPLAY_HEIGHT // 8)
+    fb = framebuf.FrameBuffer(buf, DISPLAY_WIDTH, DISPLAY_HEIGHT, framebuf.MONO_HLSB)
+    atlas = GlyphAtlas(fb, buf, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+    lines = page_lines(MARGIN_LEFT)
+    aligned = page_lines(ALIGNED_MARGIN_LEFT)
+    chars = sum(len(line) for _, _, line in lines)
+
+    def per_char():
+        fb.fill(1)
+        for x, y, line in lines:
+            for ch in line:
+                fb.text(ch, x, y, 0)
+                x += 8
+
+    def per_line():
+        fb.fill(1)
+        for x, y, line in lines:
+            fb.text(line, x, y, 0)
+
+    def per_line_aligned():
+        fb.fill(1)
+        for x, y, line in aligned:
+            fb.text(line, x, y, 0)
+
+    def from_atlas():
+        fb.fill(1)
+        for x, y, line in aligned:
+            atlas.text(line, x, y)
+
+    # Same pixels as framebuf.text() at the same margin
+    per_line_aligned()
+    expected = bytes(buf)
+    from_atlas()
+    if bytes(buf) != expected:
+        print("MISMATCH between atlas and framebuf.text()")
+
+    print("Full-page render ({}x{}, {} lines, {} chars)".format(
+        DISPLAY_WIDTH, DISPLAY_HEIGHT, len(lines), chars))
+    print("{:<28} {:>10} {:>8}".format("path", "us", "speedup"))
+    base = None
+    for name, func in (("text() per char", per_char),
+                       ("text() per line", per_line),
+                       ("text() per line, aligned", per_line_aligned),
+                       ("atlas, aligned", from_atlas)):
+        us = time_us(func, REPEATS)
+        if base is None:
+            base = us
+        print("{:<28} {:>10} {:>7.1f}x".format(name, us, base / max(1, us)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,107 @@
+"""
+bench_spi_alloc.py - Heap allocated by each display transmit path
+Measures gc.mem_alloc() before and after commands, clears, full-frame
+pushes and partial refreshes, to check the SPI path stays allocation-free.
+Also times a RAM window setup sent byte by byte against the table-driven
+sequence display42.py now sends (see epd_sequence.py), and a fast init
+against one skipped because the controller is already in that mode.
+
+Needs the 4.2" panel attached, so runs on the Pico only:
+    import bench_spi_alloc
+"""
+
+import gc
+import utime
+
+from display42 import EPD_4in2
+
+COMMANDS = 100
+WINDOWS = 100
+
+
+def allocated(func):
+    """Bytes of heap allocated while func() runs (GC held off)"""
+    gc.collect()
+    gc.disable()
+    try:
+        before = gc.mem_alloc()
+        func()
+        return gc.mem_alloc() - before
+    finally:
+        gc.enable()
+
+
+def window_per_byte(epd, x_start, x_end, y_start, y_end):
+    """RAM window setup as SetWindow() sent it before the sequence tables"""
+    epd.send_command(0x44)
+    epd.send_data(x_start)
+    epd.send_data(x_end)
+    epd.send_command(0x45)
+    epd.send_data(y_start & 0xFF)
+    epd.send_data(y_start >> 8)
+    epd.send_data(y_end & 0xFF)
+    epd.send_data(y_end >> 8)
+    epd.send_command(0x4E)
+    epd.send_data(x_start)
+    epd.send_command(0x4F)
+    epd.send_data(y_start & 0xFF)
+    epd.send_data(y_start >> 8)
+
+
+def time_us(func, repeats):
+    """Mean microseconds per call"""
+    start = utime.ticks_us()
+    for _ in range(repeats):
+        func()
+    return utime.ticks_diff(utime.ticks_us(), start) // repeats
+
+
+def run():
+    epd = EPD_4in2()
+    frame = epd.buffer_1Gray
+    epd.image1Gray.fill(0xFF)
+    epd.image1Gray.text("Allocation check", 8, 5, 0)
+
+    def commands():
+        for _ in range(COMMANDS):
+            epd.send_command(0x4E)
+            epd.send_data(0x00)
+
+    def changed_line():
+        epd.image1Gray.fill_rect(8, 20, 100, 15, 0xFF)
+        epd.image1Gray.text("typed", 8, 20, 0)
+        epd.EPD_4IN2_V2_PartialDisplay(frame, 8, 20, 40, 15)
+
+    checks = (
+        ("{} command+data bytes".format(COMMANDS), commands),
+        ("clear", epd.EPD_4IN2_V2_Clear),
+        ("full frame (fast)", lambda: epd.EPD_4IN2_V2_Display_Fast(frame)),
+        ("partial, unchanged frame", lambda: epd.EPD_4IN2_V2_PartialDisplay(frame)),
+        ("partial, one text line", changed_line),
+        ("window setup", lambda: epd.SetWindow(1, 4, 20, 35)),
+        ("fast init", lambda: epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S, force=True)),
+    )
+
+    print("Display transmit allocations")
+    print("{:<28} {:>8}".format("path", "bytes"))
+    for name, func in checks:
+        print("{:<28} {:>8}".format(name, allocated(func)))
+
+    print("Window setup, mean of {}".format(WINDOWS))
+    print("{:<28} {:>8}".format("path", "us"))
+    print("{:<28} {:>8}".format("send_command/send_data",
+                                time_us(lambda: window_per_byte(epd, 1, 4, 20, 35), WINDOWS)))
+    print("{:<28} {:>8}".format("sequence",
+                                time_us(lambda: epd.SetWindow(1, 4, 20, 35), WINDOWS)))
+    epd.SetWindow(0, epd.width // 8 - 1, 0, epd.height - 1)
+
+    print("Fast init")
+    print("{:<28} {:>8}".format("path", "us"))
+    print("{:<28} {:>8}".format("reset and init", time_us(
+        lambda: epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S, force=True), 1)))
+    print("{:<28} {:>8}".format("already in mode", time_us(
+        lambda: epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S), 1)))
+    epd.Sleep()
+
+
+run()
@@ -36,12 +36,39 @@
 from machine import Pin
 import framebuf
 import utime
+try:
+    import uasyncio as asyncio
+except ImportError:
+    asyncio = None  # No asyncio - completion is tracked but not awaitable
 import hardware_pico  # Pico 2W hardware abstraction layer
+from frame_shadow import FrameShadow
+from gray4 import convert_plane, RAM_NEW, RAM_OLD
+import epd_sequence
+from epd_mode import ControllerState, FULL, FAST, GRAY4
+from epd_sequence import (
+    MONO_START, FAST_1_5S, FAST_1S, GRAY_START, FULL_WINDOW, PARTIAL_START,
+    WINDOW_TEMPLATE
+)
 
 # Display resolution (unchanged from original)
 EPD_WIDTH       = 400
 EPD_HEIGHT      = 300
 
+# A refresh whose BUSY interrupt hasn't arrived by now is checked on the pin
+# instead (4-gray and full refreshes take up to ~4s)
+BUSY_TIMEOUT_MS = 6000
+
+# Partial refresh waveform profiles (set_partial_profile())
+PROFILE_READING = 'reading'  # Controller's built-in waveform (0xFF), best quality
+PROFILE_TYPING = 'typing'    # Shortened waveform from set_partial_lut() (0xCF)
+# A shortened waveform leaves more ghosting per refresh - how many built-in
+# partial refreshes one typing refresh counts as (see RefreshScheduler)
+TYPING_GHOSTING = 2
+
+# White bytes streamed repeatedly to clear a RAM plane. Built once at
+# import, so clearing allocates nothing (1KB rather than a 15KB frame)
+WHITE_CHUNK     = b'\xff' * 1000
+
 # Pin assignments now come from hardware_pico module
 # These match the Pico 2W pin layout defined in hardware_pico.py:
 # - SPI1 bus: SCK=GP10, MOSI=GP11
@@ -88,6 +115,10 @@ LUT_ALL=[   0x01,	0x0A,	0x1B,	0x0F,	0x03,	0x01,	0x01,
             0x02,	0x00,	0x00,	0x07,	0x17,	0x41,	0xA8,
             0x32,	0x30 ]
 
+# LUT_ALL as register writes: waveform (0x32), then the gate/source
+# voltages that go with it
+LUT_4GRAY = epd_sequence.lut_records(LUT_ALL)
+
 class EPD_4in2:
     def __init__(self):
         """
@@ -128,12 +159,42 @@ class EPD_4in2:
         # New Pico 2W code uses centralized initialization:
         self.spi = hardware_pico.init_spi()
 
+        # Command/data byte reused for every single-byte write, so the
+        # transmit path allocates nothing per byte
+        self._byte = bytearray(1)
+        # RAM window records, rewritten in place for each window
+        self._window = bytearray(WINDOW_TEMPLATE)
+        self._window_seq = epd_sequence.records(self._window)
+
+        # BUSY completion is signalled by interrupt rather than polled
+        self.verbose = False              # Print busy/release lines
+        self.wait_after_refresh = True    # False: return once a refresh starts
+        self.busy_flag = asyncio.ThreadSafeFlag() if asyncio else None
+        self.busy_ms = {'full': 0, 'fast': 0, 'partial': 0, 'typing': 0, '4gray': 0}
+        self.last_busy_ms = 0     # Busy time of the last refresh timed, any mode
+        self._refreshing = False  # Cleared by the BUSY falling-edge IRQ
+        self._busy_mode = None    # Mode of the refresh not yet timed
+        self._busy_start = 0
+        self._busy_end = 0
+        self.busy_pin.irq(trigger=Pin.IRQ_FALLING, handler=self._busy_irq, hard=True)
+
         # Initialize frame buffers for 1-bit and 4-gray modes
         self.buffer_1Gray = bytearray(self.height * self.width // 8)
         self.buffer_4Gray = bytearray(self.height * self.width // 4)
         self.image1Gray = framebuf.FrameBuffer(self.buffer_1Gray, self.width, self.height, framebuf.MONO_HLSB)
         self.image4Gray = framebuf.FrameBuffer(self.buffer_4Gray, self.width, self.height, framebuf.GS2_HMSB)
 
+        # Copy of the last 1-bit frame sent, to skip unchanged refreshes
+        self.shadow = FrameShadow(self.width, self.height)
+        # Mode the controller is set up for, to skip redundant inits
+        self.state = ControllerState()
+
+        # Partial refresh waveform: built-in until a typing LUT is supplied
+        self.partial_profile = PROFILE_READING
+        self.partial_ghosting = 1     # Ghosting weight of the profile in use
+        self._typing_lut = None       # Records from epd_sequence.lut_records()
+        self._gray_plane = None  # 4-gray RAM plane, made on first use
+
         # Initialize display and clear screen
         self.EPD_4IN2_V2_Init()
         self.EPD_4IN2_V2_Clear()
@@ -153,12 +214,14 @@ class EPD_4in2:
         return pin.value()
 
     def delay_ms(self, delaytime):
-        """Delay in milliseconds"""
-        utime.sleep(delaytime / 1000.0)
+        """Delay in milliseconds (integer sleep - a float would be allocated)"""
+        utime.sleep_ms(delaytime)
 
-    def spi_writebyte(self, data):
-        """Write bytes to SPI bus"""
-        self.spi.write(bytearray(data))
+    def spi_write_byte(self, value):
+        """Write one byte to SPI bus from the preallocated buffer"""
+        byte = self._byte
+        byte[0] = value
+        self.spi.write(byte)
 
     def module_exit(self):
         """Prepare module for shutdown"""
@@ -174,6 +237,9 @@ class EPD_4in2:
         Hardware reset sequence for EPD
         Multiple reset pulses ensure clean initialization
         """
+        if self._refreshing:
+            self.wait_busy()  # Never reset the controller mid-refresh
+        self.state.reset()
         self.digital_write(self.reset_pin, 1)
         self.delay_ms(20)
         self.digital_write(self.reset_pin, 0)
@@ -190,35 +256,166 @@ class EPD_4in2:
         self.delay_ms(20)
 
     def send_command(self, command):
-        """Send command byte to EPD (DC=0, CS=0, write, CS=1)"""
+        """
+        Send command byte to EPD (DC=0, CS=0, write, CS=1)
+        Waits first if a refresh started without waiting is still running
+        """
+        if self._refreshing:
+            self.wait_busy()
         self.digital_write(self.dc_pin, 0)
         self.digital_write(self.cs_pin, 0)
-        self.spi_writebyte([command])
+        self.spi_write_byte(command)
         self.digital_write(self.cs_pin, 1)
 
     def send_data(self, data):
         """Send single data byte to EPD (DC=1, CS=0, write, CS=1)"""
         self.digital_write(self.dc_pin, 1)
         self.digital_write(self.cs_pin, 0)
-        self.spi_writebyte([data])
+        self.spi_write_byte(data)
         self.digital_write(self.cs_pin, 1)
 
     def send_data1(self, buf):
-        """Send data buffer to EPD (DC=1, CS=0, write, CS=1)"""
+        """
+        Send data buffer to EPD (DC=1, CS=0, write, CS=1)
+        bytes, bytearray and memoryview go out as they are, without a copy
+        """
+        if isinstance(buf, list):
+            buf = bytearray(buf)  # Old callers passing a list of ints
+        self.digital_write(self.dc_pin, 1)
+        self.digital_write(self.cs_pin, 0)
+        self.spi.write(buf)
+        self.digital_write(self.cs_pin, 1)
+
+    def send_sequence(self, sequence):
+        """
+        Send register records from epd_sequence, one CS frame per command
+        Waits first if a refresh started without waiting is still running
+
+        Args:
+            sequence: (command, data) pairs from epd_sequence.records()
+        """
+        if self._refreshing:
+            self.wait_busy()
+        epd_sequence.stream(sequence, self.spi, self.dc_pin, self.cs_pin)
+
+    def send_fill(self, chunk, count):
+        """
+        Send count bytes by repeating a constant chunk, in one CS frame
+
+        Args:
+            chunk: bytes to repeat (e.g. WHITE_CHUNK)
+            count: Total bytes to send
+        """
+        self.digital_write(self.dc_pin, 1)
+        self.digital_write(self.cs_pin, 0)
+        n = len(chunk)
+        while count >= n:
+            self.spi.write(chunk)
+            count -= n
+        if count:
+            self.spi.write(memoryview(chunk)[:count])
+        self.digital_write(self.cs_pin, 1)
+
+    def send_window(self, image, x_start, x_end, y_start, y_end):
+        """
+        Send a byte-aligned window of a 1-bit frame (DC=1, one CS frame)
+        Rows are written straight from the frame, without copying
+
+        Args:
+            image: Full-frame bytearray (MONO_HLSB)
+            x_start, x_end: Byte columns, end exclusive
+            y_start, y_end: Pixel rows, end exclusive
+        """
+        stride = self.width // 8
         self.digital_write(self.dc_pin, 1)
         self.digital_write(self.cs_pin, 0)
-        self.spi.write(bytearray(buf))
+        if x_start == 0 and x_end == stride and y_start == 0 and y_end == self.height:
+            # Whole frame - no view needed at all
+            self.spi.write(image)
+        elif x_start == 0 and x_end == stride:
+            # Full-width rows are contiguous in the frame
+            self.spi.write(memoryview(image)[y_start * stride:y_end * stride])
+        else:
+            frame = memoryview(image)
+            for row in range(y_start * stride, y_end * stride, stride):
+                self.spi.write(frame[row + x_start:row + x_end])
         self.digital_write(self.cs_pin, 1)
 
     def ReadBusy(self):
         """
         Wait for EPD to become ready
         BUSY pin: LOW=idle, HIGH=busy
+        A refresh is waited for through its interrupt; the short waits of
+        the init sequences poll the pin every millisecond
+        """
+        if self.verbose:
+            print("e-Paper busy")
+        if self._refreshing:
+            self.wait_busy()
+        else:
+            while(self.digital_read(self.busy_pin) == 1):      #  LOW: idle, HIGH: busy
+                utime.sleep_ms(1)
+        if self.verbose:
+            print("e-Paper busy release")
+
+    def _busy_irq(self, pin):
+        """BUSY falling edge (hard IRQ - no allocation)"""
+        self._busy_end = utime.ticks_ms()
+        self._refreshing = False
+        if self.busy_flag is not None:
+            self.busy_flag.set()
+
+    def _note_busy(self):
+        """Record how long the finished refresh kept the panel busy"""
+        mode = self._busy_mode
+        if mode is not None:
+            self._busy_mode = None
+            ms = utime.ticks_diff(self._busy_end, self._busy_start)
+            self.busy_ms[mode] = ms
+            self.last_busy_ms = ms
+
+    def refresh_in_progress(self):
         """
-        print("e-Paper busy")
-        while(self.digital_read(self.busy_pin) == 1):      #  LOW: idle, HIGH: busy
-            self.delay_ms(100)
-        print("e-Paper busy release")
+        Whether the panel is still running a refresh (non-blocking)
+
+        Returns:
+            True until the BUSY interrupt has signalled completion
+        """
+        if self._refreshing:
+            return True
+        self._note_busy()
+        return False
+
+    def wait_busy(self):
+        """Wait for a started refresh to finish (sleeps between checks)"""
+        start = utime.ticks_ms()
+        while self._refreshing:
+            if utime.ticks_diff(utime.ticks_ms(), start) > BUSY_TIMEOUT_MS and \
+                    self.digital_read(self.busy_pin) == 0:
+                # Edge missed - the pin says the panel is idle
+                self._busy_end = utime.ticks_ms()
+                self._refreshing = False
+                break
+            utime.sleep_ms(1)
+        self._note_busy()
+
+    def start_refresh(self, sequence, mode):
+        """
+        Start a display update without waiting for it
+
+        Args:
+            sequence: Display Update Control 2 value (0x22 data byte)
+            mode: Name the busy time is recorded under in busy_ms
+        """
+        self.send_command(0x22) # Display Update Control
+        self.send_data(sequence)
+        self.send_command(0x20) # Activate Display Update Sequence
+        # Armed after 0x20 - BUSY takes far longer than this to fall again
+        if self.busy_flag is not None:
+            self.busy_flag.clear()
+        self._busy_mode = mode
+        self._busy_start = utime.ticks_ms()
+        self._refreshing = True
 
     # =========================================================================
     # DISPLAY UPDATE CONTROL METHODS
@@ -227,195 +424,206 @@ class EPD_4in2:
 
     def TurnOnDisplay(self):
         """Standard full refresh (high quality, slower)"""
-        self.send_command(0x22) # Display Update Control
-        self.send_data(0xF7)
-        self.send_command(0x20) # Activate Display Update Sequence
-        self.ReadBusy()
+        self.start_refresh(0xF7, 'full')
+        if self.wait_after_refresh:
+            self.ReadBusy()
 
     def TurnOnDisplay_Fast(self):
         """Fast refresh mode (lower quality, faster)"""
-        self.send_command(0x22) # Display Update Control
-        self.send_data(0xC7)
-        self.send_command(0x20) # Activate Display Update Sequence
-        self.ReadBusy()
+        self.start_refresh(0xC7, 'fast')
+        if self.wait_after_refresh:
+            self.ReadBusy()
 
     def TurnOnDisplay_Partial(self):
         """Partial update mode (update only changed areas)"""
-        self.send_command(0x22) # Display Update Control
-        self.send_data(0xFF)
-        self.send_command(0x20) # Activate Display Update Sequence
-        self.ReadBusy()
+        self.start_refresh(0xFF, 'partial')
+        if self.wait_after_refresh:
+            self.ReadBusy()
+
+    def TurnOnDisplay_Typing(self):
+        """Partial update on the loaded typing waveform (no OTP LUT load)"""
+        self.start_refresh(0xCF, 'typing')
+        if self.wait_after_refresh:
+            self.ReadBusy()
 
     def TurnOnDisplay_4GRAY(self):
         """4-grayscale mode refresh"""
-        self.send_command(0x22) # Display Update Control
-        self.send_data(0xCF)
-        self.send_command(0x20) # Activate Display Update Sequence
-        self.ReadBusy()
+        self.start_refresh(0xCF, '4gray')
+        if self.wait_after_refresh:
+            self.ReadBusy()
+
+    def SetWindow(self, x_start, x_end, y_start, y_end):
+        """
+        Set the RAM window (0x44/0x45) and put the RAM cursor (0x4E/0x4F)
+        at its top-left corner
+
+        Args:
+            x_start, x_end: Byte columns, end inclusive (0..0x31)
+            y_start, y_end: Pixel rows, end inclusive (0..0x12B)
+        """
+        epd_sequence.fill_window(self._window, x_start, x_end, y_start, y_end)
+        self.send_sequence(self._window_seq)
 
     # =========================================================================
     # INITIALIZATION MODES
     # =========================================================================
 
-    def EPD_4IN2_V2_Init(self):
+    def EPD_4IN2_V2_Init(self, force=False):
         """
         Standard initialization sequence for EPD 4.2" V2
         Sets up display registers for normal operation
+        Skipped if the controller is already set up for it
+
+        Args:
+            force: Reset and initialize even so
         """
+        if not force and not self.state.need_init(FULL):
+            return  # Full-frame updates put back registers a partial replaced
+
         # EPD hardware init start
+        self.shadow.forget()  # Controller RAM is lost on reset
         self.reset()
         self.ReadBusy()
 
         self.send_command(0x12) # SWRESET
         self.ReadBusy()
 
-        self.send_command(0x21)  # Display update control
-        self.send_data(0x40)
-        self.send_data(0x00)
+        self.send_sequence(MONO_START)  # Display update control, border
 
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x05)
-
-        self.send_command(0x11)  # data  entry  mode
-        self.send_data(0x03)  # X-mode
-
-        self.send_command(0x44)
-        self.send_data(0x00)
-        self.send_data(0x31)
-
-        self.send_command(0x45)
-        self.send_data(0x00)
-        self.send_data(0x00)
-        self.send_data(0x2B)
-        self.send_data(0x01)
-
-        self.send_command(0x4E)
-        self.send_data(0x00)
-
-        self.send_command(0x4F)
-        self.send_data(0x00)
-        self.send_data(0x00)
+        self.send_sequence(FULL_WINDOW)  # Data entry mode, whole-panel window
         self.ReadBusy()
+        self.state.initialised(FULL)
 
-    def EPD_4IN2_V2_Init_Fast(self, mode):
+    def EPD_4IN2_V2_Init_Fast(self, mode, force=False):
         """
         Fast refresh initialization
+        Skipped if the controller is already set up for this speed, which
+        saves the reset, temperature load and BUSY waits
+
         Args:
             mode: Seconds_1_5S or Seconds_1S for refresh speed
+            force: Reset and initialize even so
         """
+        if not force and not self.state.need_init(FAST, mode):
+            return  # Full-frame updates put back registers a partial replaced
+
+        self.shadow.forget()  # Controller RAM is lost on reset
         self.reset()
         self.ReadBusy()
 
         self.send_command(0x12) # SWRESET
         self.ReadBusy()
 
-        self.send_command(0x21)  # Display update control
-        self.send_data(0x40)
-        self.send_data(0x00)
-
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x05)
+        self.send_sequence(MONO_START)  # Display update control, border
 
+        # Temperature setting for the refresh speed, then load it
         if mode == self.Seconds_1_5S:
-            self.send_command(0x1A)
-            self.send_data(0x6E)
+            self.send_sequence(FAST_1_5S)
         else :
-            self.send_command(0x1A)
-            self.send_data(0x5A)
-
-        self.send_command(0x22)  # Load temperature value
-        self.send_data(0x91)
-        self.send_command(0x20)
+            self.send_sequence(FAST_1S)
         self.ReadBusy()
 
-        self.send_command(0x11)  # data  entry  mode
-        self.send_data(0x03)  # X-mode
-
-        self.send_command(0x44)
-        self.send_data(0x00)
-        self.send_data(0x31)
-
-        self.send_command(0x45)
-        self.send_data(0x00)
-        self.send_data(0x00)
-        self.send_data(0x2B)
-        self.send_data(0x01)
-
-        self.send_command(0x4E)
-        self.send_data(0x00)
-
-        self.send_command(0x4F)
-        self.send_data(0x00)
-        self.send_data(0x00)
+        self.send_sequence(FULL_WINDOW)  # Data entry mode, whole-panel window
         self.ReadBusy()
+        self.state.initialised(FAST, mode)
 
     def Lut(self):
         """Load Look-Up Table for 4-gray mode waveforms"""
-        self.send_command(0x32)
-        for i in range(227):
-            self.send_data(self.LUT_ALL[i])
-
-        self.send_command(0x3F)
-        self.send_data(self.LUT_ALL[227])
-
-        self.send_command(0x03)
-        self.send_data(self.LUT_ALL[228])
-
-        self.send_command(0x04)
-        self.send_data(self.LUT_ALL[229])
-        self.send_data(self.LUT_ALL[230])
-        self.send_data(self.LUT_ALL[231])
+        self.send_sequence(LUT_4GRAY)
 
-        self.send_command(0x2c)
-        self.send_data(self.LUT_ALL[232])
-
-    def EPD_4IN2_V2_Init_4Gray(self):
+    def EPD_4IN2_V2_Init_4Gray(self, force=False):
         """
         Initialize EPD for 4-grayscale mode
         Enables black, white, and 2 shades of gray
+        Skipped if the gray LUT is already loaded
+
+        Args:
+            force: Reset and initialize even so
         """
+        if not force and not self.state.need_init(GRAY4):
+            return
+
         # EPD hardware init start
+        self.shadow.forget()  # Controller RAM is lost on reset
         self.reset()
         self.ReadBusy()
 
         self.send_command(0x12) # SWRESET
         self.ReadBusy()
 
-        self.send_command(0x21)  # Display update control
-        self.send_data(0x00)
-        self.send_data(0x00)
+        self.send_sequence(GRAY_START)  # Update control, border, BTST
 
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x03)
+        self.Lut()
 
-        self.send_command(0x0C)  # BTST
-        self.send_data(0x8B) # 8B
-        self.send_data(0x9C) # 9C
-        self.send_data(0xA4) # 96 A4
-        self.send_data(0x0F) # 0F
+        self.send_sequence(FULL_WINDOW)  # Data entry mode, whole-panel window
+        self.ReadBusy()
+        self.state.initialised(GRAY4)
 
-        self.Lut()
+    def leave_partial(self):
+        """
+        Put back the black/white update registers a partial update replaced
+        (needed before a full-frame refresh, not a reset)
+        A partial update also replaces the LUT, so on a fast base the fast
+        temperature and LUT are loaded again (0xC7 loads none). If the
+        typing waveform is still loaded the base mode is initialized again,
+        as it changed the voltages too
+        """
+        state = self.state
+        if state.custom_lut:
+            mode, speed = state.base
+            if mode == FAST:
+                self.EPD_4IN2_V2_Init_Fast(speed, force=True)
+            else:
+                self.EPD_4IN2_V2_Init(force=True)
+        elif state.leave_partial():
+            self.send_sequence(MONO_START)
+            mode, speed = state.base
+            if mode == FAST:
+                if speed == self.Seconds_1_5S:
+                    self.send_sequence(FAST_1_5S)
+                else:
+                    self.send_sequence(FAST_1S)
+                self.ReadBusy()
 
-        self.send_command(0x11)  # data  entry  mode
-        self.send_data(0x03)  # X-mode
+    # =========================================================================
+    # PARTIAL WAVEFORM PROFILES
+    # =========================================================================
 
-        self.send_command(0x44)
-        self.send_data(0x00)
-        self.send_data(0x31)
+    def set_partial_lut(self, lut):
+        """
+        Supply the shortened waveform used by the typing profile
 
-        self.send_command(0x45)
-        self.send_data(0x00)
-        self.send_data(0x00)
-        self.send_data(0x2B)
-        self.send_data(0x01)
+        Args:
+            lut: 233 values laid out as LUT_ALL (waveform, then voltages),
+                 or None to drop it (typing falls back to the built-in
+                 waveform)
 
-        self.send_command(0x4E)
-        self.send_data(0x00)
+        Raises:
+            ValueError: The LUT has the wrong length; the previous one is kept
+        """
+        if lut is None:
+            self._typing_lut = None
+        else:
+            self._typing_lut = epd_sequence.lut_records(bytes(lut))
+        self.set_partial_profile(self.partial_profile)
 
-        self.send_command(0x4F)
-        self.send_data(0x00)
-        self.send_data(0x00)
-        self.ReadBusy()
+    def set_partial_profile(self, profile):
+        """
+        Choose the waveform for the partial refreshes that follow
+
+        Args:
+            profile: PROFILE_TYPING (short waveform, for fast keystroke
+                     feedback) or PROFILE_READING (built-in waveform)
+
+        Returns:
+            The profile in effect - PROFILE_READING if no typing LUT has
+            been supplied
+        """
+        if profile == PROFILE_TYPING and self._typing_lut is None:
+            profile = PROFILE_READING  # Safe fallback: built-in waveform
+        self.partial_profile = profile
+        self.partial_ghosting = TYPING_GHOSTING if profile == PROFILE_TYPING else 1
+        return profile
 
     # =========================================================================
     # DISPLAY DRAWING METHODS
@@ -432,15 +640,17 @@ class EPD_4in2:
         else :
             wide =  self.width // 8 + 1
 
+        self.leave_partial()
+
+        # Each plane streamed from the constant white chunk in one CS frame
         self.send_command(0x24)
-        for i in range(0, wide):
-            self.send_data1([0xff] * high)
+        self.send_fill(WHITE_CHUNK, wide * high)
 
         self.send_command(0x26)
-        for i in range(0, wide):
-            self.send_data1([0xff] * high)
+        self.send_fill(WHITE_CHUNK, wide * high)
 
         self.TurnOnDisplay()
+        self.shadow.fill(0xff)
 
     def EPD_4IN2_V2_Display(self, Image):
         """
@@ -448,6 +658,7 @@ class EPD_4in2:
         Args:
             Image: bytearray of image data (width*height/8 bytes)
         """
+        self.leave_partial()
         self.send_command(0x24)
         self.send_data1(Image)
 
@@ -455,6 +666,7 @@ class EPD_4in2:
         self.send_data1(Image)
 
         self.TurnOnDisplay()
+        self.shadow.commit(Image)
 
     def EPD_4IN2_V2_Display_Fast(self, image):
         """
@@ -462,6 +674,7 @@ class EPD_4in2:
         Args:
             image: bytearray of image data (width*height/8 bytes)
         """
+        self.leave_partial()
         self.send_command(0x24)
         self.send_data1(image)
 
@@ -469,120 +682,88 @@ class EPD_4in2:
         self.send_data1(image)
 
         self.TurnOnDisplay_Fast()
+        self.shadow.commit(image)
 
-    def EPD_4IN2_V2_PartialDisplay(self, Image):
+    def EPD_4IN2_V2_PartialDisplay(self, Image, x=0, y=0, w=None, h=None):
         """
         Partial update - refresh only changed regions
-        Args:
-            Image: bytearray of image data for changed region
-        """
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x80)
-
-        self.send_command(0x21)  # Display update control
-        self.send_data(0x00)
-        self.send_data(0x00)
-
-        self.send_command(0x3C)  # BorderWavefrom
-        self.send_data(0x80)
-
-        self.send_command(0x44)
-        self.send_data(0x00)
-        self.send_data(0x31)
-
-        self.send_command(0x45)
-        self.send_data(0x00)
-        self.send_data(0x00)
-        self.send_data(0x2B)
-        self.send_data(0x01)
+        Only the rows of the dirty rectangle that differ from the last
+        frame sent go over SPI; the rest of the controller RAM still holds
+        what is on the glass. Nothing is sent if no row differs.
 
-        self.send_command(0x4E)
-        self.send_data(0x00)
+        Args:
+            Image: bytearray of the full frame (width*height/8 bytes)
+            x, y: Top-left of the dirty rectangle in pixels
+            w, h: Its size in pixels (default: to the panel edge). X is
+                  widened to whole bytes
 
-        self.send_command(0x4F)
-        self.send_data(0x00)
-        self.send_data(0x00)
+        Returns:
+            (first, end) rows refreshed, None if the frame was unchanged
+        """
+        if w is None:
+            w = self.width - x
+        if h is None:
+            h = self.height - y
+        x_start = x >> 3
+        x_end = (x + w + 7) >> 3  # Exclusive
+
+        rows = self.shadow.diff(Image, x_start, x_end, y, y + h)
+        if rows is None:
+            return None
+        y, y_end = rows
+        h = y_end - y
+        full = (x_start == 0 and y == 0 and
+                x_end == self.width // 8 and h == self.height)
+
+        # Typing waveform only on top of a black/white init (not 4-gray)
+        typing = self.partial_profile == PROFILE_TYPING and self.state.base is not None
+        if typing and not self.state.custom_lut:
+            self.send_sequence(self._typing_lut)  # Replaced by each 0xFF update
+
+        self.send_sequence(PARTIAL_START)  # Border, display update control
+        self.state.partial(typing)
+
+        self.SetWindow(x_start, x_end - 1, y, y + h - 1)
 
         self.send_command(0x24) # WRITE_RAM
-        self.send_data1(Image)
-        self.TurnOnDisplay_Partial()
+        self.send_window(Image, x_start, x_end, y, y + h)
+        self.shadow.commit(Image, x_start, x_end, y, y + h)
+
+        if not full:
+            # Full-frame writes (Display, Clear) rely on the whole window.
+            # Restored before the update starts, which may not be waited for
+            self.SetWindow(0, self.width // 8 - 1, 0, self.height - 1)
+        if typing:
+            self.TurnOnDisplay_Typing()
+        else:
+            self.TurnOnDisplay_Partial()
+        return rows
 
 
     def EPD_4IN2_V2_4GrayDisplay(self, Image):
         """
         Display 4-grayscale image
-        Converts 2-bit per pixel format to dual-buffer format
+        Converts 2-bit per pixel format to dual-buffer format with the
+        gray4 lookup table, one plane at a time in a reused buffer, and
+        sends each plane in one SPI write
         Args:
             Image: bytearray with 2-bit grayscale data (width*height/4 bytes)
         """
+        if self._gray_plane is None:
+            # Only allocated once something grayscale is shown
+            self._gray_plane = bytearray(self.width * self.height // 8)
+        plane = self._gray_plane
+
+        convert_plane(Image, plane, RAM_NEW)
         self.send_command(0x24)
-        for i in range(0, 15000):
-            temp3=0
-            for j in range(0, 2):
-                temp1 = Image[i*2+j]
-                for k in range(0, 2):
-                    temp2 = temp1&0x03
-                    if(temp2 == 0x03):
-                        temp3 |= 0x01   # white
-                    elif(temp2 == 0x00):
-                        temp3 |= 0x00   # black
-                    elif(temp2 == 0x02):
-                        temp3 |= 0x01   # gray1
-                    else:   # 0x01
-                        temp3 |= 0x00   # gray2
-                    temp3 <<= 1
-
-                    temp1 >>= 2
-                    temp2 = temp1&0x03
-                    if(temp2 == 0x03):   # white
-                        temp3 |= 0x01
-                    elif(temp2 == 0x00):   # black
-                        temp3 |= 0x00
-                    elif(temp2 == 0x02):
-                        temp3 |= 0x01   # gray1
-                    else:   # 0x01
-                        temp3 |= 0x00   # gray2
-
-                    if (( j!=1 ) | ( k!=1 )):
-                        temp3 <<= 1
-
-                    temp1 >>= 2
-            self.send_data(temp3)
+        self.send_data1(plane)
 
+        convert_plane(Image, plane, RAM_OLD)
         self.send_command(0x26)
-        for i in range(0, 15000):
-            temp3=0
-            for j in range(0, 2):
-                temp1 = Image[i*2+j]
-                for k in range(0, 2):
-                    temp2 = temp1&0x03
-                    if(temp2 == 0x03):
-                        temp3 |= 0x01   # white
-                    elif(temp2 == 0x00):
-                        temp3 |= 0x00   # black
-                    elif(temp2 == 0x02):
-                        temp3 |= 0x00   # gray1
-                    else:   # 0x01
-                        temp3 |= 0x01   # gray2
-                    temp3 <<= 1
-
-                    temp1 >>= 2
-                    temp2 = temp1&0x03
-                    if(temp2 == 0x03):   # white
-                        temp3 |= 0x01
-                    elif(temp2 == 0x00):   # black
-                        temp3 |= 0x00
-                    elif(temp2 == 0x02):
-                        temp3 |= 0x00   # gray1
-                    else:   # 0x01
-                        temp3 |= 0x01   # gray2
-
-                    if (( j!=1 ) | ( k!=1 )):
-                        temp3 <<= 1
-
-                    temp1 >>= 2
-            self.send_data(temp3)
+        self.send_data1(plane)
+
         self.TurnOnDisplay_4GRAY()
+        self.shadow.forget()  # The glass no longer matches a 1-bit frame
 
     def Sleep(self):
         """
@@ -591,3 +772,4 @@ class EPD_4in2:
         """
         self.send_command(0x10)  # DEEP_SLEEP
         self.send_data(0x01)
+        self.state.sleep()  # Only a reset (the next init) wakes it
@@ -10,23 +10,35 @@ preventing UI blocking during long e-ink refresh operations (typically 300-2000m
 import uasyncio as asyncio
 import utime
 
+from refresh_scheduler import PARTIAL, FULL
+
 
 async def wait_for_busy_async(epd, check_interval_ms=50):
     """
     Asynchronously wait for EPD busy pin to go low (ready)
 
     The EPD busy pin is HIGH when display is updating, LOW when idle.
-    This function polls the pin and yields control between checks.
+    A refresh started with epd.start_refresh() is awaited on the driver's
+    ThreadSafeFlag, set by the BUSY falling-edge interrupt, so the task
+    resumes as soon as the panel is done. Otherwise the pin is polled,
+    yielding control between checks.
 
     Args:
         epd: EPD_4in2 display object
-        check_interval_ms: How often to check busy pin (default 50ms)
+        check_interval_ms: How often to check busy pin when polling
+                           (default 50ms)
 
     Workflow:
-        1. Check busy pin
-        2. If HIGH (busy), sleep for interval and repeat
-        3. If LOW (ready), return
+        1. Refresh in progress: wait for the BUSY interrupt flag
+        2. Otherwise check busy pin
+        3. If HIGH (busy), sleep for interval and repeat
+        4. If LOW (ready), return
     """
+    flag = epd.busy_flag
+    if flag is not None and epd.refresh_in_progress():
+        await flag.wait()
+        epd.refresh_in_progress()  # Records the busy time
+        return
     while epd.digital_read(epd.busy_pin) == 1:  # HIGH = busy, LOW = idle
         await asyncio.sleep_ms(check_interval_ms)
 
@@ -93,6 +105,7 @@ async def refresh_partial_async(epd, buffer=None):
 
     await send_command_async(epd, 0x3C)  # BorderWavefrom
     await send_data_async(epd, 0x80)
+    epd.state.partial()
 
     # Set display window (full screen)
     await send_command_async(epd, 0x44)
@@ -117,9 +130,7 @@ async def refresh_partial_async(epd, buffer=None):
     await send_data_async(epd, buffer)
 
     # Trigger display update
-    await send_command_async(epd, 0x22)  # Display Update Control
-    await send_data_async(epd, 0xFF)     # Partial update sequence
-    await send_command_async(epd, 0x20)  # Activate Display Update Sequence
+    epd.start_refresh(0xFF, 'partial')  # Partial update sequence (0x22, 0x20)
 
     # Wait for display to finish (async - yields to other tasks)
     await wait_for_busy_async(epd)
@@ -148,6 +159,7 @@ async def refresh_full_async(epd, buffer=None):
     """
     if buffer is None:
         buffer = epd.buffer_1Gray
+    epd.leave_partial()  # Black/white registers back if a partial changed them
 
     # Write to RAM buffer 1
     await send_command_async(epd, 0x24)
@@ -158,9 +170,7 @@ async def refresh_full_async(epd, buffer=None):
     await send_data_async(epd, buffer)
 
     # Trigger full display update
-    await send_command_async(epd, 0x22)  # Display Update Control
-    await send_data_async(epd, 0xF7)     # Full update sequence
-    await send_command_async(epd, 0x20)  # Activate Display Update Sequence
+    epd.start_refresh(0xF7, 'full')  # Full update sequence (0x22, 0x20)
 
     # Wait for display to finish (async - yields to other tasks)
     await wait_for_busy_async(epd)
@@ -184,6 +194,7 @@ async def refresh_fast_async(epd, buffer=None):
     """
     if buffer is None:
         buffer = epd.buffer_1Gray
+    epd.leave_partial()  # Black/white registers back if a partial changed them
 
     # Write to both RAM buffers
     await send_command_async(epd, 0x24)
@@ -193,9 +204,7 @@ async def refresh_fast_async(epd, buffer=None):
     await send_data_async(epd, buffer)
 
     # Trigger fast display update
-    await send_command_async(epd, 0x22)  # Display Update Control
-    await send_data_async(epd, 0xC7)     # Fast update sequence
-    await send_command_async(epd, 0x20)  # Activate Display Update Sequence
+    epd.start_refresh(0xC7, 'fast')  # Fast update sequence (0x22, 0x20)
 
     # Wait for display to finish (async)
     await wait_for_busy_async(epd)
@@ -275,16 +284,19 @@ class DisplayQueue:
     excessive refresh commands during rapid typing.
     """
 
-    def __init__(self, epd, throttle_ms=500):
+    def __init__(self, epd, throttle_ms=500, scheduler=None):
         """
         Initialize display queue
 
         Args:
             epd: EPD_4in2 display object
             throttle_ms: Minimum time between refreshes (default 500ms)
+            scheduler: Optional RefreshScheduler choosing partial or fast
+                       full refreshes for 'partial' and 'page' requests
         """
         self.epd = epd
         self.throttle_ms = throttle_ms
+        self.scheduler = scheduler
         self.queue = asyncio.Queue(maxsize=1)
         self.last_refresh_time = 0
         self.pending_refresh = False
@@ -294,7 +306,8 @@ class DisplayQueue:
         Request a display refresh
 
         Args:
-            refresh_type: 'partial', 'full', or 'fast'
+            refresh_type: 'partial', 'page' (different content), 'full',
+                          or 'fast'
             buffer: Optional buffer to use
 
         Returns:
@@ -328,7 +341,17 @@ class DisplayQueue:
                     # Wait for throttle period to expire
                     await asyncio.sleep_ms(self.throttle_ms - elapsed)
 
+                # Partial unless ghosting calls for a fast full refresh
+                scheduler = self.scheduler
+                if refresh_type == 'partial' or refresh_type == 'page':
+                    if scheduler is None:
+                        mode = PARTIAL if refresh_type == 'partial' else FULL
+                    else:
+                        mode = scheduler.choose(None, refresh_type == 'page')
+                    refresh_type = 'partial' if mode == PARTIAL else 'fast'
+
                 # Perform refresh
+                start = utime.ticks_ms()
                 if refresh_type == 'partial':
                     await refresh_partial_async(self.epd, buffer)
                 elif refresh_type == 'full':
@@ -337,6 +360,9 @@ class DisplayQueue:
                     await refresh_fast_async(self.epd, buffer)
 
                 self.last_refresh_time = utime.ticks_ms()
+                if scheduler is not None:
+                    scheduler.record(PARTIAL if refresh_type == 'partial' else FULL, None,
+                                     utime.ticks_diff(self.last_refresh_time, start))
 
             except Exception as e:
                 print(f"Display refresh error: {e}")
@@ -6,11 +6,17 @@ For Raspberry Pi Pico 2W e-ink typewriter investigation
 This module is shared between main_threaded.py and main_async.py
 """
 
+from array import array
+
 # Display constants
 CHAR_WIDTH = 8
 CHAR_HEIGHT = 15
 MARGIN_LEFT = 5
 MARGIN_TOP = 5
+# Left margin that puts every text column on a byte boundary of the
+# MONO_HLSB frame, so glyphs can be copied in as whole bytes (GlyphAtlas).
+# Same number of columns per line as MARGIN_LEFT on the 400px panel.
+ALIGNED_MARGIN_LEFT = 8
 
 
 class TextLayout:
@@ -219,6 +225,456 @@ class TextLayout:
         return ''.join(text)
 
 
+class LayoutEngine:
+    """
+    Stateful word-wrap engine that caches the span of every wrapped line
+
+    Produces the same lines and pages as TextLayout.calculate_lines() and
+    TextLayout.get_screen_pages(), but keeps each line as a (start, end)
+    offset pair into the text. After an edit it re-wraps from the line the
+    edit dirtied and stops as soon as a new line start lines up with an old
+    one, so the cost of a refresh follows the size of the edit rather than
+    the length of the page.
+
+    Spans are stored in array('H') (2 bytes per offset) rather than one
+    tuple per glyph. The font is monospaced, so a span is all that is
+    needed to draw a line with a single framebuf.text() call.
+
+    Usage:
+        engine = LayoutEngine(max_w, max_h)
+        engine.update(text)                # full wrap
+        engine.edit(pos, removed, inserted)
+        engine.update(new_text)            # re-wraps only around pos
+    """
+
+    def __init__(self, max_width, max_height, margin_left=MARGIN_LEFT):
+        """
+        Args:
+            max_width: Maximum width in pixels
+            max_height: Maximum height in pixels
+            margin_left: X of the first column (ALIGNED_MARGIN_LEFT for
+                         byte-aligned glyphs)
+        """
+        self.max_width = max_width
+        self.max_height = max_height
+        self.margin_left = margin_left
+        self.lines_per_page = max(1, (max_height - MARGIN_TOP) // CHAR_HEIGHT)
+        # Characters per line (fixed-pitch font)
+        self.cols = max(1, (max_width - margin_left) // CHAR_WIDTH)
+        self.text = ""
+        self._typecode = 'H'
+        self.starts = array('H')  # Offset of the first character of each line
+        self.ends = array('H')    # Offset just past the last drawn character
+        self.lines_wrapped = 0  # Lines wrapped by the last update (stats)
+        self._wrapped_to = 0    # Offset where a partial layout stopped
+        self._valid = False
+        self._dirty_start = None
+        self._dirty_end = 0
+        self._delta = 0
+
+    # -------------------------------------------------------------------------
+    # Edit tracking
+    # -------------------------------------------------------------------------
+
+    def edit(self, pos, removed=0, inserted=0):
+        """
+        Record an edit made to the text since the last update()
+
+        Several edits may be recorded between updates (e.g. a burst of
+        typing before the refresh pause expires).
+
+        Args:
+            pos: Offset where the edit happened
+            removed: Number of characters removed at pos
+            inserted: Number of characters inserted at pos
+        """
+        delta = inserted - removed
+        if self._dirty_start is None:
+            self._dirty_start = pos
+            self._dirty_end = pos + inserted
+        else:
+            end = self._dirty_end
+            if end >= pos + removed:
+                end += delta
+            elif end > pos:
+                end = pos + inserted
+            if pos < self._dirty_start:
+                self._dirty_start = pos
+            self._dirty_end = max(end, pos + inserted)
+        self._delta += delta
+
+    def invalidate(self):
+        """Force a full re-wrap on the next update() (new text loaded)"""
+        self._valid = False
+        self._dirty_start = None
+        self._delta = 0
+
+    # -------------------------------------------------------------------------
+    # Wrapping
+    # -------------------------------------------------------------------------
+
+    def _wrap_line(self, text, i, n):
+        """
+        Wrap one line starting at offset i
+
+        Same rules as TextLayout.calculate_lines(): spaces that do not fit
+        are dropped, words that do not fit move to the next line and words
+        longer than a line are hard-broken. The font is fixed-pitch, so a
+        line holds a constant number of columns and the break point is
+        found with str.find()/rfind() over the line's slice instead of
+        walking it one character at a time.
+
+        Returns:
+            (end, next_start, by_newline) where end is just past the last
+            drawn character and next_start is where the next line begins
+        """
+        cols = self.cols
+        limit = i + cols  # Everything in [i, limit) fits if it is one run
+
+        # Newline within reach: the whole run before it fits
+        nl = text.find('\n', i, limit + 1)
+        if nl >= 0:
+            return nl, nl + 1, True
+        if limit >= n:
+            return n, n, False
+
+        if text[limit] == ' ':
+            # Line is exactly full; spaces past the edge are dropped, and a
+            # newline straight after them still ends this line
+            j = limit + 1
+            while j < n and text[j] == ' ':
+                j += 1
+            if j < n and text[j] == '\n':
+                return limit, j + 1, True
+            return limit, j, False
+
+        # A word crosses the right edge - find where it starts
+        word_start = text.rfind(' ', i, limit) + 1
+        if word_start <= i:
+            # Word fills the line from its start - hard break
+            return limit, limit, False
+
+        # Move the word down unless it is longer than a whole line, in
+        # which case it is hard-broken starting on this line
+        bound = word_start + cols
+        if bound < n and text.find(' ', limit, bound + 1) < 0 and \
+                text.find('\n', limit, bound + 1) < 0:
+            return limit, limit, False
+        return word_start, word_start, False
+
+    def _rewrap_from(self, text, line_index, stop_after):
+        """
+        Re-wrap from the start of line_index until lines re-converge
+
+        Args:
+            text: New text
+            line_index: First line to re-wrap
+            stop_after: New-text offset past which old lines may be reused
+
+        Returns:
+            (new_starts, new_ends) for the whole text
+        """
+        n = len(text)
+        delta = self._delta
+        old_starts = self.starts
+        old_ends = self.ends
+        starts = old_starts[:line_index]
+        ends = old_ends[:line_index]
+        i = old_starts[line_index]
+        k = line_index + 1  # Old line to test for convergence
+        wrapped = 0
+
+        while i < n:
+            end, next_start, by_newline = self._wrap_line(text, i, n)
+            wrapped += 1
+            if by_newline or end > i:
+                starts.append(i)
+                ends.append(end)
+            i = next_start
+
+            if i < n and i >= stop_after:
+                # Skip old lines that start before the shifted position
+                old_pos = i - delta
+                while k < len(old_starts) and old_starts[k] < old_pos:
+                    k += 1
+                if k < len(old_starts) and old_starts[k] == old_pos:
+                    # Converged - the rest of the old layout still holds
+                    for j in range(k, len(old_starts)):
+                        starts.append(old_starts[j] + delta)
+                        ends.append(old_ends[j] + delta)
+                    break
+
+        self.lines_wrapped += wrapped
+        return starts, ends
+
+    def _extend(self, max_lines=None):
+        """
+        Continue wrapping from where the last (partial) layout stopped
+
+        Args:
+            max_lines: Stop once this many lines exist (None: to the end)
+        """
+        text = self.text
+        n = len(text)
+        starts = self.starts
+        ends = self.ends
+        i = self._wrapped_to
+        wrapped = 0
+
+        while i < n:
+            if max_lines is not None and len(starts) >= max_lines:
+                break
+            end, next_start, by_newline = self._wrap_line(text, i, n)
+            wrapped += 1
+            if by_newline or end > i:
+                starts.append(i)
+                ends.append(end)
+            i = next_start
+
+        self._wrapped_to = i
+        self.lines_wrapped += wrapped
+
+    def _ensure_page(self, page_num):
+        """Make sure lines up to the end of page_num have been wrapped"""
+        if self._wrapped_to < len(self.text):
+            self._extend((page_num + 1) * self.lines_per_page)
+
+    def _ensure_all(self):
+        """Finish a partial layout"""
+        if self._wrapped_to < len(self.text):
+            self._extend()
+
+    def update(self, text, page_num=None):
+        """
+        Bring the cached layout up to date with text
+
+        With page_num, wrapping stops once that screen page is filled, so
+        showing the first screen of a long note costs one screen of work.
+        The rest is wrapped on demand (page_count(), later pages).
+
+        Args:
+            text: Current text (str)
+            page_num: Only lay out through this screen page (optional)
+
+        Returns:
+            Number of wrapped lines so far
+        """
+        self.lines_wrapped = 0
+        max_lines = None if page_num is None else (page_num + 1) * self.lines_per_page
+
+        if self._valid and self._dirty_start is None and text == self.text:
+            # Unchanged - at most resume a partial layout
+            if self._wrapped_to < len(text):
+                self._extend(max_lines)
+            return len(self.starts)
+
+        # 16-bit offsets cover any page the editor holds; fall back to
+        # 32-bit for a pathologically long one
+        typecode = 'H' if len(text) <= 0xFFFF else 'L'
+        incremental = (self._valid and self._dirty_start is not None and
+                       len(self.starts) > 0 and
+                       self._wrapped_to == len(self.text) and
+                       len(text) == len(self.text) + self._delta and
+                       typecode == self._typecode)
+
+        if incremental:
+            ds = self._dirty_start
+            # Back up to the start of the word containing the edit: a word
+            # hard-broken over several lines is decided where it begins
+            word_start = max(text.rfind(' ', 0, ds), text.rfind('\n', 0, ds)) + 1
+            line = self._line_at(word_start)
+            # The previous line may pull the first word back up
+            line = max(0, line - 1)
+            self.starts, self.ends = self._rewrap_from(text, line, self._dirty_end)
+            self.text = text
+            self._wrapped_to = len(text)
+        else:
+            self._typecode = typecode
+            self.starts = array(typecode)
+            self.ends = array(typecode)
+            self.text = text
+            self._wrapped_to = 0
+            self._extend(max_lines)
+
+        self._valid = True
+        self._dirty_start = None
+        self._delta = 0
+        return len(self.starts)
+
+    def _line_at(self, pos):
+        """Index of the last line starting at or before pos (binary search)"""
+        starts = self.starts
+        lo, hi = 0, len(starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if starts[mid] <= pos:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1 if lo > 0 else 0
+
+    # -------------------------------------------------------------------------
+    # Results (same formats as TextLayout)
+    # -------------------------------------------------------------------------
+
+    def line_count(self):
+        """Number of wrapped lines in the current layout"""
+        self._ensure_all()
+        return len(self.starts)
+
+    def page_count(self):
+        """
+        Number of screen pages, matching len(get_screen_pages())
+
+        Derived from the cached line count; a partial layout is finished
+        first (once - later calls are O(lines per page)).
+        """
+        self._ensure_all()
+        total = len(self.starts)
+        if total == 0:
+            return 1
+        lpp = self.lines_per_page
+        full = (total - 1) // lpp
+        # Like get_screen_pages(), a trailing page of only blank lines
+        # is not counted
+        for j in range(full * lpp, total):
+            if self.ends[j] > self.starts[j]:
+                return full + 1
+        return full if full else 1
+
+    def has_page(self, page_num):
+        """
+        Whether screen page page_num exists (page_num < page_count())
+
+        Wraps only as far as needed to answer, so a pager can ask whether
+        there is a next screen without laying out the rest of the text.
+        """
+        if page_num <= 0:
+            return True
+        lpp = self.lines_per_page
+        first = page_num * lpp
+        j = first
+        while True:
+            if j >= len(self.starts):
+                if self._wrapped_to >= len(self.text):
+                    return False
+                self._extend(j + 1)
+                continue
+            # A later line makes this an intermediate page; otherwise it
+            # needs a non-blank line of its own (as in get_screen_pages())
+            if j >= first + lpp or self.ends[j] > self.starts[j]:
+                return True
+            j += 1
+
+    def lines(self):
+        """Lines in calculate_lines() format: [[(x, char), ...], ...]"""
+        self._ensure_all()
+        text = self.text
+        result = []
+        for j in range(len(self.starts)):
+            x = self.margin_left
+            line = []
+            for ch in text[self.starts[j]:self.ends[j]]:
+                line.append((x, ch))
+                x += CHAR_WIDTH
+            result.append(line)
+        return result
+
+    def cursor_position(self, cursor_index):
+        """
+        Map a text offset to screen position using the cached line table
+
+        Replaces TextLayout.get_cursor_screen_pos(), which wrapped
+        text[:cursor_index] a second time on every refresh. A cursor just
+        after a newline is placed at the start of the following line.
+
+        Args:
+            cursor_index: Offset into the text passed to the last update()
+
+        Returns:
+            (x, y, page_num) tuple
+        """
+        self._ensure_all()
+        text = self.text
+        if cursor_index > len(text):
+            cursor_index = len(text)
+
+        row = self._line_at(cursor_index)
+        if row >= len(self.starts):
+            # No lines yet
+            row = 0
+            col = 0
+        elif cursor_index > 0 and text[cursor_index - 1] == '\n' and \
+                self.starts[row] != cursor_index:
+            # Empty last line after a trailing newline is not in the table
+            row += 1
+            col = 0
+        else:
+            # Characters are contiguous from the line start; spaces dropped
+            # at a wrap leave the cursor at the end of the drawn line
+            col = min(cursor_index, self.ends[row]) - self.starts[row]
+
+        lpp = self.lines_per_page
+        x = self.margin_left + col * CHAR_WIDTH
+        y = MARGIN_TOP + (row % lpp) * CHAR_HEIGHT
+        return x, y, row // lpp
+
+    def page_lines(self, page_num):
+        """
+        Lines of one screen page, ready for one framebuf.text() call each
+
+        Args:
+            page_num: Screen page (subpage) index
+
+        Returns:
+            List of (x, y, line_text) tuples, one per non-empty line
+        """
+        self._ensure_page(page_num)
+        text = self.text
+        starts = self.starts
+        ends = self.ends
+        lpp = self.lines_per_page
+        first = page_num * lpp
+        last = min(first + lpp, len(starts))
+        result = []
+        x = self.margin_left
+        y = MARGIN_TOP
+        for j in range(first, last):
+            if ends[j] > starts[j]:
+                result.append((x, y, text[starts[j]:ends[j]]))
+            y += CHAR_HEIGHT
+        return result
+
+    def page(self, page_num):
+        """
+        Characters of one screen page in get_screen_pages() format
+
+        Args:
+            page_num: Screen page (subpage) index
+
+        Returns:
+            List of (x, y, char) tuples
+        """
+        self._ensure_page(page_num)
+        text = self.text
+        lpp = self.lines_per_page
+        first = page_num * lpp
+        last = min(first + lpp, len(self.starts))
+        chars = []
+        y = MARGIN_TOP
+        for j in range(first, last):
+            x = self.margin_left
+            for ch in text[self.starts[j]:self.ends[j]]:
+                chars.append((x, y, ch))
+                x += CHAR_WIDTH
+            y += CHAR_HEIGHT
+        return chars
+
+    def screen_pages(self):
+        """All pages in get_screen_pages() format"""
+        return [self.page(p) for p in range(self.page_count())]
+
+
 class PageManager:
     """
     Manages the relationship between explicit pages and overflow subpages
@@ -312,6 +768,81 @@ class PageManager:
         return ''.join(result)
 
 
+class PageViewCache:
+    """
+    Session cache for read-only page view navigation
+
+    Keeps the note's PageStore for the session, and a LayoutEngine per page
+    keyed by (page index, content hash), so flipping back and forth through
+    a note wraps each page once. A saved page has new content and so a new
+    key; invalidate() drops everything when a note is deleted.
+    """
+
+    def __init__(self, max_width, max_height, max_layouts=8,
+                 margin_left=MARGIN_LEFT):
+        """
+        Args:
+            max_width: Maximum width in pixels
+            max_height: Maximum height in pixels (page view area)
+            max_layouts: Number of page layouts kept before the oldest goes
+            margin_left: X of the first text column
+        """
+        self.max_width = max_width
+        self.max_height = max_height
+        self.margin_left = margin_left
+        self.max_layouts = max_layouts
+        self._pages = None
+        self._layouts = {}
+        self._order = []  # Keys oldest first, for eviction
+        self.layouts_built = 0
+
+    def invalidate(self):
+        """Forget the note and its layouts"""
+        self._pages = None
+        self._layouts = {}
+        self._order = []
+
+    def pages(self, store):
+        """
+        Explicit pages of a note for this session
+
+        Args:
+            store: PageStore of the note
+
+        Returns:
+            The store (supports len() and indexing like a page list)
+        """
+        if store is not self._pages:
+            self.invalidate()
+            self._pages = store
+        return self._pages
+
+    def layout(self, page_index, page_text):
+        """
+        Memoized layout of one page
+
+        Args:
+            page_index: Explicit page number
+            page_text: Text of that page
+
+        Returns:
+            LayoutEngine holding (at least part of) the page's layout
+        """
+        key = (page_index, hash(page_text))
+        engine = self._layouts.get(key)
+        if engine is None:
+            if len(self._order) >= self.max_layouts:
+                del self._layouts[self._order.pop(0)]
+            engine = LayoutEngine(self.max_width, self.max_height,
+                                  self.margin_left)
+            self._layouts[key] = engine
+            self._order.append(key)
+            self.layouts_built += 1
+        # No-op when already laid out; guards against hash collisions
+        engine.update(page_text, 0)
+        return engine
+
+
 class KeyboardHelper:
     """Helper functions for keyboard input processing"""
 
@@ -0,0 +1,97 @@
+"""
+epd_mode.py - Which mode the 4.2" EPD controller is set up for
+Lets the driver skip an init (hardware reset, SWRESET, temperature or LUT
+load, BUSY waits) when the controller is already in the mode asked for
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+FULL = 'full'         # EPD_4IN2_V2_Init: standard black/white refresh
+FAST = 'fast'         # EPD_4IN2_V2_Init_Fast, 1.5s or 1s (kept as the speed)
+PARTIAL = 'partial'   # Border/update registers rewritten over the base mode
+GRAY4 = '4gray'       # EPD_4IN2_V2_Init_4Gray: gray LUT loaded
+SLEEP = 'sleep'       # Deep sleep; only a reset wakes the controller
+
+
+class ControllerState:
+    """
+    Controller mode as left by the last init, update or sleep command
+
+    Inits call need_init() first and initialised() once done; full-frame
+    updates call leave_partial() to learn whether the black/white
+    registers must be rewritten. A partial update replaces the LUT as well
+    (0xFF reloads the OTP partial waveform), which the full-frame 0xC7 of a
+    FAST base doesn't load back - so leaving partial there also reloads the
+    fast temperature and LUT. Neither needs a reset, unless a custom partial
+    waveform (with its own voltages) is loaded. None means unknown
+    (power-up, or a reset without an init after it).
+    """
+
+    def __init__(self):
+        self.mode = None          # One of the modes above, None if unknown
+        self.base = None          # (FULL or FAST, speed) of the last black/white init
+        self.custom_lut = False   # A custom waveform is in the LUT register
+        self.inits = 0            # Inits run (stats)
+        self.inits_avoided = 0    # Inits skipped as already done (stats)
+
+    def need_init(self, mode, speed=None):
+        """
+        Whether an init for mode has to run (counts the ones that don't)
+
+        Args:
+            mode: FULL, FAST or GRAY4
+            speed: Refresh speed of a FAST init
+        """
+        if mode == GRAY4:
+            loaded = self.mode == GRAY4
+        else:
+            loaded = (self.base == (mode, speed) and not self.custom_lut and
+                      (self.mode == mode or self.mode == PARTIAL))
+        if loaded:
+            self.inits_avoided += 1
+            return False
+        return True
+
+    def initialised(self, mode, speed=None):
+        """An init for mode (FULL, FAST or GRAY4) has run"""
+        self.mode = mode
+        self.base = None if mode == GRAY4 else (mode, speed)
+        self.custom_lut = False
+        self.inits += 1
+
+    def partial(self, custom_lut=False):
+        """
+        A partial update has set its registers
+
+        Args:
+            custom_lut: It runs on a custom waveform (False: the built-in
+                        one, reloaded from OTP by the update)
+        """
+        if self.base is not None:
+            self.mode = PARTIAL
+            self.custom_lut = custom_lut
+
+    def leave_partial(self):
+        """
+        Back to the base mode for a full-frame update
+
+        Returns:
+            True if partial-update registers have to be replaced with the
+            black/white ones first (on a FAST base, with the fast
+            temperature and LUT loaded again)
+        """
+        if self.mode == PARTIAL:
+            self.mode = self.base[0]
+            return True
+        return False
+
+    def sleep(self):
+        """Deep sleep entered"""
+        self.mode = SLEEP
+        self.base = None
+        self.custom_lut = False
+
+    def reset(self):
+        """Hardware reset - registers back to defaults"""
+        self.mode = None
+        self.base = None
+        self.custom_lut = False
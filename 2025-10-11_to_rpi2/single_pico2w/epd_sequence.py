@@ -0,0 +1,169 @@
+"""
+epd_sequence.py - Table-driven register writes for the 4.2" EPD controller
+Register sequences are encoded as bytes of (command, length, data...)
+records and sent one record per CS frame
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+LUT_BYTES = 233   # Waveform plus voltages, see lut_records()
+
+
+def encode(*commands):
+    """
+    Build a sequence blob
+
+    Args:
+        commands: (command, data) pairs, data being bytes or a list of ints
+
+    Returns:
+        bytes of (command, len(data), data...) records
+    """
+    blob = bytearray()
+    for command, data in commands:
+        if len(data) > 255:
+            raise ValueError("record data over 255 bytes")
+        blob.append(command)
+        blob.append(len(data))
+        blob.extend(bytes(data))
+    return bytes(blob)
+
+
+def records(blob):
+    """
+    Parse a sequence blob into (command, data) memoryview pairs
+
+    Args:
+        blob: bytes or bytearray of records; a bytearray can be rewritten
+              in place later and the views follow it (see fill_window())
+
+    Returns:
+        tuple of (1-byte command view, data view) pairs
+    """
+    view = memoryview(blob)
+    out = []
+    i = 0
+    n = len(blob)
+    while i < n:
+        if i + 2 > n or i + 2 + blob[i + 1] > n:
+            raise ValueError("truncated record at byte {}".format(i))
+        end = i + 2 + blob[i + 1]
+        out.append((view[i:i + 1], view[i + 2:end]))
+        i = end
+    return tuple(out)
+
+
+def stream(sequence, spi, dc, cs):
+    """
+    Send parsed records, each in its own CS-low transaction
+
+    Args:
+        sequence: Pairs from records()
+        spi: machine.SPI (anything with write())
+        dc: Data/command Pin (low for the command byte)
+        cs: Chip select Pin
+    """
+    for command, data in sequence:
+        dc.value(0)
+        cs.value(0)
+        spi.write(command)
+        if data:
+            dc.value(1)
+            spi.write(data)
+        cs.value(1)
+
+
+def lut_records(lut):
+    """
+    Register records loading a waveform LUT
+
+    Args:
+        lut: LUT_BYTES values laid out as display42.LUT_ALL: 227 bytes of
+             waveform (0x32), then gate level (0x3F), gate voltage (0x03),
+             source voltages (0x04, 3 bytes) and VCOM (0x2C)
+
+    Returns:
+        Parsed records, as from records()
+    """
+    if len(lut) != LUT_BYTES:
+        raise ValueError("LUT is {} bytes, not {}".format(len(lut), LUT_BYTES))
+    return records(encode(
+        (0x32, lut[:227]),
+        (0x3F, lut[227:228]),
+        (0x03, lut[228:229]),
+        (0x04, lut[229:232]),
+        (0x2C, lut[232:233]),
+    ))
+
+
+# =============================================================================
+# REGISTER TABLES
+# =============================================================================
+
+# Display update control and border, black/white modes
+MONO_START = records(encode(
+    (0x21, (0x40, 0x00)),              # Display update control
+    (0x3C, (0x05,)),                   # BorderWavefrom
+))
+
+# Fast refresh temperature, then load it (0x22 0x91, activate)
+FAST_1_5S = records(encode(
+    (0x1A, (0x6E,)),
+    (0x22, (0x91,)),
+    (0x20, ()),
+))
+FAST_1S = records(encode(
+    (0x1A, (0x5A,)),
+    (0x22, (0x91,)),
+    (0x20, ()),
+))
+
+# 4-gray: update control, border and booster soft start
+GRAY_START = records(encode(
+    (0x21, (0x00, 0x00)),
+    (0x3C, (0x03,)),
+    (0x0C, (0x8B, 0x9C, 0xA4, 0x0F)),  # BTST
+))
+
+# Data entry mode and the whole panel as RAM window, cursor at 0,0
+FULL_WINDOW = records(encode(
+    (0x11, (0x03,)),                   # Data entry mode: X-mode
+    (0x44, (0x00, 0x31)),
+    (0x45, (0x00, 0x00, 0x2B, 0x01)),
+    (0x4E, (0x00,)),
+    (0x4F, (0x00, 0x00)),
+))
+
+# Partial update border and update control
+PARTIAL_START = records(encode(
+    (0x3C, (0x80,)),                   # BorderWavefrom
+    (0x21, (0x00, 0x00)),              # Display update control
+    (0x3C, (0x80,)),
+))
+
+# RAM window and cursor, values filled in by fill_window()
+WINDOW_TEMPLATE = encode(
+    (0x44, (0, 0)),                    # X start, end (bytes)
+    (0x45, (0, 0, 0, 0)),              # Y start, end (low, high)
+    (0x4E, (0,)),                      # X cursor
+    (0x4F, (0, 0)),                    # Y cursor
+)
+
+
+def fill_window(blob, x_start, x_end, y_start, y_end):
+    """
+    Write window coordinates into a bytearray copy of WINDOW_TEMPLATE
+
+    Args:
+        blob: bytearray(WINDOW_TEMPLATE)
+        x_start, x_end: Byte columns, end inclusive
+        y_start, y_end: Pixel rows, end inclusive
+    """
+    blob[2] = x_start
+    blob[3] = x_end
+    blob[6] = y_start & 0xFF
+    blob[7] = y_start >> 8
+    blob[8] = y_end & 0xFF
+    blob[9] = y_end >> 8
+    blob[12] = x_start
+    blob[15] = y_start & 0xFF
+    blob[16] = y_start >> 8
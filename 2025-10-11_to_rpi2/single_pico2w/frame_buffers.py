@@ -0,0 +1,113 @@
+"""
+frame_buffers.py - Back and front frames shared by the two cores
+Core 0 draws into the back frame and publishes it; the display worker on
+Core 1 only ever sends the front frame
+For Raspberry Pi Pico 2W e-ink typewriter
+
+Without this, the worker streams epd.buffer_1Gray over SPI while Core 0
+may already be drawing the next keystroke into it, so a refresh can go
+out half drawn. publish() copies the finished back frame into the front
+frame under a lock the worker holds while sending. Core 0 keeps drawing
+into the back frame while a refresh is in flight and only waits if it
+publishes during the SPI transfer itself, never for the BUSY time.
+
+Publishing copies rather than swapping the two frames: the glyph atlas,
+row renderer and menus all draw through epd.image1Gray, and the row
+renderer relies on the frame still holding what it last drew. A 15KB
+slice copy costs well under a millisecond.
+
+In typewriter mode every keystroke publishes along with the rows it
+changed. Rows published while a refresh is in flight are merged into one
+pending band, which the worker takes together with the frame once the
+panel is free, so a burst of typing costs one refresh rather than a queue
+of them.
+
+An overlay (StatusBar) is copied over the front frame on every publish,
+so a status line or footer never has to be drawn into the back frame.
+"""
+
+import _thread
+
+
+class FrameBuffers:
+    """
+    A back frame for Core 0 and a front frame for the display worker
+
+    With double=False the worker sends the back frame directly (no
+    extra RAM, but frames can tear as they did before).
+    """
+
+    def __init__(self, back, double=True):
+        """
+        Args:
+            back: Frame bytearray Core 0 draws into (epd.buffer_1Gray)
+            double: Keep a front frame of the same size (len(back) more
+                    bytes of RAM, 15000 for the 4.2" panel)
+        """
+        self.back = back
+        self.front = bytearray(len(back)) if double else back
+        self.lock = _thread.allocate_lock()  # Held by the worker while sending front
+        self.pending = None # (x, y, w, h) published but not yet taken
+        self.overlay = None # Composited over the front frame (StatusBar)
+        self.published = 0  # Frames handed to the worker (stats)
+        self.waits = 0      # Publishes that waited for a send (stats)
+        self.coalesced = 0  # Publishes merged into a pending band (stats)
+
+    def double(self):
+        """True if the worker has a front frame of its own"""
+        return self.front is not self.back
+
+    def publish(self, region=None):
+        """
+        Hand the back frame to the worker
+
+        Waits only if the worker is sending the front frame right now.
+
+        Args:
+            region: (x, y, w, h) that changed, merged into the pending band
+                    for take_pending()
+
+        Returns:
+            True if region started a new pending band (the worker has to
+            be asked to refresh), False if it joined one already asked for
+        """
+        lock = self.lock
+        if not lock.acquire(0):
+            self.waits += 1
+            lock.acquire()
+        try:
+            if self.front is not self.back:
+                self.front[:] = self.back
+                self.published += 1
+            if self.overlay is not None:
+                self.overlay.composite(self.front)
+            if region is None:
+                return False
+            if self.pending is None:
+                self.pending = region
+                return True
+            self.pending = union(self.pending, region)
+            self.coalesced += 1
+            return False
+        finally:
+            lock.release()
+
+    def take_pending(self):
+        """
+        Take the pending band; call while holding lock
+
+        Returns:
+            (x, y, w, h) published since the last call, or None
+        """
+        region = self.pending
+        self.pending = None
+        return region
+
+
+def union(a, b):
+    """Smallest (x, y, w, h) rectangle covering rectangles a and b"""
+    x = min(a[0], b[0])
+    y = min(a[1], b[1])
+    return (x, y,
+            max(a[0] + a[2], b[0] + b[2]) - x,
+            max(a[1] + a[3], b[1] + b[3]) - y)
@@ -0,0 +1,162 @@
+"""
+frame_shadow.py - Copy of the last frame sent to the e-ink panel
+Lets the display driver skip refreshes that would not change the glass,
+and narrow the ones that do to the rows that actually differ
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+
+class FrameShadow:
+    """
+    Shadow of the panel RAM contents
+
+    diff() says which rows of a window differ from what was last sent;
+    commit() records a window once it has been sent. Until the first full
+    frame (or after forget()) every row counts as changed.
+    """
+
+    def __init__(self, width, height):
+        """
+        Args:
+            width: Panel width in pixels (multiple of 8)
+            height: Panel height in pixels
+        """
+        self.stride = width // 8
+        self.height = height
+        self._frame = bytearray(self.stride * height)
+        self._view = memoryview(self._frame)
+        self._source = None       # Frame last diffed or committed...
+        self._source_view = None  # ...and its memoryview, made once
+        self._valid = False    # Shadow matches the panel
+        self.sent = 0          # Refreshes sent (stats)
+        self.skipped = 0       # Refreshes skipped as unchanged (stats)
+        self.rows_sent = 0     # Rows transmitted (stats)
+
+    def forget(self):
+        """Panel contents unknown (controller reset, grayscale frame)"""
+        self._valid = False
+
+    def fill(self, value):
+        """Panel was cleared to one byte value (0xFF is white)"""
+        stride = self.stride
+        row = bytes([value]) * stride
+        view = self._view
+        for a in range(0, len(self._frame), stride):
+            view[a:a + stride] = row
+        self._valid = True
+        self.sent += 1
+        self.rows_sent += self.height
+
+    def _view_of(self, frame):
+        """memoryview of a frame, reused while the same frame is passed in"""
+        if frame is not self._source:
+            self._source = frame
+            self._source_view = memoryview(frame)
+        return self._source_view
+
+    def diff(self, frame, x_start=0, x_end=None, y_start=0, y_end=None):
+        """
+        Rows of a window that differ from the last frame sent
+        An unchanged window counts as a skipped refresh
+
+        Args:
+            frame: Full-frame bytearray about to be sent
+            x_start, x_end: Byte columns, end exclusive (default: all)
+            y_start, y_end: Pixel rows, end exclusive (default: all)
+
+        Returns:
+            (first, end) row range with end exclusive, None if unchanged
+        """
+        stride = self.stride
+        if x_end is None:
+            x_end = stride
+        if y_end is None:
+            y_end = self.height
+        if not self._valid:
+            return y_start, y_end
+
+        new = self._view_of(frame)
+        old = self._view
+        if x_start == 0 and x_end == stride:
+            # Full-width rows are contiguous - one compare for the common
+            # case of nothing having changed
+            a = y_start * stride
+            b = y_end * stride
+            if a == 0 and b == len(self._frame):
+                same = frame == self._frame
+            else:
+                same = new[a:b] == old[a:b]
+            if same:
+                self.skipped += 1
+                return None
+
+            # First row whose prefix [a, end of row) differs...
+            lo = y_start
+            hi = y_end - 1
+            while lo < hi:
+                mid = (lo + hi) >> 1
+                c = (mid + 1) * stride
+                if new[a:c] == old[a:c]:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            first = lo
+            # ...and last row whose suffix [start of row, b) differs
+            hi = y_end - 1
+            while lo < hi:
+                mid = (lo + hi + 1) >> 1
+                c = mid * stride
+                if new[c:b] == old[c:b]:
+                    hi = mid - 1
+                else:
+                    lo = mid
+            return first, lo + 1
+
+        first = y_start
+        row = first * stride
+        while first < y_end and new[row + x_start:row + x_end] == old[row + x_start:row + x_end]:
+            first += 1
+            row += stride
+        if first == y_end:
+            self.skipped += 1
+            return None
+
+        end = y_end
+        row = (end - 1) * stride
+        while new[row + x_start:row + x_end] == old[row + x_start:row + x_end]:
+            end -= 1
+            row -= stride
+        return first, end
+
+    def commit(self, frame, x_start=0, x_end=None, y_start=0, y_end=None):
+        """
+        Record a window of a frame as sent
+
+        Args:
+            frame: Full-frame bytearray that was sent
+            x_start, x_end: Byte columns, end exclusive (default: all)
+            y_start, y_end: Pixel rows, end exclusive (default: all)
+        """
+        stride = self.stride
+        if x_end is None:
+            x_end = stride
+        if y_end is None:
+            y_end = self.height
+        old = self._view
+        if x_start == 0 and x_end == stride and y_start == 0 and y_end == self.height:
+            self._frame[:] = frame
+        elif x_start == 0 and x_end == stride:
+            new = self._view_of(frame)
+            a = y_start * stride
+            b = y_end * stride
+            old[a:b] = new[a:b]
+        else:
+            new = self._view_of(frame)
+            for row in range(y_start * stride, y_end * stride, stride):
+                old[row + x_start:row + x_end] = new[row + x_start:row + x_end]
+        # Only a whole frame makes the shadow trustworthy again
+        if not self._valid and y_start == 0 and y_end == self.height and \
+                x_start == 0 and x_end == stride:
+            self._valid = True
+        self.sent += 1
+        self.rows_sent += y_end - y_start
@@ -0,0 +1,110 @@
+"""
+glyph_atlas.py - Pre-rendered font glyphs for fast text drawing
+Renders each glyph of the built-in 8x8 font once, then draws byte-aligned
+text by copying glyph rows straight into the frame
+For Raspberry Pi Pico 2W e-ink typewriter
+
+framebuf.text() looks every glyph up in the font and sets its pixels one
+at a time. With text columns on byte boundaries (ALIGNED_MARGIN_LEFT in
+editor_base.py) a glyph row is exactly one byte of the MONO_HLSB frame,
+so drawing a character is 8 byte ANDs from the atlas instead. Text that
+doesn't start on a byte boundary is drawn with framebuf.text() as before.
+"""
+
+try:
+    import framebuf
+except ImportError:
+    # Desktop Python - an atlas can still be built from explicit font bytes
+    framebuf = None
+
+FIRST_CHAR = 32           # ' '
+LAST_CHAR = 127           # Font's fallback glyph, as in framebuf.text()
+GLYPH_ROWS = 8
+GLYPH_COUNT = LAST_CHAR - FIRST_CHAR + 1
+
+
+def render_font():
+    """
+    Render the framebuf font into a packed atlas
+
+    Returns:
+        bytearray of GLYPH_COUNT * GLYPH_ROWS bytes, one byte per glyph row
+        (MSB leftmost), black ink as 0 bits on white
+    """
+    atlas = bytearray(GLYPH_COUNT * GLYPH_ROWS)
+    # An 8px wide MONO_HLSB buffer packs each glyph row into one byte
+    fb = framebuf.FrameBuffer(atlas, 8, GLYPH_COUNT * GLYPH_ROWS, framebuf.MONO_HLSB)
+    fb.fill(1)
+    for i in range(GLYPH_COUNT):
+        fb.text(chr(FIRST_CHAR + i), 0, i * GLYPH_ROWS, 0)
+    return atlas
+
+
+class GlyphAtlas:
+    """
+    Draws black text onto a white 1-bit frame from pre-rendered glyphs
+
+    Drawing is transparent like framebuf.text(): ink is ANDed into the
+    frame and blank pixels are left as they were.
+    """
+
+    def __init__(self, image, buffer, width, height, font=None):
+        """
+        Args:
+            image: framebuf.FrameBuffer over buffer (for unaligned text)
+            buffer: Its MONO_HLSB bytearray
+            width: Frame width in pixels
+            height: Frame height in pixels
+            font: Packed glyph rows as from render_font() (default: the
+                  built-in framebuf font)
+        """
+        self.image = image
+        self.buffer = buffer
+        self.stride = width // 8
+        self.height = height
+        self.atlas = font if font is not None else render_font()
+        self.chars_copied = 0   # Characters drawn from the atlas (stats)
+
+    def text(self, line, x, y):
+        """
+        Draw one line of text in black
+
+        Args:
+            line: Text to draw (one glyph per character)
+            x: Left edge in pixels
+            y: Top edge in pixels
+        """
+        stride = self.stride
+        if x & 7 or x < 0 or y < 0 or y + GLYPH_ROWS > self.height:
+            # Not on a byte boundary, or clipped vertically
+            self.image.text(line, x, y, 0)
+            return
+
+        col = x >> 3
+        if len(line) > stride - col:
+            line = line[:stride - col]  # framebuf.text() clips at the edge
+        buf = self.buffer
+        atlas = self.atlas
+        s2 = stride * 2
+        s3 = stride * 3
+        s4 = stride * 4
+        s5 = stride * 5
+        s6 = stride * 6
+        s7 = stride * 7
+        d = y * stride + col
+        for ch in line:
+            c = ord(ch)
+            if c != 32:
+                if c < FIRST_CHAR or c > LAST_CHAR:
+                    c = LAST_CHAR
+                g = (c - FIRST_CHAR) << 3
+                buf[d] &= atlas[g]
+                buf[d + stride] &= atlas[g + 1]
+                buf[d + s2] &= atlas[g + 2]
+                buf[d + s3] &= atlas[g + 3]
+                buf[d + s4] &= atlas[g + 4]
+                buf[d + s5] &= atlas[g + 5]
+                buf[d + s6] &= atlas[g + 6]
+                buf[d + s7] &= atlas[g + 7]
+            d += 1
+        self.chars_copied += len(line)
@@ -0,0 +1,53 @@
+"""
+gray4.py - 4-gray frame to EPD RAM plane conversion
+Turns a 2-bit-per-pixel GS2_HMSB frame into the two 1-bit planes the
+4.2" panel's controller expects (RAM 0x24 and 0x26) with a lookup table
+For Raspberry Pi Pico 2W e-ink typewriter
+"""
+
+
+def _build_plane_bits():
+    """
+    256 entries: high nibble for RAM 0x24, low nibble for RAM 0x26
+
+    A source byte holds 4 pixels, lowest bits first; a level's high bit
+    goes to 0x24 and its low bit to 0x26 (0 black, 1 gray2, 2 gray1,
+    3 white), first pixel in the nibble's highest bit.
+    """
+    table = bytearray(256)
+    for b in range(256):
+        new = old = 0
+        for p in range(4):
+            level = (b >> (2 * p)) & 0x03
+            new = (new << 1) | (level >> 1)
+            old = (old << 1) | (level & 0x01)
+        table[b] = (new << 4) | old
+    return bytes(table)
+
+
+PLANE_BITS = _build_plane_bits()
+
+RAM_NEW = 0x24  # Plane written with command 0x24
+RAM_OLD = 0x26  # Plane written with command 0x26
+
+
+def convert_plane(image, plane, ram):
+    """
+    Build one RAM plane from a 4-gray frame
+
+    Args:
+        image: GS2_HMSB frame, 2 bytes per plane byte
+        plane: bytearray of len(image) // 2 to fill
+        ram: RAM_NEW or RAM_OLD
+    """
+    bits = PLANE_BITS
+    n = len(plane)
+    j = 0
+    if ram == RAM_NEW:
+        for i in range(n):
+            plane[i] = (bits[image[j]] & 0xF0) | (bits[image[j + 1]] >> 4)
+            j += 2
+    else:
+        for i in range(n):
+            plane[i] = ((bits[image[j]] & 0x0F) << 4) | (bits[image[j + 1]] & 0x0F)
+            j += 2
@@ -19,6 +19,8 @@ Core 1 (Worker):
 Communication:
   - queue.Queue for task requests
   - _thread.allocate_lock() for shared data
+  - FrameBuffers: Core 0 draws and publishes, Core 1 sends the published frame
+  - StatusBar: status line/footer strip composited over the published frame
   - Global flags for state management
 
 FEATURES IMPLEMENTED:
@@ -27,28 +29,37 @@ FEATURES IMPLEMENTED:
 ✓ Editor mode with full text editing
 ✓ Page navigation (PgUp/PgDn/Home)
 ✓ Control key actions (Ctrl+S/O/N/R/D/T)
+✓ Undo/redo (Ctrl+Z/Y)
 ✓ Alt+Backspace for word deletion
 ✓ Shift+Enter for explicit page markers
 ✓ File rename with prompt
 ✓ Status messages for all actions
 ✓ Thread-safe operations throughout
+✓ Typewriter mode: cursor rows refreshed on each keystroke (TYPEWRITER_MODE)
 """
 
 import _thread
 import time
 import utime
-from machine import Pin
+from machine import Pin, Timer
 import gc
 import os
 
 # Import hardware abstraction
 import hardware_pico
-from display42 import EPD_4in2
+from display42 import EPD_4in2, PROFILE_TYPING, PROFILE_READING
 from tca8418 import TCA8418
 from editor_base import (
-    TextLayout, PageManager, KeyboardHelper, FileHelper, MenuRenderer,
-    CHAR_WIDTH, CHAR_HEIGHT, MARGIN_LEFT, MARGIN_TOP
+    LayoutEngine, PageViewCache, KeyboardHelper, FileHelper, MenuRenderer,
+    CHAR_WIDTH, CHAR_HEIGHT, MARGIN_LEFT, MARGIN_TOP, ALIGNED_MARGIN_LEFT
 )
+from text_buffer import PieceTable
+from page_store import PageStore
+from glyph_atlas import GlyphAtlas
+from row_renderer import RowRenderer
+from refresh_scheduler import RefreshScheduler, PARTIAL, FULL, CLEAR, SKIPPED
+from frame_buffers import FrameBuffers
+from status_bar import StatusBar
 
 # Try to import queue for thread-safe communication
 try:
@@ -94,19 +105,47 @@ keyboard = None
 max_w = max_h = 0
 
 # Text state (protected by text_lock)
-text_buffer = []
-cursor_index = 0
+text_buffer = PieceTable()  # Piece table with undo history (UTF-8 bytes)
+cursor_index = 0           # Byte offset into text_buffer
+layout_engine = None       # LayoutEngine, created once the display size is known
+page_view_cache = None     # PageViewCache: pages + layouts for page view
 current_page_index = 0
 current_subpage_index = 0
 text_lock = None  # Will be allocated_lock()
 
 # Display state (protected by display_lock)
 display_dirty = False
+glyph_atlas = None   # GlyphAtlas: pre-rendered font for page text
+row_renderer = None  # RowRenderer: what the editor page has in the frame
+scheduler = None     # RefreshScheduler: partial or full refresh (Core 1 only)
+# (mode, region, send ms, weight) of a refresh the panel may still be
+# running, recorded once it has finished (Core 1 only)
+pending_refresh = None
+frames = None        # FrameBuffers: Core 0 draws the back frame, Core 1 sends the front
+# A front frame of its own for the worker (15KB) so refreshes never go out
+# half drawn; False sends the frame Core 0 is drawing into
+DOUBLE_BUFFER = True
+# Typewriter mode: refresh the cursor line's rows on every keystroke
+# instead of after a pause in typing; rows typed during a refresh are sent
+# together by the next one, and full refreshes wait for an idle pause
+TYPEWRITER_MODE = True
+key_latency_ms = 0   # Keystroke to refresh start, last typewriter band (stats)
+key_latency_max = 0  # Worst of those (stats)
+status_bar = None    # StatusBar: bottom row strip for messages and footers
+status_timer = None  # machine.Timer taking the status message down
+status_due = False   # Set by status_timer; the main loop clears the strip
+# Shortened partial waveform for editor keystrokes (233 bytes laid out as
+# display42.LUT_ALL); without it the editor uses the built-in waveform
+TYPING_LUT_FILE = "typing_lut.bin"
+# Text columns on byte boundaries so the atlas copies whole glyph rows
+# (MARGIN_LEFT draws every line with framebuf.text() instead)
+TEXT_MARGIN_LEFT = ALIGNED_MARGIN_LEFT
 display_lock = None  # Will be allocated_lock()
 
 # File state
 STORAGE_BASE = "saved_files"
 ACTIVE_FILE = ""
+page_store = None  # PageStore for ACTIVE_FILE (see active_pages())
 file_dirty = False
 file_last_flush = 0
 
@@ -117,6 +156,7 @@ file_queue = None     # Queue for file save requests
 # Thread control
 worker_running = False
 worker_should_stop = False
+file_saving = False   # Worker is in the middle of a file request
 
 # Keyboard state
 current_pressed = set()
@@ -157,12 +197,29 @@ def log_exception(exc, func_name="unknown"):
 # WORKER THREAD (Core 1)
 # =============================================================================
 
+def record_finished_refresh():
+    """
+    Account for the last refresh once the panel has finished it
+
+    Refreshes return as soon as they start (wait_after_refresh is off), so
+    the time recorded is the send plus the BUSY time the driver measured.
+    """
+    global pending_refresh
+
+    if pending_refresh is None or epd.refresh_in_progress():
+        return
+    mode, region, ms, weight = pending_refresh
+    pending_refresh = None
+    scheduler.record(mode, region, ms + epd.last_busy_ms, weight)
+
+
 def worker_thread():
     """
     Worker thread running on Core 1
     Handles blocking operations: display refreshes and file saves
     """
     global worker_running, worker_should_stop, epd, display_queue, file_queue
+    global file_saving, key_latency_ms, key_latency_max, pending_refresh
 
     print("Worker thread starting on Core 1...")
     worker_running = True
@@ -170,53 +227,134 @@ def worker_thread():
     # Local state
     last_display_time = 0
     throttle_ms = 500
+    idle_refresh_ms = 10000  # Pause before ghosting is cleared with a full refresh
 
     try:
         while not worker_should_stop:
+            # Ghosting and timing of a refresh that has finished since
+            record_finished_refresh()
+
             # Process display refresh requests
             if display_queue and not display_queue.empty():
                 request = display_queue.get()
                 if request:
                     refresh_type = request.get('type', 'partial')
+                    region = request.get('region')
+                    typing = request.get('typing', False)
+                    epd.set_partial_profile(request.get('profile', PROFILE_READING))
+                    weight = epd.partial_ghosting
 
-                    # Check throttle
+                    # Check throttle (typewriter bands are limited by the
+                    # refresh itself: they pile up while it runs)
                     now = utime.ticks_ms()
                     elapsed = utime.ticks_diff(now, last_display_time)
-                    if elapsed < throttle_ms:
+                    if elapsed < throttle_ms and not typing:
                         time.sleep_ms(throttle_ms - elapsed)
 
                     # Perform refresh (this blocks Core 1 but not Core 0)
                     try:
-                        if refresh_type == 'partial':
-                            epd.EPD_4IN2_V2_PartialDisplay(epd.buffer_1Gray)
-                        elif refresh_type == 'full':
-                            epd.EPD_4IN2_V2_Display_Fast(epd.buffer_1Gray)
-                        elif refresh_type == 'clear':
-                            epd.EPD_4IN2_V2_Clear()
-
-                        last_display_time = utime.ticks_ms()
+                        # Previous refresh waited for before the front frame
+                        # is locked, so Core 0 can publish in the meantime
+                        if epd.refresh_in_progress():
+                            epd.wait_busy()
+                        record_finished_refresh()
+                        if typing:
+                            # Every band typed while the panel was busy
+                            with frames.lock:
+                                region = frames.take_pending()
+                        if typing and region is None:
+                            mode = SKIPPED   # Band dropped with a full queue
+                        elif refresh_type == 'partial' or refresh_type == 'page':
+                            # Partial unless ghosting is over budget, or a
+                            # page change finds enough of it to clear; while
+                            # typing, a full refresh waits for a pause
+                            mode = scheduler.choose(region, refresh_type == 'page',
+                                                    weight, typing)
+                        else:
+                            mode = refresh_type
+                        start = utime.ticks_ms()
+                        with frames.lock:
+                            front = frames.front
+                            if mode == PARTIAL:
+                                # Only the dirty rows that differ from the glass
+                                # go over SPI; None if the frame is unchanged
+                                if region:
+                                    rows = epd.EPD_4IN2_V2_PartialDisplay(front, *region)
+                                else:
+                                    rows = epd.EPD_4IN2_V2_PartialDisplay(front)
+                                if rows is None:
+                                    mode = SKIPPED
+                                else:
+                                    x, _, w, _ = region or (0, 0, epd.width, epd.height)
+                                    region = (x, rows[0], w, rows[1] - rows[0])
+                            elif mode == FULL:
+                                epd.EPD_4IN2_V2_Display_Fast(front)
+                            elif mode == CLEAR:
+                                epd.EPD_4IN2_V2_Clear()
+                        sent_ms = utime.ticks_diff(utime.ticks_ms(), start)
+                        if mode == SKIPPED:
+                            scheduler.record(mode, region, sent_ms, weight)
+                        else:
+                            pending_refresh = (mode, region, sent_ms, weight)
+                        if typing and mode != SKIPPED:
+                            # First keystroke of the band to refresh started
+                            key_latency_ms = utime.ticks_diff(utime.ticks_ms(), request['time'])
+                            if key_latency_ms > key_latency_max:
+                                key_latency_max = key_latency_ms
+
+                        if mode != SKIPPED:
+                            last_display_time = utime.ticks_ms()
 
                     except Exception as e:
                         print(f"Display refresh error: {e}")
                         log_exception(e, "worker_thread:display")
 
+            # Nothing to draw for a while - clear built-up ghosting now
+            # rather than in the middle of typing
+            elif utime.ticks_diff(utime.ticks_ms(), last_display_time) > idle_refresh_ms \
+                    and scheduler.wants_cleanup():
+                try:
+                    if epd.refresh_in_progress():
+                        epd.wait_busy()
+                    record_finished_refresh()
+                    start = utime.ticks_ms()
+                    with frames.lock:
+                        epd.EPD_4IN2_V2_Display_Fast(frames.front)
+                    pending_refresh = (FULL, None, utime.ticks_diff(utime.ticks_ms(), start), 1)
+                except Exception as e:
+                    print(f"Display refresh error: {e}")
+                    log_exception(e, "worker_thread:idle_refresh")
+                last_display_time = utime.ticks_ms()
+
             # Process file save requests
             if file_queue and not file_queue.empty():
+                file_saving = True  # Before get(), for wait_for_file_saves()
                 request = file_queue.get()
                 if request:
                     path = request.get('path')
                     content = request.get('content')
+                    store = request.get('store')
 
-                    if path and content is not None:
-                        try:
-                            # File save (blocks Core 1 but not Core 0)
+                    try:
+                        # File save (blocks Core 1 but not Core 0)
+                        if store is not None:
+                            # One page to its own segment - the editor
+                            # text is written straight from its buffers
+                            snapshot = request['snapshot']
+                            store.write_page(
+                                request['page'],
+                                lambda f: PieceTable.write_snapshot(f, snapshot),
+                                request['token'])
+                            print(f"Page {request['page'] + 1} saved: {store.path}")
+                        elif path and content is not None:
                             with open(path, 'w', encoding='utf-8') as f:
                                 f.write(content)
                             print(f"File saved: {path}")
 
-                        except Exception as e:
-                            print(f"File save error: {e}")
-                            log_exception(e, "worker_thread:file_save")
+                    except Exception as e:
+                        print(f"File save error: {e}")
+                        log_exception(e, "worker_thread:file_save")
+                file_saving = False
 
             # Brief sleep to yield CPU
             time.sleep_ms(10)
@@ -241,104 +379,160 @@ def worker_thread():
 def clear_display_buffer():
     """Clear the display framebuffer to white"""
     epd.image1Gray.fill(0xFF)
+    row_renderer.forget()
 
 
-def render_text_page(page_chars):
+def render_text_page(page_lines):
     """
-    Render a page of characters to display buffer
+    Render a page of lines to display buffer
     This only updates the buffer - refresh happens on worker thread
+
+    Args:
+        page_lines: (x, y, line_text) tuples from LayoutEngine.page_lines()
     """
     clear_display_buffer()
-    for x, y, ch in page_chars:
-        if ch not in '\n':
-            epd.image1Gray.text(ch, x, y, epd.black)
+    # Glyph rows copied from the atlas (one text() call per line if the
+    # margin isn't byte-aligned)
+    for x, y, line in page_lines:
+        glyph_atlas.text(line, x, y)
 
 
-def render_cursor(x, y):
-    """Draw cursor at specified position"""
-    epd.image1Gray.fill_rect(x, y + CHAR_HEIGHT - 2, CHAR_WIDTH, 2, epd.black)
+def load_typing_lut():
+    """Hand TYPING_LUT_FILE to the display, if there is a valid one"""
+    try:
+        with open(TYPING_LUT_FILE, 'rb') as f:
+            epd.set_partial_lut(f.read())
+        print(f"Typing waveform loaded from {TYPING_LUT_FILE}")
+    except OSError:
+        pass  # No file: built-in waveform only
+    except ValueError as e:
+        print(f"Ignoring {TYPING_LUT_FILE}: {e}")
 
 
-def request_display_refresh(refresh_type='partial'):
+def request_display_refresh(refresh_type='partial', region=None, typing=False):
     """
     Request display refresh on worker thread
 
     Args:
-        refresh_type: 'partial', 'full', or 'clear'
+        refresh_type: 'partial' for an update of the same screen, 'page'
+                      when it shows different content (the scheduler picks
+                      partial or fast full for both), 'full' to always use
+                      a fast full refresh, or 'clear'
+        region: (x, y, w, h) dirty rectangle for a partial refresh, or
+                None for the whole screen
+        typing: Typewriter band - region joins the one pending for the
+                worker, and only the first of a band is queued
 
     Returns:
-        True if queued, False if queue full
+        True if queued (or joined a queued band), False if queue full
     """
     global display_queue, display_dirty
 
+    if region is None or refresh_type != 'partial':
+        # Drawn by something other than refresh_display() - the next
+        # editor refresh can't rely on what it last drew or sent
+        row_renderer.forget()
+
     if display_queue:
-        success = display_queue.put({'type': refresh_type})
+        # Keystroke feedback in the editor, best quality everywhere else
+        profile = PROFILE_TYPING if app_mode == 'editor' else PROFILE_READING
+        if typing and region is not None:
+            # The worker only sends what has been published
+            if frames.publish(region):
+                success = display_queue.put({'type': refresh_type, 'typing': True,
+                                             'profile': profile,
+                                             'time': utime.ticks_ms()})
+                if not success:
+                    with frames.lock:
+                        frames.take_pending()
+            else:
+                success = True   # Sent with the band already queued
+        else:
+            frames.publish()
+            success = display_queue.put({'type': refresh_type, 'region': region,
+                                         'profile': profile})
         if success:
             with display_lock:
                 display_dirty = False
+        else:
+            row_renderer.forget()
         return success
     return False
 
 
 def refresh_display():
     """Update the physical display based on current state"""
-    global text_buffer, cursor_index
+    global text_buffer, cursor_index, display_dirty
 
     # Get text (thread-safe read)
     with text_lock:
-        current_text = ''.join(text_buffer)
+        current_text = text_buffer.text()
         cursor_pos = cursor_index
-
-    # Calculate layout
-    pages = TextLayout.get_screen_pages(current_text, max_w, max_h)
-
-    # Render to buffer
-    if pages:
-        render_text_page(pages[0])
-    else:
-        clear_display_buffer()
-
-    # Add cursor
-    cursor_x, cursor_y, _ = TextLayout.get_cursor_screen_pos(
-        current_text, cursor_pos, max_w, max_h
-    )
-    render_cursor(cursor_x, cursor_y)
+        if len(current_text) != len(text_buffer):
+            # Multi-byte text: byte offsets of the recorded edits do not
+            # match str offsets, so re-wrap everything
+            layout_engine.invalidate()
+            cursor_pos = len(text_buffer.text(0, cursor_pos))
+        # Re-wrap only the lines touched since the last refresh
+        layout_engine.update(current_text)
+
+    # Cursor looked up in the line table, no second layout pass
+    page_lines = layout_engine.page_lines(0)
+    cursor_x, cursor_y, _ = layout_engine.cursor_position(cursor_pos)
+
+    # Clear and redraw only the rows whose text or cursor changed, then
+    # send just those rows, narrowed to the changed columns
+    rows = row_renderer.render(page_lines, (cursor_x, cursor_y))
+    region = row_renderer.region(rows, max_h)
+    if region is None:
+        with display_lock:
+            display_dirty = False
+        return
 
     # Request refresh on worker thread (non-blocking)
-    request_display_refresh('partial')
+    request_display_refresh('partial', region, TYPEWRITER_MODE)
 
 
-def status(msg, in_page_view=False, duration=2000):
+def status(msg, duration=2000):
     """
     Show temporary status message at bottom of screen
 
+    Drawn in the status bar strip and sent as a refresh of just those rows;
+    the text area is neither redrawn nor resent.
+
     Args:
         msg: Status message to display
-        in_page_view: Whether we're in page view mode
         duration: How long to show message (ms)
     """
-    global display_dirty
+    status_bar.show_message(msg)
+    refresh_status_bar()
 
-    # Show message at bottom
-    bottom_y = max_h - CHAR_HEIGHT
-    epd.image1Gray.fill_rect(0, bottom_y, max_w, CHAR_HEIGHT, 0xFF)
-    epd.image1Gray.text(msg, MARGIN_LEFT, bottom_y, epd.black)
-    request_display_refresh('partial')
+    # Timer callbacks only set a flag - the main loop takes the message
+    # down (drawing and queueing aren't safe from a callback)
+    status_timer.init(period=duration, mode=Timer.ONE_SHOT, callback=status_expired)
 
-    # Schedule clear after duration
-    # Note: In threading model, we'll just wait and clear
-    # This is a simplified version - a timer would be better
-    def clear_status():
-        time.sleep_ms(duration)
-        epd.image1Gray.fill_rect(0, bottom_y, max_w, CHAR_HEIGHT, 0xFF)
-        if not in_page_view:
-            refresh_display()
-        else:
-            request_display_refresh('partial')
 
-    # Run clear in background (don't block)
-    # For now, we skip this to keep things simple
-    # The next display refresh will clear it
+def status_expired(timer):
+    """status_timer callback"""
+    global status_due
+    status_due = True
+
+
+def refresh_status_bar():
+    """Send the status bar strip on its own"""
+    global display_dirty
+
+    if not frames.double():
+        # No front frame to composite over: the strip goes into the one
+        # frame, and once it is empty the editor rows under it are redrawn
+        if not status_bar.visible():
+            epd.image1Gray.fill_rect(0, status_bar.y, max_w, status_bar.height, 0xFF)
+            if app_mode == 'editor':
+                row_renderer.forget()
+                with display_lock:
+                    display_dirty = True
+                return
+    request_display_refresh('partial', status_bar.region)
 
 
 # =============================================================================
@@ -394,8 +588,10 @@ def show_menu():
         epd.image1Gray.text("No files found", MARGIN_LEFT, MARGIN_TOP, epd.black)
         epd.image1Gray.text("Press 'N' to create", MARGIN_LEFT, MARGIN_TOP + CHAR_HEIGHT, epd.black)
 
-    # Request full refresh via worker thread
-    request_display_refresh('full')
+    # Request refresh via worker thread (only the changed rows, unless
+    # ghosting calls for a full refresh)
+    status_bar.set_footer(None)
+    request_display_refresh('page')
 
 
 def handle_menu_input(key_label):
@@ -481,8 +677,9 @@ def insert_char(ch):
     global text_buffer, cursor_index, display_dirty, file_dirty
 
     with text_lock:
-        text_buffer.insert(cursor_index, ch)
-        cursor_index += 1
+        pos = cursor_index
+        cursor_index = text_buffer.insert(pos, ch)
+        layout_engine.edit(pos, 0, cursor_index - pos)
 
     with display_lock:
         display_dirty = True
@@ -496,8 +693,9 @@ def backspace():
 
     with text_lock:
         if cursor_index > 0:
-            cursor_index -= 1
-            text_buffer.pop(cursor_index)
+            pos = cursor_index
+            cursor_index = text_buffer.backspace(pos)
+            layout_engine.edit(cursor_index, pos - cursor_index, 0)
 
             with display_lock:
                 display_dirty = True
@@ -512,29 +710,52 @@ def delete_word():
         if cursor_index == 0:
             return
 
-        # Find start of current word
-        i = cursor_index - 1
-
-        # Skip trailing spaces
-        while i >= 0 and text_buffer[i] == ' ':
-            i -= 1
-
-        # Find word boundary
-        while i >= 0 and text_buffer[i] not in ' \n':
-            i -= 1
-
-        # Delete from word start to cursor
-        chars_to_delete = cursor_index - (i + 1)
-        for _ in range(chars_to_delete):
-            if cursor_index > 0:
-                cursor_index -= 1
-                text_buffer.pop(cursor_index)
+        # Delete back to the start of the word (skips trailing spaces
+        # first) as a single undo step
+        word_start = text_buffer.delete_word(cursor_index)
+        layout_engine.edit(word_start, cursor_index - word_start, 0)
+        cursor_index = word_start
 
         with display_lock:
             display_dirty = True
         file_dirty = True
 
 
+def undo():
+    """Undo the last edit group (Ctrl+Z)"""
+    global cursor_index, display_dirty, file_dirty
+
+    with text_lock:
+        new_cursor = text_buffer.undo()
+        if new_cursor is None:
+            return False
+        cursor_index = new_cursor
+        # Undo can touch any part of the page
+        layout_engine.invalidate()
+
+    with display_lock:
+        display_dirty = True
+    file_dirty = True
+    return True
+
+
+def redo():
+    """Redo the last undone edit group (Ctrl+Y)"""
+    global cursor_index, display_dirty, file_dirty
+
+    with text_lock:
+        new_cursor = text_buffer.redo()
+        if new_cursor is None:
+            return False
+        cursor_index = new_cursor
+        layout_engine.invalidate()
+
+    with display_lock:
+        display_dirty = True
+    file_dirty = True
+    return True
+
+
 def cursor_newline():
     """Insert newline at cursor"""
     insert_char('\n')
@@ -542,30 +763,25 @@ def cursor_newline():
 
 def new_page_marker():
     """Insert explicit page break (Shift+Enter)"""
-    global file_dirty, current_page_index, current_subpage_index
+    global file_dirty, current_page_index, current_subpage_index, cursor_index
 
     # Save current content
     save_current_page()
 
-    # Add page marker
-    try:
-        with open(ACTIVE_FILE, "a", encoding='utf-8') as f:
-            f.write('\n---\n')
-    except Exception as e:
-        log_exception(e, "new_page_marker")
-
     current_page_index += 1
     current_subpage_index = 0
 
     with text_lock:
         text_buffer.clear()
+        layout_engine.invalidate()
         cursor_index = 0
 
-    file_dirty = True
+    # Saving the empty page adds the marker
+    save_current_page()
 
     # Clear screen for new page
     clear_display_buffer()
-    request_display_refresh('full')
+    request_display_refresh('page')
 
 
 def clear_screen():
@@ -579,13 +795,15 @@ def clear_screen():
 # FILE OPERATIONS
 # =============================================================================
 
-def request_file_save(path, content):
+def request_file_save(path, content=None, page=None):
     """
     Request file save on worker thread (non-blocking)
 
     Args:
         path: File path
         content: Content to save
+        page: Alternatively, (store, page index, PieceTable snapshot,
+              stage token) to save a single page of a note
 
     Returns:
         True if queued, False if queue full
@@ -593,7 +811,13 @@ def request_file_save(path, content):
     global file_queue, file_dirty, file_last_flush
 
     if file_queue:
-        success = file_queue.put({'path': path, 'content': content})
+        if page is not None:
+            store, page_index, snapshot, token = page
+            success = file_queue.put({'path': path, 'store': store,
+                                      'page': page_index, 'snapshot': snapshot,
+                                      'token': token})
+        else:
+            success = file_queue.put({'path': path, 'content': content})
         if success:
             file_dirty = False
             file_last_flush = utime.ticks_ms()
@@ -601,56 +825,84 @@ def request_file_save(path, content):
     return False
 
 
+def active_pages():
+    """PageStore of the active file (page count and single pages on demand)"""
+    global page_store
+
+    if page_store is None or page_store.path != ACTIVE_FILE:
+        page_store = PageStore(ACTIVE_FILE)
+    return page_store
+
+
 def save_current_page():
-    """Save current buffer to file (non-blocking)"""
+    """Save current page to its own segment (non-blocking, see PageStore)"""
     global text_buffer, ACTIVE_FILE, current_page_index
 
-    # Read current state (thread-safe)
+    # Snapshot current state (thread-safe, no copy of the text)
     with text_lock:
-        current_text = ''.join(text_buffer)
+        snapshot = text_buffer.snapshot()
 
-    # Load full file
-    full_content = FileHelper.load_file(ACTIVE_FILE)
-    pages = PageManager.split_into_pages(full_content)
+    # Readers see the new text straight away; it is only decoded if the
+    # page is read before the worker has written it
+    store = active_pages()
+    token = store.stage_page(current_page_index,
+                             lambda: PieceTable.snapshot_text(snapshot))
 
-    # Ensure we have enough pages
-    while len(pages) <= current_page_index:
-        pages.append("")
+    # Request save on worker thread (non-blocking)
+    request_file_save(ACTIVE_FILE, page=(store, current_page_index, snapshot, token))
 
-    # Update current page
-    pages[current_page_index] = current_text
 
-    # Merge back
-    new_content = PageManager.merge_pages(pages)
+def wait_for_file_saves():
+    """Block until the worker has finished every queued file request"""
+    while worker_running and (file_saving or not file_queue.empty()):
+        time.sleep_ms(10)
 
-    # Request save on worker thread (non-blocking)
-    request_file_save(ACTIVE_FILE, new_content)
+
+def close_active_file():
+    """
+    Save the current page and fold saved pages back into the note file
+
+    Leaves a plain text file for other tools (and the next open). Called
+    when switching files, renaming and shutting down.
+    """
+    if not ACTIVE_FILE:
+        return
+    if file_dirty:
+        save_current_page()
+    wait_for_file_saves()
+    try:
+        active_pages().compact()
+    except Exception as e:
+        log_exception(e, "close_active_file")
 
 
 def load_previous():
     """Load the last page of the file"""
     global text_buffer, cursor_index, current_page_index, current_subpage_index
 
-    pages = PageManager.split_into_pages(FileHelper.load_file(ACTIVE_FILE))
+    # Only the last page's bytes are read
+    pages = active_pages()
 
     if pages:
         current_page_index = len(pages) - 1
-        last_page_text = pages[current_page_index]
+        last_page_text = pages.read_page(current_page_index)
 
-        # Calculate number of subpages
-        screen_pages = TextLayout.get_screen_pages(last_page_text, max_w, max_h)
-        current_subpage_index = len(screen_pages) - 1 if screen_pages else 0
+        # Calculate number of subpages (wraps the page once; refresh_display
+        # then finds the layout already up to date)
+        layout_engine.invalidate()
+        layout_engine.update(last_page_text)
+        current_subpage_index = layout_engine.page_count() - 1
 
         # Load into buffer (thread-safe)
         with text_lock:
-            text_buffer.clear()
-            text_buffer.extend(list(last_page_text))
+            text_buffer.load(last_page_text)
             cursor_index = len(text_buffer)
     else:
         current_page_index = 0
         current_subpage_index = 0
         with text_lock:
             text_buffer.clear()
+            layout_engine.invalidate()
             cursor_index = 0
 
 
@@ -661,16 +913,13 @@ def load_specific_page(page_idx, subpage_idx=0):
     current_page_index = page_idx
     current_subpage_index = subpage_idx
 
-    # Get all pages
-    pages = PageManager.split_into_pages(FileHelper.load_file(ACTIVE_FILE))
+    # Seek straight to the page
+    page_text = active_pages().read_page(page_idx)
 
     with text_lock:
-        if page_idx < len(pages):
-            # Load the complete page text
-            text_buffer.clear()
-            text_buffer.extend(list(pages[page_idx]))
-        else:
-            text_buffer.clear()
+        # Load the complete page text ("" past the last page)
+        text_buffer.load(page_text)
+        layout_engine.invalidate()
 
         # Set cursor to end
         cursor_index = len(text_buffer)
@@ -694,34 +943,27 @@ def display_page(page_num, subpage_num, total_pages, page_text):
 
     clear_display_buffer()
 
-    # Get pages for the text (leave room for footer)
-    pages = TextLayout.get_screen_pages(page_text, max_w, max_h - 2 * CHAR_HEIGHT)
-
-    # Ensure valid subpage
-    if subpage_num >= len(pages):
-        subpage_num = len(pages) - 1
+    # Memoized layout, wrapped only as far as the requested subpage (the
+    # page view area leaves room for footer)
     if subpage_num < 0:
         subpage_num = 0
+    layout = page_view_cache.layout(page_num, page_text)
 
-    # Render the subpage
-    if pages and subpage_num < len(pages):
-        render_text_page(pages[subpage_num])
+    # Ensure valid subpage
+    if not layout.has_page(subpage_num):
+        subpage_num = layout.page_count() - 1
 
-    # Draw footer
-    footer_y = max_h - CHAR_HEIGHT - 2
-    epd.image1Gray.text("[Page View - Read Only]", MARGIN_LEFT, footer_y, epd.black)
+    # Render the subpage
+    render_text_page(layout.page_lines(subpage_num))
 
-    # Page number
-    num_subpages = len(pages)
-    if num_subpages > 1:
+    # Footer with the page number, composited from the status bar
+    if subpage_num > 0 or layout.has_page(1):
         label = f"{page_num + 1}.{subpage_num + 1}/{total_pages}"
     else:
         label = f"{page_num + 1}/{total_pages}"
-    label_width = len(label) * CHAR_WIDTH
-    px = max_w - label_width - 10
-    epd.image1Gray.text(label, px, footer_y, epd.black)
+    status_bar.set_footer("[Page View - Read Only]", label)
 
-    request_display_refresh('partial')
+    request_display_refresh('page')
     display_dirty = False
 
 
@@ -740,8 +982,7 @@ def action_open():
     global app_mode
 
     # Save current work
-    action_save()
-    time.sleep_ms(50)
+    close_active_file()
 
     # Show menu
     app_mode = 'menu'
@@ -752,6 +993,8 @@ def action_new():
     """Create new file (Ctrl+N)"""
     global ACTIVE_FILE, text_buffer, cursor_index, current_page_index, current_subpage_index, app_mode
 
+    close_active_file()
+
     timestamp = utime.time() % 100000
     ACTIVE_FILE = f"{STORAGE_BASE}/note_{timestamp}.txt"
 
@@ -765,6 +1008,7 @@ def action_new():
 
     with text_lock:
         text_buffer.clear()
+        layout_engine.invalidate()
         cursor_index = 0
 
     current_page_index = 0
@@ -795,7 +1039,9 @@ def action_rename():
     new_path = f"{STORAGE_BASE}/{new_name}"
 
     try:
+        close_active_file()
         os.rename(ACTIVE_FILE, new_path)
+        PageStore.discard_sidecars(ACTIVE_FILE)
         ACTIVE_FILE = new_path
         open(ACTIVE_FILE, 'a').close()
         file_dirty = False
@@ -815,7 +1061,7 @@ def action_delete(path=None):
     Returns:
         True on success, False on cancel/error
     """
-    global ACTIVE_FILE, text_buffer, cursor_index
+    global ACTIVE_FILE, text_buffer, cursor_index, page_store
     global current_page_index, current_subpage_index, file_dirty
 
     target = path or ACTIVE_FILE
@@ -839,13 +1085,20 @@ def action_delete(path=None):
                 lbl = keyboard.key_map.get(k, '')
                 if lbl == "Enter":
                     try:
+                        if target == ACTIVE_FILE:
+                            # Drop its saved pages rather than folding them in
+                            wait_for_file_saves()
+                            page_store = None
                         os.remove(target)
+                        PageStore.discard_sidecars(target)
+                        page_view_cache.invalidate()
                         status("File deleted")
 
                         # If we deleted the active file, create new
                         if target == ACTIVE_FILE:
                             with text_lock:
                                 text_buffer.clear()
+                                layout_engine.invalidate()
                                 cursor_index = 0
                             current_page_index = 0
                             current_subpage_index = 0
@@ -994,12 +1247,14 @@ def scan_keys():
 
 def main():
     """Main program running on Core 0"""
-    global epd, max_w, max_h, ACTIVE_FILE
+    global epd, max_w, max_h, ACTIVE_FILE, layout_engine, page_view_cache
+    global glyph_atlas, row_renderer, scheduler, frames, status_bar, status_timer
     global display_dirty, file_dirty, last_key_time, file_last_flush
     global text_lock, display_lock
     global display_queue, file_queue
     global worker_should_stop, prev_keys
     global app_mode, in_paged_view, view_page_index, view_subpage_index
+    global status_due
 
     print("\n" + "="*60)
     print("ENHANCED THREADING APPROACH - Raspberry Pi Pico 2W")
@@ -1021,7 +1276,22 @@ def main():
     print("Initializing display...")
     epd = EPD_4in2()
     epd.EPD_4IN2_V2_Init_Fast(epd.Seconds_1_5S)
+    # Refreshes return once started; the BUSY interrupt marks the end and
+    # the next command waits for it, so Core 1 can save files meanwhile
+    epd.wait_after_refresh = False
+    load_typing_lut()
     max_w, max_h = epd.width, epd.height
+    layout_engine = LayoutEngine(max_w, max_h, TEXT_MARGIN_LEFT)
+    page_view_cache = PageViewCache(max_w, max_h - 2 * CHAR_HEIGHT,
+                                    margin_left=TEXT_MARGIN_LEFT)
+    glyph_atlas = GlyphAtlas(epd.image1Gray, epd.buffer_1Gray, max_w, max_h)
+    row_renderer = RowRenderer(epd.image1Gray, max_w, CHAR_HEIGHT, CHAR_WIDTH,
+                               glyph_atlas.text)
+    scheduler = RefreshScheduler(max_w, max_h, CHAR_HEIGHT)
+    frames = FrameBuffers(epd.buffer_1Gray, DOUBLE_BUFFER)
+    status_bar = StatusBar(max_w, max_h - CHAR_HEIGHT, CHAR_HEIGHT, MARGIN_LEFT, CHAR_WIDTH)
+    frames.overlay = status_bar
+    status_timer = Timer()
     print(f"Display ready: {max_w}x{max_h}")
 
     # Clear display
@@ -1063,6 +1333,8 @@ def main():
     file_last_flush = last_key_time
     prev_keys = set()
     refresh_pause_ms = 500
+    # Typewriter mode refreshes on the keystroke itself
+    display_pause_ms = 0 if TYPEWRITER_MODE else refresh_pause_ms
     file_flush_interval_ms = 2000
 
     print("\n✓ Ready - Waiting for input\n")
@@ -1103,7 +1375,8 @@ def main():
                     # ===== PAGE VIEW MODE (Read-only navigation) =====
                     elif app_mode == 'paged_view':
                         if lbl in ('PgUp', 'PgDn', 'Home'):
-                            pages = PageManager.split_into_pages(FileHelper.load_file(ACTIVE_FILE))
+                            # Pages are read from the store one at a time
+                            pages = page_view_cache.pages(active_pages())
 
                             if lbl == 'PgUp':
                                 # Navigate backwards
@@ -1113,10 +1386,10 @@ def main():
                                     view_page_index -= 1
                                     # Calculate subpages for new page
                                     page_text = pages[view_page_index] if view_page_index < len(pages) else ""
-                                    screen_pages = TextLayout.get_screen_pages(page_text, max_w, max_h - 2 * CHAR_HEIGHT)
-                                    view_subpage_index = len(screen_pages) - 1 if screen_pages else 0
+                                    layout = page_view_cache.layout(view_page_index, page_text)
+                                    view_subpage_index = layout.page_count() - 1
                                 else:
-                                    status("Already at first page", in_page_view=True)
+                                    status("Already at first page")
                                     continue
 
                                 # Display the page
@@ -1126,16 +1399,16 @@ def main():
                             elif lbl == 'PgDn':
                                 # Navigate forwards
                                 page_text = pages[view_page_index] if view_page_index < len(pages) else ""
-                                screen_pages = TextLayout.get_screen_pages(page_text, max_w, max_h - 2 * CHAR_HEIGHT)
-                                num_subpages = len(screen_pages)
+                                # Only wraps far enough to see if another subpage exists
+                                layout = page_view_cache.layout(view_page_index, page_text)
 
-                                if view_subpage_index < num_subpages - 1:
+                                if layout.has_page(view_subpage_index + 1):
                                     view_subpage_index += 1
                                 elif view_page_index < len(pages) - 1:
                                     view_page_index += 1
                                     view_subpage_index = 0
                                 else:
-                                    status("Already at last page", in_page_view=True)
+                                    status("Already at last page")
                                     continue
 
                                 # Display the page
@@ -1145,6 +1418,7 @@ def main():
                             elif lbl == 'Home':
                                 # Exit page view mode
                                 app_mode = 'editor'
+                                status_bar.set_footer(None)
 
                                 # Check if we navigated to different page
                                 if view_page_index != current_page_index:
@@ -1166,7 +1440,7 @@ def main():
 
                             # Enter page view mode
                             app_mode = 'paged_view'
-                            pages = PageManager.split_into_pages(FileHelper.load_file(ACTIVE_FILE))
+                            pages = page_view_cache.pages(active_pages())
                             view_page_index = current_page_index
                             view_subpage_index = current_subpage_index
 
@@ -1192,6 +1466,12 @@ def main():
                                 action_upload_todoist()
                             elif key_lower == 'd':
                                 action_delete()
+                            elif key_lower == 'z':
+                                if not undo():
+                                    status("Nothing to undo")
+                            elif key_lower == 'y':
+                                if not redo():
+                                    status("Nothing to redo")
                             last_key_time = now
                             break
 
@@ -1215,8 +1495,7 @@ def main():
                         elif lbl == 'Esc':
                             # Return to menu
                             print("\nEsc pressed - returning to menu...")
-                            if file_dirty:
-                                save_current_page()
+                            close_active_file()
                             app_mode = 'menu'
                             show_menu()
                             break
@@ -1228,12 +1507,18 @@ def main():
 
             prev_keys = pressed
 
+            # Status message timed out - back to the footer or the text
+            if status_due:
+                status_due = False
+                if status_bar.expire():
+                    refresh_status_bar()
+
             # Display refresh (if dirty and throttled) - only in editor mode
             if app_mode == 'editor':
                 with display_lock:
                     is_dirty = display_dirty
 
-                if is_dirty and utime.ticks_diff(now, last_key_time) > refresh_pause_ms:
+                if is_dirty and utime.ticks_diff(now, last_key_time) >= display_pause_ms:
                     refresh_display()
 
             # File save (if dirty and throttled) - only in editor mode
@@ -1249,6 +1534,13 @@ def main():
                       f"Mode={app_mode}, "
                       f"Keys={len(pressed)}, "
                       f"Text={len(text_buffer)}ch, "
+                      f"Refreshes={epd.shadow.sent} sent/{epd.shadow.skipped} skipped, "
+                      f"Modes={scheduler.counts} in {scheduler.time_ms}ms, "
+                      f"Busy={epd.busy_ms}ms, "
+                      f"Frames={frames.published} published/{frames.waits} waited, "
+                      f"Inits={epd.state.inits} run/{epd.state.inits_avoided} avoided, "
+                      f"Latency={key_latency_ms}/{key_latency_max}ms max, "
+                      f"Coalesced={frames.coalesced}, "
                       f"Mem={gc.mem_free()}B")
 
             # Core 0 main loop runs at ~100Hz (10ms cycle)
@@ -1264,17 +1556,15 @@ def main():
         log_exception(e, "main_loop")
 
     finally:
+        # Final save (before the worker that writes it stops)
+        print("Saving final state...")
+        close_active_file()
+
         # Cleanup
         print("\nStopping worker thread...")
         worker_should_stop = True
         time.sleep(1)
 
-        # Final save
-        if file_dirty:
-            print("Saving final state...")
-            save_current_page()
-            time.sleep(1)
-
         print("\nShutdown complete")
         print("="*60)
 
@@ -1300,6 +1590,7 @@ PORTED FROM main.py (ESP32):
 ✓ Ctrl+R: Rename current file
 ✓ Ctrl+D: Delete current file
 ✓ Ctrl+T: Upload to Todoist (placeholder)
+✓ Ctrl+Z / Ctrl+Y: Undo / redo
 ✓ Alt+Backspace: Delete word
 ✓ Shift+Enter: Create explicit page marker (---)
 ✓ Esc: Return to menu from editor
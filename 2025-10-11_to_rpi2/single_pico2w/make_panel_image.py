@@ -0,0 +1,164 @@
+"""
+make_panel_image.py - Build raw panel images for panel_image.py
+Converts splash and screensaver artwork (PBM or PGM) into the 4.2" EPD
+controller's RAM layout, ready to copy to the Pico's flash
+For Raspberry Pi Pico 2W e-ink typewriter
+
+Run on a desktop:
+
+    python make_panel_image.py linson.pbm linson.bin
+    python make_panel_image.py splash.pgm splash.bin
+    python make_panel_image.py --mono splash.pgm splash.bin
+
+A PBM (P1 or P4) becomes a mono image. A PGM (P2 or P5) becomes a 4-gray
+image, each pixel rounded to the nearest of black, gray2, gray1 and white,
+or a mono image with --mono (white from half brightness up). The artwork
+must be exactly the panel size, 400x300.
+"""
+
+import sys
+
+WIDTH = 400
+HEIGHT = 300
+
+
+def _tokens(data, start, count):
+    """count whitespace-separated header fields from data[start:], skipping comments"""
+    fields = []
+    i = start
+    n = len(data)
+    while len(fields) < count:
+        while i < n and data[i] in b' \t\r\n':
+            i += 1
+        if i < n and data[i] == ord('#'):
+            while i < n and data[i] not in b'\r\n':
+                i += 1
+            continue
+        j = i
+        while j < n and data[j] not in b' \t\r\n':
+            j += 1
+        if j == i:
+            raise ValueError("truncated header")
+        fields.append(data[i:j])
+        i = j
+    return fields, i + 1   # One whitespace byte ends the header
+
+
+def read_pnm(data):
+    """
+    Parse a PBM or PGM file
+
+    Args:
+        data: File contents
+
+    Returns:
+        (width, height, maxval, pixels) - pixels a list of values, rows
+        top to bottom; maxval is 1 for a PBM, where 1 is black
+    """
+    magic = bytes(data[:2])
+    if magic not in (b'P1', b'P2', b'P4', b'P5'):
+        raise ValueError("not a PBM or PGM file")
+    bitmap = magic in (b'P1', b'P4')
+    fields, i = _tokens(data, 2, 2 if bitmap else 3)
+    width, height = int(fields[0]), int(fields[1])
+    maxval = 1 if bitmap else int(fields[2])
+    count = width * height
+
+    if magic == b'P4':
+        stride = (width + 7) // 8
+        pixels = []
+        for y in range(height):
+            row = data[i + y * stride:i + (y + 1) * stride]
+            for x in range(width):
+                pixels.append((row[x >> 3] >> (7 - (x & 7))) & 1)
+    elif magic == b'P5':
+        if maxval > 255:
+            raise ValueError("16-bit PGM not supported")
+        pixels = list(data[i:i + count])
+    elif magic == b'P1':
+        pixels = [int(c) for c in data[i:].decode() if c in '01']
+    else:
+        pixels = [int(v) for v in data[i:].split()]
+
+    if len(pixels) < count:
+        raise ValueError("truncated image data")
+    return width, height, maxval, pixels[:count]
+
+
+def mono_image(width, height, maxval, pixels, bitmap):
+    """
+    Pack pixels into a mono panel image (1 = white, MSB leftmost)
+
+    Args:
+        bitmap: pixels come from a PBM (1 = black); otherwise they are
+                gray values where maxval is white
+    """
+    out = bytearray(width * height // 8)
+    for i, v in enumerate(pixels):
+        white = not v if bitmap else v * 2 >= maxval
+        if white:
+            out[i >> 3] |= 0x80 >> (i & 7)
+    return bytes(out)
+
+
+def gray_image(width, height, maxval, pixels):
+    """
+    Pack gray values into the two 4-gray RAM planes, 0x24 then 0x26
+
+    Levels as in gray4.py: 0 black, 1 gray2, 2 gray1, 3 white; a pixel's
+    0x24 bit is its level's high bit, its 0x26 bit the low bit.
+    """
+    plane = width * height // 8
+    out = bytearray(2 * plane)
+    for i, v in enumerate(pixels):
+        level = (v * 3 + maxval // 2) // maxval
+        bit = 0x80 >> (i & 7)
+        if level & 2:
+            out[i >> 3] |= bit
+        if level & 1:
+            out[plane + (i >> 3)] |= bit
+    return bytes(out)
+
+
+def convert(data, mono=False, width=WIDTH, height=HEIGHT):
+    """
+    Convert a PBM or PGM file to a panel image
+
+    Args:
+        data: File contents
+        mono: Threshold a PGM to a mono image instead of 4-gray
+        width, height: Panel size the artwork must match
+
+    Returns:
+        bytes for panel_image.show()
+    """
+    w, h, maxval, pixels = read_pnm(data)
+    if (w, h) != (width, height):
+        raise ValueError("image is {}x{}, panel is {}x{}".format(w, h, width, height))
+    bitmap = data[1:2] in (b'1', b'4')
+    if bitmap or mono:
+        return mono_image(w, h, maxval, pixels, bitmap)
+    return gray_image(w, h, maxval, pixels)
+
+
+def main(argv):
+    args = [a for a in argv if a != '--mono']
+    if len(args) != 2:
+        print("usage: make_panel_image.py [--mono] ARTWORK.pbm|.pgm OUTPUT.bin")
+        return 2
+    with open(args[0], 'rb') as f:
+        data = f.read()
+    try:
+        image = convert(data, '--mono' in argv)
+    except ValueError as e:
+        print("{}: {}".format(args[0], e))
+        return 1
+    with open(args[1], 'wb') as f:
+        f.write(image)
+    kind = 'mono' if len(image) == WIDTH * HEIGHT // 8 else '4-gray'
+    print("{}: {} bytes, {}".format(args[1], len(image), kind))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,572 @@
+"""
+page_store.py - Random access to the explicit pages of a note
+Replaces read-everything-and-split for page counts and single page loads,
+and rewrite-the-whole-file for saving one page
+For Raspberry Pi Pico 2W e-ink typewriter
+
+Pages are separated by '\\n---\\n' markers in the note file. A sidecar
+index (<note>.idx) stores the byte offset where every page starts, along
+with the file size and mtime it was built from. While those still match
+the note, the page count comes from the index alone and reading page N
+seeks straight to its bytes. When they don't (the note was copied in from
+elsewhere) the index is rebuilt with one chunked scan that never decodes
+the text.
+
+Saving a page doesn't touch the note itself. The page is written to a new
+segment file (<note>.<n>.seg) and a small manifest (<note>.man) listing
+where every page now lives, and the size and CRC-32 of the note it was
+made for, is written to a temporary file and renamed over the old one.
+The rename is the commit point: after a crash the manifest names either
+the old or the new segment, never a half-written one, and leftovers are
+removed the next time the note is opened. A save costs the page plus a
+few bytes per page of manifest, however long the note is (the first one
+also reads the note once for its CRC). compact() folds everything back
+into a plain note file when it is closed, so other tools only ever see
+ordinary text.
+"""
+
+import _thread
+import binascii
+import os
+import struct
+from array import array
+
+MARKER = b'\n---\n'
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'PGX1'
+INDEX_HEADER = '<4sIII'   # magic, file size, mtime, page count
+INDEX_HEADER_SIZE = 16
+MANIFEST_SUFFIX = '.man'
+MANIFEST_MAGIC = 'PGM2'
+SEGMENT_SUFFIX = '.seg'
+TMP_SUFFIX = '.tmp'
+SCAN_CHUNK = 512
+
+
+def file_stat(path):
+    """
+    Size and mtime of a file
+
+    Args:
+        path: File path
+
+    Returns:
+        (size, mtime) tuple, (0, 0) if the file doesn't exist
+    """
+    try:
+        st = os.stat(path)
+        return st[6], st[8]
+    except OSError:
+        return 0, 0
+
+
+def file_crc(path):
+    """
+    CRC-32 of a file, read in chunks
+
+    Args:
+        path: File path
+
+    Returns:
+        CRC as an int, 0 if the file doesn't exist
+    """
+    crc = 0
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(SCAN_CHUNK)
+                if not chunk:
+                    break
+                crc = binascii.crc32(chunk, crc)
+    except OSError:
+        return 0
+    return crc
+
+
+def _remove(path):
+    """Delete a file if it exists"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def segment_paths(path):
+    """
+    Segment files belonging to a note
+
+    Args:
+        path: Note file path
+
+    Returns:
+        List of segment file paths
+    """
+    if '/' in path:
+        directory, name = path.rsplit('/', 1)
+        prefix = directory + '/'
+    else:
+        directory, name = '', path
+        prefix = ''
+    try:
+        names = os.listdir(directory) if directory else os.listdir()
+    except OSError:
+        return []
+
+    found = []
+    head = name + '.'
+    for f in names:
+        if (f.startswith(head) and f.endswith(SEGMENT_SUFFIX)
+                and f[len(head):-len(SEGMENT_SUFFIX)].isdigit()):
+            found.append(prefix + f)
+    return found
+
+
+class PageStore:
+    """
+    Page-indexed view of a note file, with per-page saving
+
+    Indexing returns page text, so a PageStore can stand in for the list
+    from PageManager.split_into_pages() (len(store), store[n]) - with the
+    same results, including a single empty page for a blank file.
+
+    One thread may write (write_page) while another reads. A page queued
+    for saving can be staged first so readers see the new text before it
+    reaches the flash. compact() must not run alongside writes.
+
+    The staged pages, the manifest entries and the first open are shared
+    between the cores, so every public method takes the store's lock. A
+    segment is written without it; only the manifest swap holds it.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Note file path
+        """
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.manifest_path = path + MANIFEST_SUFFIX
+        self._starts = None   # array('I') of page start offsets
+        self._stat = None     # (size, mtime) the index was built from
+        self._cached = None   # (page index, text) of the last page read
+        self._opened = False  # Leftovers from a crash cleaned up
+        self._note_crc = None  # CRC-32 of the note, once a manifest needs it
+        # Pages while the manifest is in use, None while the note file
+        # holds everything. Entries are a page number in the note file,
+        # a segment path, or None for an empty page.
+        self._entries = None
+        self._gen = 0         # Last segment number used
+        self._staged = {}     # page index -> [load_page, text]
+        self._lock = _thread.allocate_lock()
+        self.index_builds = 0  # Full scans so far (stats)
+        self.bytes_read = 0    # Page bytes read so far (stats)
+        self.bytes_written = 0  # Segment and manifest bytes (stats)
+
+    @staticmethod
+    def discard_sidecars(path):
+        """Remove the index, manifest and segments of a deleted or renamed note"""
+        _remove(path + INDEX_SUFFIX)
+        _remove(path + MANIFEST_SUFFIX)
+        _remove(path + MANIFEST_SUFFIX + TMP_SUFFIX)
+        _remove(path + TMP_SUFFIX)
+        for seg in segment_paths(path):
+            _remove(seg)
+
+    def invalidate(self):
+        """Forget the in-memory index and page (call if the note is written elsewhere)"""
+        self._starts = None
+        self._stat = None
+        self._cached = None
+        self._note_crc = None
+
+    # ----- Note file index -----
+
+    def _load_index(self, stat):
+        """Read the sidecar index; returns False if missing or stale"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < INDEX_HEADER_SIZE:
+            return False
+        magic, size, mtime, count = struct.unpack_from(INDEX_HEADER, data, 0)
+        if (magic != INDEX_MAGIC or (size, mtime) != stat or count == 0
+                or len(data) != INDEX_HEADER_SIZE + 4 * count):
+            return False
+        self._starts = array('I', struct.unpack_from('<%dI' % count, data,
+                                                     INDEX_HEADER_SIZE))
+        return True
+
+    def _scan(self):
+        """Find the start offset of every page with one pass over the file"""
+        starts = array('I', [0])
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return starts
+        with f:
+            tail = b''
+            base = 0  # File offset of tail[0]
+            while True:
+                chunk = f.read(SCAN_CHUNK)
+                if not chunk:
+                    break
+                buf = tail + chunk
+                last = 0
+                i = buf.find(MARKER)
+                while i >= 0:
+                    last = i + len(MARKER)
+                    starts.append(base + last)
+                    i = buf.find(MARKER, last)
+                # Keep enough to match a marker split across chunks, but
+                # never bytes already consumed by a match
+                keep = max(last, len(buf) - len(MARKER) + 1)
+                tail = buf[keep:]
+                base += keep
+        return starts
+
+    def _write_index(self):
+        """Persist the index next to the note (best effort)"""
+        count = len(self._starts)
+        try:
+            with open(self.index_path, 'wb') as f:
+                f.write(struct.pack(INDEX_HEADER, INDEX_MAGIC,
+                                    self._stat[0], self._stat[1], count))
+                f.write(struct.pack('<%dI' % count, *self._starts))
+        except OSError:
+            pass  # Read-only filesystem - the index is just rebuilt next time
+
+    def _ensure_index(self):
+        """Make the in-memory index match the note on disk"""
+        stat = file_stat(self.path)
+        if stat == self._stat:
+            return
+        self._cached = None
+        if not self._load_index(stat):
+            self._starts = self._scan()
+            self._stat = stat  # _write_index() records it
+            self.index_builds += 1
+            if stat != (0, 0):
+                self._write_index()
+        self._stat = stat
+
+    def _note_span(self, page_index):
+        """Byte range of a page in the note file, excluding the markers"""
+        start = self._starts[page_index]
+        if page_index + 1 < len(self._starts):
+            end = self._starts[page_index + 1] - len(MARKER)
+        else:
+            end = self._stat[0]
+        return start, end
+
+    def _read_note_page(self, page_index):
+        """Text of a page of the note file, "" past its last page"""
+        self._ensure_index()
+        if page_index < 0 or page_index >= len(self._starts):
+            return ""
+        start, end = self._note_span(page_index)
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                data = f.read(end - start)
+        except OSError:
+            return ""
+        self.bytes_read += len(data)
+        text = str(data, 'utf-8')
+
+        # A blank note is one empty page, as in split_into_pages()
+        if len(self._starts) == 1 and not text.strip():
+            text = ""
+        return text
+
+    # ----- Manifest -----
+
+    def _note_checksum(self):
+        """CRC-32 of the note, read once while a manifest is in use"""
+        if self._note_crc is None:
+            self._note_crc = file_crc(self.path)
+        return self._note_crc
+
+    def _open(self):
+        """
+        Load the manifest and clean up after an interrupted save
+
+        Runs once, from whichever core gets there first; call while holding
+        the lock.
+        """
+        if self._opened:
+            return
+        self._opened = True
+        _remove(self.manifest_path + TMP_SUFFIX)
+        _remove(self.path + TMP_SUFFIX)
+
+        self._entries = self._load_manifest()
+        if self._entries is None:
+            _remove(self.manifest_path)
+        live = self._entries or ()
+        for seg in segment_paths(self.path):
+            if seg not in live:
+                _remove(seg)
+
+    def _load_manifest(self):
+        """Parse the manifest; None if missing, damaged or for another note"""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                lines = f.read().split('\n')
+        except OSError:
+            return None
+        header = lines[0].split()
+        # The mtime isn't checked - opening the note for append can bump
+        # it, and dropping a good manifest would lose saved pages. The
+        # size rules most notes out without reading them; the CRC catches
+        # an edit that kept the size, or the note a crash during compact()
+        # left the manifest's pages folded into.
+        try:
+            if (len(header) != 4 or header[0] != MANIFEST_MAGIC
+                    or int(header[1]) != file_stat(self.path)[0]
+                    or int(header[2]) != self._note_checksum()):
+                return None
+            gen = int(header[3])
+
+            entries = []
+            for line in lines[1:]:
+                if not line:
+                    continue
+                kind = line[0]
+                if kind == 'b':
+                    entries.append(int(line[1:]))
+                elif kind == 's':
+                    entries.append('%s.%s%s' % (self.path, line[1:], SEGMENT_SUFFIX))
+                else:
+                    entries.append(None)
+        except (ValueError, IndexError):
+            return None
+        self._gen = gen
+        return entries
+
+    def _write_manifest(self, entries):
+        """Write the manifest to a temporary file and rename it into place"""
+        head = len(self.path) + 1
+        lines = ['%s %d %d %d' % (MANIFEST_MAGIC, file_stat(self.path)[0],
+                                  self._note_checksum(), self._gen)]
+        for entry in entries:
+            if entry is None:
+                lines.append('e')
+            elif isinstance(entry, int):
+                lines.append('b%d' % entry)
+            else:
+                lines.append('s' + entry[head:-len(SEGMENT_SUFFIX)])
+        data = '\n'.join(lines) + '\n'
+
+        tmp = self.manifest_path + TMP_SUFFIX
+        with open(tmp, 'w') as f:
+            f.write(data)
+        os.rename(tmp, self.manifest_path)
+        self.bytes_written += len(data)
+
+    # ----- Reading -----
+
+    def page_count(self):
+        """Number of explicit pages (at least 1)"""
+        with self._lock:
+            self._open()
+            entries = self._entries
+            if entries is None:
+                self._ensure_index()
+                count = len(self._starts)
+            else:
+                count = max(1, len(entries))
+            for page_index in list(self._staged):
+                if page_index >= count:
+                    count = page_index + 1
+            return count
+
+    def read_page(self, page_index):
+        """
+        Text of one page, reading only that page's bytes
+
+        Args:
+            page_index: Explicit page number
+
+        Returns:
+            Page text, "" past the last page
+        """
+        with self._lock:
+            return self._read_page(page_index)
+
+    def _read_page(self, page_index):
+        """read_page() body; call while holding the lock"""
+        staged = self._staged.get(page_index)
+        if staged is not None:
+            if staged[1] is None:
+                staged[1] = staged[0]()
+            return staged[1]
+
+        self._open()
+        entries = self._entries
+        if entries is None:
+            self._ensure_index()  # Drops the cached page if the note changed
+        cached = self._cached
+        if cached is not None and cached[0] == page_index:
+            return cached[1]
+
+        if entries is None:
+            text = self._read_note_page(page_index)
+        elif page_index < 0 or page_index >= len(entries):
+            text = ""
+        else:
+            entry = entries[page_index]
+            if entry is None:
+                text = ""
+            elif isinstance(entry, int):
+                text = self._read_note_page(entry)
+            else:
+                try:
+                    with open(entry, 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    return ""
+                self.bytes_read += len(data)
+                text = str(data, 'utf-8')
+        self._cached = (page_index, text)
+        return text
+
+    def __len__(self):
+        return self.page_count()
+
+    def __getitem__(self, page_index):
+        if page_index < 0 or page_index >= self.page_count():
+            raise IndexError(page_index)
+        return self.read_page(page_index)
+
+    # ----- Writing -----
+
+    def stage_page(self, page_index, load_page):
+        """
+        Show new text for a page before write_page() has stored it
+
+        Args:
+            page_index: Explicit page number
+            load_page: Callable returning the page text, only called if
+                       the page is read before the save lands
+
+        Returns:
+            Token to pass to write_page()
+        """
+        token = [load_page, None]
+        with self._lock:
+            self._staged[page_index] = token
+        return token
+
+    def write_page(self, page_index, content, token=None):
+        """
+        Save one page without rewriting the rest of the note
+
+        Args:
+            page_index: Explicit page number (pages are added as needed)
+            content: Page text, or a callable writing the page's UTF-8
+                     bytes to an open binary file and returning the count
+            token: Value from stage_page() for this save, if staged
+        """
+        with self._lock:
+            self._open()
+            if self._entries is None:
+                self._ensure_index()
+                entries = list(range(len(self._starts)))
+                if len(entries) == 1 and not self._read_note_page(0):
+                    entries = [None]  # Blank note, kept blank as when split
+            else:
+                entries = list(self._entries)
+            while len(entries) <= page_index:
+                entries.append(None)
+            self._gen += 1
+            seg = '%s.%d%s' % (self.path, self._gen, SEGMENT_SUFFIX)
+
+        # Nothing names the segment yet, so readers carry on meanwhile
+        with open(seg, 'wb') as f:
+            if isinstance(content, str):
+                written = f.write(content.encode('utf-8'))
+            else:
+                written = content(f)
+
+        with self._lock:
+            self.bytes_written += written
+            old = entries[page_index]
+            entries[page_index] = seg
+            self._write_manifest(entries)
+
+            # Committed - swap in the new pages before a reader can look
+            self._entries = entries
+            self._cached = None
+            if token is not None and self._staged.get(page_index) is token:
+                del self._staged[page_index]
+        if isinstance(old, str):
+            _remove(old)
+
+    def compact(self):
+        """
+        Fold saved pages back into a plain note file (call when closing it)
+
+        Returns:
+            True if the note file was rewritten
+        """
+        with self._lock:
+            return self._compact()
+
+    def _compact(self):
+        """compact() body; call while holding the lock"""
+        self._open()
+        entries = self._entries
+        if entries is None:
+            return False
+
+        self._ensure_index()
+        tmp = self.path + TMP_SUFFIX
+        note = None
+        try:
+            with open(tmp, 'wb') as out:
+                for i, entry in enumerate(entries):
+                    if i:
+                        out.write(MARKER)
+                    if entry is None:
+                        continue
+                    if isinstance(entry, int):
+                        if note is None:
+                            note = open(self.path, 'rb')
+                        start, end = self._note_span(entry)
+                        note.seek(start)
+                        remaining = end - start
+                        src = note
+                    else:
+                        src = open(entry, 'rb')
+                        remaining = -1  # Whole segment
+                    while remaining:
+                        chunk = src.read(SCAN_CHUNK if remaining < 0
+                                         else min(SCAN_CHUNK, remaining))
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        if remaining > 0:
+                            remaining -= len(chunk)
+                    if src is not note:
+                        src.close()
+        finally:
+            if note is not None:
+                note.close()
+        # The old index could pass for the new note's if the size and
+        # mtime (whole seconds) happen to match
+        _remove(self.index_path)
+        os.rename(tmp, self.path)
+
+        # The note is complete from here; the manifest is now stale. The
+        # index is rebuilt on next use, as a page may itself contain a
+        # marker line and split in two once folded in.
+        self.invalidate()
+        _remove(self.manifest_path)
+        for entry in entries:
+            if isinstance(entry, str):
+                _remove(entry)
+        self._entries = None
+        self._cached = None
+        return True
@@ -0,0 +1,119 @@
+"""
+status_bar.py - Status line and footer drawn in a strip of their own
+Composited over the bottom text row of the published frame, so showing or
+clearing a message refreshes just that strip
+For Raspberry Pi Pico 2W e-ink typewriter
+
+status() used to draw into the editor's frame, over whatever text was on
+the bottom row, and send a whole-screen partial refresh. Nothing put the
+text back. The strip here is a separate 1-bit framebuffer. FrameBuffers
+copies it over the front frame after each publish, while the back frame
+keeps the text. A message therefore costs one strip refresh, and clearing
+it costs another that brings the text underneath back. Neither touches
+the row renderer.
+
+A page footer is the strip's resting content; a message replaces it until
+it expires, then the footer comes back.
+"""
+
+try:
+    import framebuf
+except ImportError:
+    # Desktop Python - tests draw into the strip with an image of their own
+    framebuf = None
+
+
+class StatusBar:
+    """
+    A full-width strip of rows holding a status message or a footer
+
+    Text is black on white: a message or footer label at the left margin,
+    and an optional footer label right-aligned.
+    """
+
+    def __init__(self, width, y, height, margin_left, char_width):
+        """
+        Args:
+            width: Frame width in pixels
+            y: Top row of the strip in the frame
+            height: Rows in the strip (CHAR_HEIGHT: one text row)
+            margin_left: X of the left-hand text
+            char_width: Width of a character, to right-align labels
+        """
+        self.width = width
+        self.y = y
+        self.height = height
+        self.margin_left = margin_left
+        self.char_width = char_width
+        self.region = (0, y, width, height)   # For a windowed refresh
+        self.offset = y * (width // 8)        # Strip's first byte in the frame
+        self.buffer = bytearray(b'\xff' * (width // 8 * height))
+        self.image = None
+        if framebuf is not None:
+            self.image = framebuf.FrameBuffer(self.buffer, width, height,
+                                              framebuf.MONO_HLSB)
+        self.message = None   # Message shown over the footer, or None
+        self.footer = None    # (left, right) labels, or None for no footer
+        self.shown = 0        # Messages shown (stats)
+
+    def visible(self):
+        """True if the strip has anything to composite"""
+        return self.message is not None or self.footer is not None
+
+    def show_message(self, msg):
+        """Show msg in place of the footer until expire()"""
+        self.message = msg
+        self.shown += 1
+        self._draw()
+
+    def expire(self):
+        """
+        Take the message down, back to the footer
+
+        Returns:
+            True if the strip changed and needs a refresh
+        """
+        if self.message is None:
+            return False
+        self.message = None
+        self._draw()
+        return True
+
+    def set_footer(self, left, right=None):
+        """
+        Set the footer labels; None for left removes the footer
+
+        Returns:
+            True if the strip changed and needs a refresh
+        """
+        footer = None if left is None else (left, right)
+        if footer == self.footer:
+            return False
+        self.footer = footer
+        if self.message is not None:
+            return False   # Shows once the message expires
+        self._draw()
+        return True
+
+    def composite(self, frame):
+        """
+        Copy the strip over its rows of a full frame
+
+        Args:
+            frame: Frame bytearray (MONO_HLSB) of the same width
+        """
+        if self.visible():
+            frame[self.offset:self.offset + len(self.buffer)] = self.buffer
+
+    def _draw(self):
+        """Redraw the strip for the current message or footer"""
+        image = self.image
+        image.fill(1)
+        if self.message is not None:
+            image.text(self.message, self.margin_left, 0, 0)
+        elif self.footer is not None:
+            left, right = self.footer
+            image.text(left, self.margin_left, 0, 0)
+            if right:
+                x = self.width - len(right) * self.char_width - 10
+                image.text(right, x, 0, 0)
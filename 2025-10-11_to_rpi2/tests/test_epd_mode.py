@@ -0,0 +1,237 @@
+# test_epd_mode.py - EPD Controller Mode Unit Tests
+# Tests the ControllerState display42.py consults to skip inits the
+# controller doesn't need and to restore registers after partial updates
+# Can run on Pico (with epd_mode.py copied alongside) or desktop Python
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    from epd_mode import ControllerState, FULL, FAST, PARTIAL, GRAY4, SLEEP
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from epd_mode import ControllerState, FULL, FAST, PARTIAL, GRAY4, SLEEP
+
+SECONDS_1_5S = 0   # EPD_4in2.Seconds_1_5S
+SECONDS_1S = 1     # EPD_4in2.Seconds_1S
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  EPD MODE UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def init(state, mode, speed=None):
+    """What an Init method does: run only if needed. True if it ran"""
+    if state.need_init(mode, speed):
+        state.reset()
+        state.initialised(mode, speed)
+        return True
+    return False
+
+#───────────────────────────────────────────────#
+# ─────────── ControllerState Tests ────────────#
+#───────────────────────────────────────────────#
+
+def test_repeat_init_avoided():
+    """Test a repeated init for the same mode is skipped and counted"""
+    state = ControllerState()
+    if not init(state, FAST, SECONDS_1_5S):
+        return False, "First init skipped"
+    for _ in range(3):   # Page breaks, clears
+        if init(state, FAST, SECONDS_1_5S):
+            return False, "Repeated init ran"
+    if state.inits != 1 or state.inits_avoided != 3:
+        return False, f"{state.inits} run, {state.inits_avoided} avoided"
+
+    return True, "1 run, 3 avoided"
+
+def test_transitions_need_init():
+    """Test a different mode, speed, gray LUT or sleep forces an init"""
+    state = ControllerState()
+    init(state, FAST, SECONDS_1_5S)
+    if not init(state, FAST, SECONDS_1S):
+        return False, "Speed change skipped"
+    if not init(state, FULL):
+        return False, "Fast to full skipped"
+    if not init(state, GRAY4):
+        return False, "Gray LUT not loaded"
+    if init(state, GRAY4):
+        return False, "Gray LUT reloaded"
+    if not init(state, FULL):
+        return False, "Gray to full skipped"
+
+    state.sleep()
+    if state.mode != SLEEP or not init(state, FULL):
+        return False, "Init after deep sleep skipped"
+    state.reset()
+    if not init(state, FULL):
+        return False, "Init after reset skipped"
+
+    return True, f"{state.inits} inits"
+
+def test_partial_registers():
+    """Test partial updates keep the base mode but need registers back"""
+    state = ControllerState()
+    init(state, FAST, SECONDS_1_5S)
+    if state.leave_partial():
+        return False, "Registers rewritten without a partial"
+
+    state.partial()
+    if state.mode != PARTIAL:
+        return False, f"Mode {state.mode}"
+    if init(state, FAST, SECONDS_1_5S):
+        return False, "Init after partial ran"
+    if not state.leave_partial() or state.mode != FAST:
+        return False, "Registers not restored for a full refresh"
+    if state.leave_partial():
+        return False, "Registers restored twice"
+
+    init(state, GRAY4)
+    state.partial()
+    if state.mode != GRAY4 or state.leave_partial():
+        return False, "Partial tracked in 4-gray mode"
+
+    return True, "Partial on fast: no init, registers back once"
+
+def test_fast_lut_after_partial():
+    """Test a fast init skipped after a partial leaves the fast LUT to reload"""
+    state = ControllerState()
+    init(state, FAST, SECONDS_1S)
+    state.partial()      # Built-in partial loads the OTP partial LUT
+    avoided = state.inits_avoided
+    if init(state, FAST, SECONDS_1S):
+        return False, "Reset although leaving partial reloads the LUT"
+    if state.inits_avoided != avoided + 1:
+        return False, "Skipped init not counted"
+
+    # The next full-frame update has to load the fast LUT for this speed
+    if not state.leave_partial():
+        return False, "Fast LUT not reloaded before the full refresh"
+    if state.base != (FAST, SECONDS_1S):
+        return False, f"Reload for base {state.base}"
+
+    state.partial()
+    if not init(state, FAST, SECONDS_1_5S):
+        return False, "Other speed's init skipped"
+
+    return True, "Fast LUT reloaded on leaving partial"
+
+def test_custom_waveform():
+    """Test a custom partial waveform forces the next black/white init"""
+    state = ControllerState()
+    init(state, FAST, SECONDS_1_5S)
+    state.partial(True)
+    if not state.custom_lut:
+        return False, "Custom waveform not tracked"
+    if not init(state, FAST, SECONDS_1_5S):
+        return False, "Fast init skipped with the custom waveform loaded"
+    if state.custom_lut:
+        return False, "Custom waveform kept after init"
+
+    state.partial(True)
+    state.partial()      # Built-in partial reloads the OTP waveform
+    if state.custom_lut or init(state, FAST, SECONDS_1_5S):
+        return False, "Init still needed after a built-in partial"
+
+    state.partial(True)
+    state.reset()
+    if state.custom_lut:
+        return False, "Custom waveform kept over a reset"
+
+    init(state, GRAY4)
+    state.partial(True)
+    if state.custom_lut:
+        return False, "Custom waveform tracked in 4-gray mode"
+
+    return True, "Re-init after custom, not after built-in"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all EPD mode tests"""
+    print_header()
+
+    print("═ ControllerState Tests ═")
+    print_test("Repeated init avoided")
+    passed, details = test_repeat_init_avoided()
+    print_result(passed, details)
+
+    print_test("Transitions that need an init")
+    passed, details = test_transitions_need_init()
+    print_result(passed, details)
+
+    print_test("Partial update registers")
+    passed, details = test_partial_registers()
+    print_result(passed, details)
+
+    print_test("Fast LUT after partial")
+    passed, details = test_fast_lut_after_partial()
+    print_result(passed, details)
+
+    print_test("Custom partial waveform")
+    passed, details = test_custom_waveform()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
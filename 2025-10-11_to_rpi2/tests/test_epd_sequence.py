@@ -0,0 +1,244 @@
+# test_epd_sequence.py - EPD Register Sequence Unit Tests
+# Tests the (command, length, data...) tables display42.py streams one CS
+# frame per command, against the bytes the per-byte calls used to send
+# Can run on Pico (with epd_sequence.py copied alongside) or desktop Python
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    import epd_sequence
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    import epd_sequence
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  EPD SEQUENCE UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+class Bus:
+    """SPI bus plus DC/CS pins, recording what the controller receives"""
+
+    def __init__(self):
+        self.dc = 1
+        self.cs = 1
+        self.received = []     # (dc, byte) latched while CS is low
+        self.transactions = 0  # CS-low frames
+
+    def write(self, buf):
+        if self.cs:
+            raise AssertionError("SPI write with CS high")
+        for b in bytes(buf):
+            self.received.append((self.dc, b))
+
+class BusPin:
+    """Pin.value() driving one of the Bus lines"""
+
+    def __init__(self, bus, name):
+        self.bus = bus
+        self.name = name
+
+    def value(self, v):
+        if self.name == 'cs' and v == 0:
+            self.bus.transactions += 1
+        setattr(self.bus, self.name, v)
+
+def streamed(sequence):
+    """Bus after streaming a parsed sequence"""
+    bus = Bus()
+    epd_sequence.stream(sequence, bus, BusPin(bus, 'dc'), BusPin(bus, 'cs'))
+    return bus
+
+def per_byte(commands):
+    """What send_command()/send_data() deliver for (command, data) pairs"""
+    received = []
+    for command, data in commands:
+        received.append((0, command))
+        for b in data:
+            received.append((1, b))
+    return received
+
+#───────────────────────────────────────────────#
+# ─────────── Sequence Tests ───────────────────#
+#───────────────────────────────────────────────#
+
+def test_encode_records():
+    """Test encoding and parsing round-trip"""
+    commands = ((0x21, (0x40, 0x00)), (0x20, ()), (0x32, bytes(range(227))))
+    blob = epd_sequence.encode(*commands)
+    if blob[:6] != bytes((0x21, 2, 0x40, 0x00, 0x20, 0)):
+        return False, f"Encoded {blob[:6]}"
+    parsed = epd_sequence.records(blob)
+    if [(bytes(c)[0], bytes(d)) for c, d in parsed] != \
+            [(c, bytes(d)) for c, d in commands]:
+        return False, "Round trip differs"
+
+    try:
+        epd_sequence.records(blob[:-1])
+        return False, "Truncated blob accepted"
+    except ValueError:
+        pass
+    try:
+        epd_sequence.encode((0x32, bytes(256)))
+        return False, "Oversized record accepted"
+    except ValueError:
+        pass
+
+    return True, f"{len(parsed)} records, {len(blob)} bytes"
+
+def test_stream_matches_per_byte():
+    """Test streaming sends the same bytes, one CS frame per command"""
+    commands = ((0x3C, (0x80,)), (0x21, (0x00, 0x00)), (0x3C, (0x80,)), (0x20, ()))
+    bus = streamed(epd_sequence.records(epd_sequence.encode(*commands)))
+    if bus.received != per_byte(commands):
+        return False, f"Received {bus.received}"
+    if bus.transactions != len(commands) or bus.cs != 1:
+        return False, f"{bus.transactions} CS frames"
+
+    return True, f"{len(bus.received)} bytes in {bus.transactions} CS frames"
+
+def test_tables():
+    """Test the register tables hold the driver's original init bytes"""
+    full_window = ((0x11, (0x03,)), (0x44, (0x00, 0x31)),
+                   (0x45, (0x00, 0x00, 0x2B, 0x01)),
+                   (0x4E, (0x00,)), (0x4F, (0x00, 0x00)))
+    expected = (
+        (epd_sequence.MONO_START, ((0x21, (0x40, 0x00)), (0x3C, (0x05,)))),
+        (epd_sequence.FAST_1_5S, ((0x1A, (0x6E,)), (0x22, (0x91,)), (0x20, ()))),
+        (epd_sequence.FAST_1S, ((0x1A, (0x5A,)), (0x22, (0x91,)), (0x20, ()))),
+        (epd_sequence.GRAY_START, ((0x21, (0x00, 0x00)), (0x3C, (0x03,)),
+                                   (0x0C, (0x8B, 0x9C, 0xA4, 0x0F)))),
+        (epd_sequence.FULL_WINDOW, full_window),
+        (epd_sequence.PARTIAL_START, ((0x3C, (0x80,)), (0x21, (0x00, 0x00)),
+                                      (0x3C, (0x80,)))),
+    )
+    for sequence, commands in expected:
+        if streamed(sequence).received != per_byte(commands):
+            return False, f"Table differs at command {commands[0][0]:#x}"
+
+    return True, f"{len(expected)} tables"
+
+def test_window():
+    """Test window records are rewritten in place, as SetWindow() did"""
+    blob = bytearray(epd_sequence.WINDOW_TEMPLATE)
+    sequence = epd_sequence.records(blob)
+    for window in ((0, 0x31, 0, 0x12B), (1, 4, 270, 284)):
+        x_start, x_end, y_start, y_end = window
+        epd_sequence.fill_window(blob, *window)
+        commands = ((0x44, (x_start, x_end)),
+                    (0x45, (y_start & 0xFF, y_start >> 8, y_end & 0xFF, y_end >> 8)),
+                    (0x4E, (x_start,)),
+                    (0x4F, (y_start & 0xFF, y_start >> 8)))
+        if streamed(sequence).received != per_byte(commands):
+            return False, f"Window {window} differs"
+
+    return True, "Same bytes as the per-byte SetWindow()"
+
+def test_lut_records():
+    """Test a waveform LUT is split into the registers Lut() loads"""
+    lut = bytes(i & 0xFF for i in range(epd_sequence.LUT_BYTES))
+    commands = ((0x32, lut[:227]), (0x3F, lut[227:228]), (0x03, lut[228:229]),
+                (0x04, lut[229:232]), (0x2C, lut[232:233]))
+    if streamed(epd_sequence.lut_records(lut)).received != per_byte(commands):
+        return False, "LUT records differ"
+
+    for size in (0, 227, epd_sequence.LUT_BYTES + 1):
+        try:
+            epd_sequence.lut_records(bytes(size))
+            return False, f"{size}-byte LUT accepted"
+        except ValueError:
+            pass
+
+    return True, "5 registers, wrong sizes rejected"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all EPD sequence tests"""
+    print_header()
+
+    print("═ Sequence Tests ═")
+    print_test("Encode and parse")
+    passed, details = test_encode_records()
+    print_result(passed, details)
+
+    print_test("Stream matches per-byte writes")
+    passed, details = test_stream_matches_per_byte()
+    print_result(passed, details)
+
+    print_test("Register tables")
+    passed, details = test_tables()
+    print_result(passed, details)
+
+    print_test("Window setup")
+    passed, details = test_window()
+    print_result(passed, details)
+
+    print_test("Waveform LUT records")
+    passed, details = test_lut_records()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
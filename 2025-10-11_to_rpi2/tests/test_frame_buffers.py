@@ -0,0 +1,210 @@
+# test_frame_buffers.py - Frame Buffers Unit Tests
+# Tests the back/front frame handoff between Core 0 (drawing) and the
+# display worker on Core 1 (sending)
+# Can run on Pico (with frame_buffers.py copied alongside) or desktop Python
+
+import sys
+import _thread
+import time
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    from frame_buffers import FrameBuffers
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from frame_buffers import FrameBuffers
+
+FRAME_BYTES = 400 * 300 // 8
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  FRAME BUFFERS UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def white_frame():
+    """A blank 1-bit frame"""
+    return bytearray(b'\xff' * FRAME_BYTES)
+
+def sleep_ms(ms):
+    """time.sleep_ms() on the Pico, time.sleep() on desktop"""
+    if hasattr(time, 'sleep_ms'):
+        time.sleep_ms(ms)
+    else:
+        time.sleep(ms / 1000)
+
+#───────────────────────────────────────────────#
+# ─────────── FrameBuffers Tests ───────────────#
+#───────────────────────────────────────────────#
+
+def test_publish_copies():
+    """Test the worker sees a frame only once it is published"""
+    back = white_frame()
+    frames = FrameBuffers(back)
+    if not frames.double() or frames.front is back:
+        return False, "No front frame of its own"
+
+    back[100] = 0x00
+    if frames.front == back:
+        return False, "Front frame up to date before publishing"
+    frames.publish()
+    if frames.front != back:
+        return False, "Published frame differs"
+
+    back[200] = 0x0F   # Next frame being drawn
+    if frames.front[200] == 0x0F:
+        return False, "Drawing reached the published frame"
+    if frames.published != 1 or frames.waits != 0:
+        return False, f"{frames.published} published, {frames.waits} waited"
+
+    return True, "Back frame copied on publish only"
+
+def test_single_frame():
+    """Test double=False shares the one frame, as before"""
+    back = white_frame()
+    frames = FrameBuffers(back, double=False)
+    if frames.double() or frames.front is not back:
+        return False, "Separate front frame allocated"
+    back[0] = 0x00
+    frames.publish()
+    if frames.front[0] != 0x00 or frames.published != 0:
+        return False, "Single frame not shared"
+
+    return True, "No extra RAM"
+
+def test_publish_waits_for_send():
+    """Test publishing waits for a send in progress, then goes through"""
+    back = white_frame()
+    frames = FrameBuffers(back)
+    sending = []
+
+    def worker():
+        # Holds the front frame as the display worker does while sending
+        with frames.lock:
+            sending.append(bytes(frames.front[:4]))
+            sleep_ms(100)
+            sending.append(bytes(frames.front[:4]))
+
+    _thread.start_new_thread(worker, ())
+    while not sending:
+        sleep_ms(1)
+
+    back[0] = 0x00
+    frames.publish()
+    if len(sending) != 2 or sending[0] != sending[1]:
+        return False, "Frame changed during a send"
+    if frames.waits != 1 or frames.front[0] != 0x00:
+        return False, f"{frames.waits} waits, front[0]={frames.front[0]:#x}"
+
+    return True, "1 wait, frame unchanged while sending"
+
+def test_pending_bands():
+    """Test bands published during a refresh coalesce into one"""
+    back = white_frame()
+    frames = FrameBuffers(back)
+    if not frames.publish((8, 30, 16, 15)):
+        return False, "First band did not ask for a refresh"
+    # Typed while the panel is busy: join the band already asked for
+    if frames.publish((24, 30, 8, 15)) or frames.publish((0, 45, 8, 15)):
+        return False, "Band asked for a second refresh"
+    with frames.lock:
+        region = frames.take_pending()
+        again = frames.take_pending()
+    if region != (0, 30, 32, 30) or again is not None:
+        return False, f"Took {region}, then {again}"
+    if frames.coalesced != 2 or frames.published != 3:
+        return False, f"{frames.coalesced} coalesced, {frames.published} published"
+    if not frames.publish((8, 30, 8, 15)):
+        return False, "Band after take did not ask for a refresh"
+
+    single = FrameBuffers(white_frame(), double=False)
+    if not single.publish((0, 0, 8, 15)) or single.publish((8, 0, 8, 15)):
+        return False, "Single frame bands not coalesced"
+
+    return True, "3 keystrokes, 1 refresh of (0, 30, 32, 30)"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all frame buffers tests"""
+    print_header()
+
+    print("═ FrameBuffers Tests ═")
+    print_test("Publish copies")
+    passed, details = test_publish_copies()
+    print_result(passed, details)
+
+    print_test("Single frame")
+    passed, details = test_single_frame()
+    print_result(passed, details)
+
+    print_test("Publish waits for send")
+    passed, details = test_publish_waits_for_send()
+    print_result(passed, details)
+
+    print_test("Pending bands coalesce")
+    passed, details = test_pending_bands()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
@@ -0,0 +1,207 @@
+# test_frame_shadow.py - Frame Shadow Unit Tests
+# Tests the FrameShadow last-sent-frame copy display42.py uses to skip
+# unchanged partial refreshes and narrow the rest to the rows that differ
+# Can run on Pico (with frame_shadow.py copied alongside) or desktop Python
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    from frame_shadow import FrameShadow
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from frame_shadow import FrameShadow
+
+WIDTH = 400
+HEIGHT = 300
+STRIDE = WIDTH // 8
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  FRAME SHADOW UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def white_frame():
+    """A blank 1-bit frame"""
+    return bytearray(b'\xff' * (STRIDE * HEIGHT))
+
+def sent_shadow(frame):
+    """A shadow that has seen frame go out in full"""
+    shadow = FrameShadow(WIDTH, HEIGHT)
+    shadow.commit(frame)
+    return shadow
+
+#───────────────────────────────────────────────#
+# ─────────── FrameShadow Tests ────────────────#
+#───────────────────────────────────────────────#
+
+def test_unknown_glass():
+    """Test every row counts as changed until a full frame is sent"""
+    shadow = FrameShadow(WIDTH, HEIGHT)
+    frame = white_frame()
+    if shadow.diff(frame) != (0, HEIGHT):
+        return False, "New shadow trusted"
+    if shadow.diff(frame, 2, 5, 20, 35) != (20, 35):
+        return False, "Window not passed through"
+
+    shadow.commit(frame, 2, 5, 20, 35)  # A window alone proves nothing
+    if shadow.diff(frame) != (0, HEIGHT):
+        return False, "Shadow trusted after a window"
+
+    shadow.commit(frame)
+    shadow.forget()
+    if shadow.diff(frame) != (0, HEIGHT):
+        return False, "Shadow trusted after forget()"
+
+    return True, "Full refresh until the panel contents are known"
+
+def test_unchanged_skipped():
+    """Test an identical frame is skipped and counted"""
+    frame = white_frame()
+    shadow = sent_shadow(frame)
+    if shadow.diff(frame) is not None:
+        return False, "Unchanged frame reported dirty"
+    if shadow.diff(frame, 3, 9, 100, 130) is not None:
+        return False, "Unchanged window reported dirty"
+    if shadow.skipped != 2 or shadow.sent != 1:
+        return False, f"Counted {shadow.sent} sent, {shadow.skipped} skipped"
+
+    return True, "2 skipped, 1 sent"
+
+def test_changed_rows():
+    """Test the row range covers exactly the rows that differ"""
+    frame = white_frame()
+    shadow = sent_shadow(frame)
+    frame[42 * STRIDE + 7] = 0x00
+    frame[57 * STRIDE + 30] = 0x7F
+    if shadow.diff(frame) != (42, 58):
+        return False, f"Got {shadow.diff(frame)}"
+    if shadow.diff(frame, 0, STRIDE, 50, 100) != (57, 58):
+        return False, "Window rows not clipped"
+    if shadow.diff(frame, 0, 7, 0, HEIGHT) is not None:
+        return False, "Change left of the window reported"
+    if shadow.diff(frame, 5, 10, 0, HEIGHT) != (42, 43):
+        return False, "Narrow window rows wrong"
+
+    return True, "Rows 42-57 of 300"
+
+def test_commit_window():
+    """Test committing a window updates only those bytes"""
+    frame = white_frame()
+    shadow = sent_shadow(frame)
+    frame[10 * STRIDE + 4] = 0x00   # Inside the window
+    frame[10 * STRIDE + 40] = 0x00  # Same row, outside it
+    shadow.commit(frame, 2, 6, 10, 11)
+
+    if shadow.diff(frame, 2, 6, 0, HEIGHT) is not None:
+        return False, "Sent window still dirty"
+    if shadow.diff(frame) != (10, 11):
+        return False, "Unsent bytes forgotten"
+    if shadow.rows_sent != HEIGHT + 1:
+        return False, f"{shadow.rows_sent} rows counted"
+
+    return True, "Bytes outside the window stay dirty"
+
+def test_fill():
+    """Test a cleared panel matches a blank frame"""
+    shadow = FrameShadow(WIDTH, HEIGHT)
+    shadow.fill(0xff)
+    if shadow.diff(white_frame()) is not None:
+        return False, "Blank frame dirty after clear"
+    frame = white_frame()
+    frame[-1] = 0xFE
+    if shadow.diff(frame) != (HEIGHT - 1, HEIGHT):
+        return False, "Last row change missed"
+
+    return True, "Clear leaves the shadow white"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all frame shadow tests"""
+    print_header()
+
+    print("═ FrameShadow Tests ═")
+    print_test("Unknown glass")
+    passed, details = test_unknown_glass()
+    print_result(passed, details)
+
+    print_test("Unchanged frame skipped")
+    passed, details = test_unchanged_skipped()
+    print_result(passed, details)
+
+    print_test("Changed row range")
+    passed, details = test_changed_rows()
+    print_result(passed, details)
+
+    print_test("Commit window")
+    passed, details = test_commit_window()
+    print_result(passed, details)
+
+    print_test("Clear to white")
+    passed, details = test_fill()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
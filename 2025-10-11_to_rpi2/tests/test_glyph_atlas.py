@@ -0,0 +1,226 @@
+# test_glyph_atlas.py - Glyph Atlas Unit Tests
+# Tests GlyphAtlas byte-aligned text drawing and the aligned-margin layout
+# used by single_pico2w/main_threaded.py to render editor pages
+# Can run on Pico (with glyph_atlas.py and editor_base.py copied alongside)
+# or desktop Python (with a synthetic font - framebuf isn't available there)
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the modules sit next to this file; on desktop they live in
+# the single_pico2w/ sibling directory
+try:
+    from glyph_atlas import GlyphAtlas, GLYPH_COUNT, GLYPH_ROWS, FIRST_CHAR
+    from editor_base import LayoutEngine, MARGIN_LEFT, ALIGNED_MARGIN_LEFT
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from glyph_atlas import GlyphAtlas, GLYPH_COUNT, GLYPH_ROWS, FIRST_CHAR
+    from editor_base import LayoutEngine, MARGIN_LEFT, ALIGNED_MARGIN_LEFT
+
+WIDTH = 400
+HEIGHT = 300
+STRIDE = WIDTH // 8
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  GLYPH ATLAS UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def synthetic_font():
+    """Glyph rows that identify their glyph: row r of glyph g is ~(g + r)"""
+    font = bytearray(GLYPH_COUNT * GLYPH_ROWS)
+    for g in range(GLYPH_COUNT):
+        for r in range(GLYPH_ROWS):
+            font[g * GLYPH_ROWS + r] = ~(g + r) & 0xFF
+    # Space is blank, as in the real font
+    for r in range(GLYPH_ROWS):
+        font[r] = 0xFF
+    return font
+
+class TextRecorder:
+    """Stands in for the FrameBuffer: records the lines left to text()"""
+    def __init__(self):
+        self.calls = []
+
+    def text(self, line, x, y, color):
+        self.calls.append((line, x, y))
+
+def make_atlas():
+    buf = bytearray(b'\xff' * (STRIDE * HEIGHT))
+    image = TextRecorder()
+    return GlyphAtlas(image, buf, WIDTH, HEIGHT, synthetic_font()), buf, image
+
+def glyph_row(ch, r):
+    return ~((ord(ch) - FIRST_CHAR) + r) & 0xFF
+
+#───────────────────────────────────────────────#
+# ─────────── GlyphAtlas Tests ─────────────────#
+#───────────────────────────────────────────────#
+
+def test_aligned_copy():
+    """Test aligned text lands as one byte per glyph row"""
+    atlas, buf, image = make_atlas()
+    atlas.text("Hi!", 8, 20)
+    for i, ch in enumerate("Hi!"):
+        for r in range(GLYPH_ROWS):
+            if buf[(20 + r) * STRIDE + 1 + i] != glyph_row(ch, r):
+                return False, f"'{ch}' row {r} wrong"
+    if buf[20 * STRIDE] != 0xFF or buf[20 * STRIDE + 4] != 0xFF:
+        return False, "Neighbouring bytes touched"
+    if image.calls:
+        return False, "Fell back to text()"
+
+    return True, "3 glyphs copied as bytes"
+
+def test_transparent():
+    """Test ink is ANDed in and spaces leave the frame alone"""
+    atlas, buf, _ = make_atlas()
+    d = 40 * STRIDE + 2
+    buf[d] = 0x0F           # Existing ink under 'A'
+    buf[d + 1] = 0x00       # Existing ink under ' '
+    atlas.text("A ", 16, 40)
+    if buf[d] != (0x0F & glyph_row('A', 0)):
+        return False, "Ink overwritten"
+    if buf[d + 1] != 0x00:
+        return False, "Space drew over the frame"
+
+    return True, "Same as framebuf.text() on existing ink"
+
+def test_clipping_and_fallback():
+    """Test clipping at the right edge and unaligned text"""
+    atlas, buf, image = make_atlas()
+    atlas.text("x" * 60, 8 * (STRIDE - 2), 0)
+    if atlas.chars_copied != 2:
+        return False, f"{atlas.chars_copied} glyphs past the edge"
+    if buf[2 * STRIDE - 1] != glyph_row('x', 1) or buf[STRIDE] != 0xFF:
+        return False, "Wrapped into the next row"
+
+    atlas.text("odd", MARGIN_LEFT, 0)
+    atlas.text("low", 8, HEIGHT - 4)
+    if image.calls != [("odd", MARGIN_LEFT, 0), ("low", 8, HEIGHT - 4)]:
+        return False, f"text() calls {image.calls}"
+
+    return True, "Unaligned and bottom-clipped text left to text()"
+
+def test_non_ascii():
+    """Test characters outside the font draw the fallback glyph"""
+    atlas, buf, _ = make_atlas()
+    atlas.text("é\t", 0, 0)
+    last = GLYPH_COUNT - 1
+    if buf[0] != (~last & 0xFF) or buf[1] != (~last & 0xFF):
+        return False, "Fallback glyph not used"
+
+    return True, "One fallback glyph per character"
+
+#───────────────────────────────────────────────#
+# ─────────── Aligned Layout Tests ─────────────#
+#───────────────────────────────────────────────#
+
+def test_aligned_layout():
+    """Test the aligned margin keeps the wrap and byte-aligns columns"""
+    text = ("the quick brown fox jumps over the lazy dog " * 12).strip()
+    plain = LayoutEngine(WIDTH, HEIGHT)
+    aligned = LayoutEngine(WIDTH, HEIGHT, ALIGNED_MARGIN_LEFT)
+    plain.update(text)
+    aligned.update(text)
+
+    if [l for _, _, l in plain.page_lines(0)] != [l for _, _, l in aligned.page_lines(0)]:
+        return False, "Lines wrap differently"
+    for x, _, _ in aligned.page_lines(0):
+        if x % 8:
+            return False, f"Line at x={x}"
+    x, _, _ = aligned.cursor_position(7)
+    if x != ALIGNED_MARGIN_LEFT + 7 * 8:
+        return False, f"Cursor at x={x}"
+
+    return True, f"{len(aligned.page_lines(0))} lines on byte boundaries"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all glyph atlas tests"""
+    print_header()
+
+    print("═ GlyphAtlas Tests ═")
+    print_test("Aligned glyph copy")
+    passed, details = test_aligned_copy()
+    print_result(passed, details)
+
+    print_test("Transparent drawing")
+    passed, details = test_transparent()
+    print_result(passed, details)
+
+    print_test("Clipping and fallback")
+    passed, details = test_clipping_and_fallback()
+    print_result(passed, details)
+
+    print_test("Characters outside the font")
+    passed, details = test_non_ascii()
+    print_result(passed, details)
+
+    print("\n═ Aligned Layout Tests ═")
+    print_test("Aligned margin layout")
+    passed, details = test_aligned_layout()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
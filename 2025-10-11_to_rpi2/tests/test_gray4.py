@@ -0,0 +1,193 @@
+# test_gray4.py - 4-Gray Plane Conversion Unit Tests
+# Checks the gray4 lookup-table conversion used by display42.py's
+# EPD_4IN2_V2_4GrayDisplay against the per-pixel routine it replaced
+# Can run on Pico (with gray4.py copied alongside) or desktop Python
+
+import sys
+import random
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    from gray4 import convert_plane, PLANE_BITS, RAM_NEW, RAM_OLD
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from gray4 import convert_plane, PLANE_BITS, RAM_NEW, RAM_OLD
+
+FRAME_BYTES = 400 * 300 // 4  # GS2_HMSB frame of the 4.2" panel
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  4-GRAY CONVERSION UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def reference_planes(Image, count):
+    """
+    Planes as EPD_4IN2_V2_4GrayDisplay built them before the lookup table
+    (the loops are unchanged but for the gray bits, which were two copies
+    of the loops; send_data() collects into a bytearray instead)
+    """
+    planes = []
+    # Bits for gray1/gray2: (1, 0) in the 0x24 plane, (0, 1) in 0x26
+    for gray1, gray2 in ((0x01, 0x00), (0x00, 0x01)):
+        out = bytearray()
+        for i in range(0, count):
+            temp3=0
+            for j in range(0, 2):
+                temp1 = Image[i*2+j]
+                for k in range(0, 2):
+                    temp2 = temp1&0x03
+                    if(temp2 == 0x03):
+                        temp3 |= 0x01   # white
+                    elif(temp2 == 0x00):
+                        temp3 |= 0x00   # black
+                    elif(temp2 == 0x02):
+                        temp3 |= gray1  # gray1
+                    else:   # 0x01
+                        temp3 |= gray2  # gray2
+                    temp3 <<= 1
+
+                    temp1 >>= 2
+                    temp2 = temp1&0x03
+                    if(temp2 == 0x03):   # white
+                        temp3 |= 0x01
+                    elif(temp2 == 0x00):   # black
+                        temp3 |= 0x00
+                    elif(temp2 == 0x02):
+                        temp3 |= gray1  # gray1
+                    else:   # 0x01
+                        temp3 |= gray2  # gray2
+
+                    if (( j!=1 ) | ( k!=1 )):
+                        temp3 <<= 1
+
+                    temp1 >>= 2
+            out.append(temp3)
+        planes.append(bytes(out))
+    return planes
+
+def converted_planes(image):
+    new = bytearray(len(image) // 2)
+    old = bytearray(len(image) // 2)
+    convert_plane(image, new, RAM_NEW)
+    convert_plane(image, old, RAM_OLD)
+    return [bytes(new), bytes(old)]
+
+#───────────────────────────────────────────────#
+# ─────────── Conversion Tests ─────────────────#
+#───────────────────────────────────────────────#
+
+def test_table_size():
+    """Test the table covers every source byte"""
+    if len(PLANE_BITS) != 256:
+        return False, f"{len(PLANE_BITS)} entries"
+    # All white and all black source bytes
+    if PLANE_BITS[0xFF] != 0xFF or PLANE_BITS[0x00] != 0x00:
+        return False, "White/black entries wrong"
+
+    return True, "256 entries"
+
+def test_all_byte_pairs():
+    """Test every pair of source bytes against the old routine"""
+    image = bytearray(2 * 256 * 256)
+    i = 0
+    for a in range(256):
+        for b in range(256):
+            image[i] = a
+            image[i + 1] = b
+            i += 2
+    if converted_planes(image) != reference_planes(image, len(image) // 2):
+        return False, "Planes differ"
+
+    return True, "65536 plane bytes identical in both planes"
+
+def test_random_frame():
+    """Test a full random frame against the old routine"""
+    random.seed(4)
+    image = bytearray(random.getrandbits(8) for _ in range(FRAME_BYTES))
+    if converted_planes(image) != reference_planes(image, FRAME_BYTES // 2):
+        return False, "Planes differ"
+
+    return True, f"{FRAME_BYTES // 2} bytes per plane identical"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all 4-gray conversion tests"""
+    print_header()
+
+    print("═ Lookup Table Tests ═")
+    print_test("Table size")
+    passed, details = test_table_size()
+    print_result(passed, details)
+
+    print_test("All source byte pairs")
+    passed, details = test_all_byte_pairs()
+    print_result(passed, details)
+
+    print_test("Random full frame")
+    passed, details = test_random_frame()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
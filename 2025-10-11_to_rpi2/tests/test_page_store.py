@@ -0,0 +1,521 @@
+# test_page_store.py - Page Store Unit Tests
+# Tests the PageStore sidecar page-offset index and per-page saving used by
+# single_pico2w/main_threaded.py for page counts, page loads and saves
+# Can run on Pico (with page_store.py and editor_base.py copied alongside)
+# or desktop Python
+
+import os
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the modules sit next to this file; on desktop they live in
+# the single_pico2w/ sibling directory
+try:
+    import page_store
+    from page_store import PageStore, segment_paths
+    from editor_base import PageManager
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    import page_store
+    from page_store import PageStore, segment_paths
+    from editor_base import PageManager
+
+TEST_FILE = "_test_page_store.txt"
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  PAGE STORE UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def write_note(content):
+    """Write a fresh note and drop any index left by an earlier test"""
+    with open(TEST_FILE, "w", encoding="utf-8") as f:
+        f.write(content)
+    PageStore.discard_sidecars(TEST_FILE)
+
+def cleanup():
+    """Remove the test note and its index"""
+    try:
+        os.remove(TEST_FILE)
+    except OSError:
+        pass
+    PageStore.discard_sidecars(TEST_FILE)
+
+def uses_note(test):
+    """Remove the test note and its sidecars however the test ends
+    (tests also run one at a time, e.g. under pytest)"""
+    def run():
+        try:
+            return test()
+        finally:
+            cleanup()
+    return run
+
+def journal(pages):
+    """Note with the given number of distinct pages"""
+    return "\n---\n".join(f"Day {i}: " + "words " * (i % 7 + 1)
+                           for i in range(pages))
+
+#───────────────────────────────────────────────#
+# ─────────── PageStore Tests ──────────────────#
+#───────────────────────────────────────────────#
+
+@uses_note
+def test_matches_split_into_pages():
+    """Test pages match PageManager.split_into_pages()"""
+    cases = [
+        "",
+        "   \n  ",
+        "one page",
+        "first\n---\nsecond",
+        "\n---\n",
+        "a\n---\n\n---\nb\n---\n",
+        "caf\u00e9\n---\nna\u00efve \u2014 text",
+        "-\n----\n---\n---\n--",
+    ]
+    for content in cases:
+        write_note(content)
+        store = PageStore(TEST_FILE)
+        expected = PageManager.split_into_pages(content)
+        got = [store.read_page(i) for i in range(store.page_count())]
+        if got != expected:
+            return False, f"{content!r}: expected {expected}, got {got}"
+
+    return True, f"{len(cases)} notes split identically"
+
+@uses_note
+def test_marker_across_chunks():
+    """Test markers split across scan chunks are found"""
+    content = journal(30)
+    write_note(content)
+    expected = PageManager.split_into_pages(content)
+    saved = page_store.SCAN_CHUNK
+    try:
+        for chunk in (1, 2, 3, 4, 7):
+            page_store.SCAN_CHUNK = chunk
+            PageStore.discard_sidecars(TEST_FILE)
+            store = PageStore(TEST_FILE)
+            if list(store) != expected:
+                return False, f"Mismatch with {chunk} byte chunks"
+    finally:
+        page_store.SCAN_CHUNK = saved
+
+    return True, "Chunk sizes 1-7 give the same pages"
+
+@uses_note
+def test_index_persisted():
+    """Test a second store uses the sidecar index without scanning"""
+    write_note(journal(50))
+    PageStore(TEST_FILE).page_count()
+
+    store = PageStore(TEST_FILE)
+    count = store.page_count()
+    if count != 50 or store.index_builds != 0 or store.bytes_read != 0:
+        return False, f"count={count}, builds={store.index_builds}, read={store.bytes_read}"
+
+    return True, "Page count from index, no file bytes read"
+
+@uses_note
+def test_read_only_requested_page():
+    """Test opening page 40 reads only that page's bytes"""
+    content = journal(50)
+    write_note(content)
+    store = PageStore(TEST_FILE)
+    page = store.read_page(40)
+    expected = PageManager.split_into_pages(content)[40]
+    if page != expected:
+        return False, f"Got {page!r}"
+    if store.bytes_read != len(expected.encode("utf-8")):
+        return False, f"Read {store.bytes_read} bytes for a {len(expected)} byte page"
+    store.read_page(40)
+    if store.bytes_read != len(expected.encode("utf-8")):
+        return False, "Repeated read of the same page hit the file"
+
+    return True, f"{store.bytes_read} of {len(content)} bytes read"
+
+@uses_note
+def test_rebuild_on_change():
+    """Test the index is rebuilt when the note changes"""
+    write_note(journal(5))
+    store = PageStore(TEST_FILE)
+    store.page_count()
+
+    # Rewrite with a different size, keeping the old index file
+    with open(TEST_FILE, "w", encoding="utf-8") as f:
+        f.write(journal(8))
+    if store.page_count() != 8 or store.index_builds != 2:
+        return False, f"count={store.page_count()}, builds={store.index_builds}"
+    if store.read_page(7) != PageManager.split_into_pages(journal(8))[7]:
+        return False, "Stale page text"
+
+    return True, "Stale index replaced"
+
+@uses_note
+def test_corrupt_index():
+    """Test a damaged index file is ignored and rebuilt"""
+    write_note(journal(5))
+    PageStore(TEST_FILE).page_count()
+    with open(TEST_FILE + ".idx", "wb") as f:
+        f.write(b"PGX1 truncated")
+
+    store = PageStore(TEST_FILE)
+    if store.page_count() != 5 or store.index_builds != 1:
+        return False, f"count={store.page_count()}, builds={store.index_builds}"
+
+    return True, "Rebuilt from the note"
+
+@uses_note
+def test_missing_file():
+    """Test a note that doesn't exist yet is one empty page"""
+    cleanup()
+    store = PageStore(TEST_FILE)
+    if len(store) != 1 or store[0] != "":
+        return False, f"Got {list(store)}"
+    try:
+        os.stat(TEST_FILE + ".idx")
+        return False, "Index written for a missing note"
+    except OSError:
+        pass
+
+    return True, "One empty page, no index written"
+
+@uses_note
+def test_save_cost_bounded_by_page():
+    """Test saving a page writes the page and a small manifest only"""
+    content = journal(200)
+    write_note(content)
+    store = PageStore(TEST_FILE)
+    before = os.stat(TEST_FILE)
+
+    page = "Edited entry " * 10
+    store.write_page(150, page)
+    if os.stat(TEST_FILE)[6] != before[6]:
+        return False, "Note file rewritten"
+    manifest = os.stat(TEST_FILE + ".man")[6]
+    if store.bytes_written != len(page) + manifest or manifest > 5 * 200 + 32:
+        return False, f"Wrote {store.bytes_written} bytes, manifest {manifest}"
+
+    expected = PageManager.split_into_pages(content)
+    expected[150] = page
+    if list(PageStore(TEST_FILE)) != expected:
+        return False, "Pages differ after reopening"
+
+    return True, f"{store.bytes_written} of {len(content)} bytes written"
+
+@uses_note
+def test_save_new_pages():
+    """Test saving past the last page adds empty pages in between"""
+    write_note("first")
+    store = PageStore(TEST_FILE)
+    store.write_page(2, "third")
+    if list(store) != ["first", "", "third"]:
+        return False, f"Got {list(store)}"
+    store.write_page(2, "third, again")
+    if len(segment_paths(TEST_FILE)) != 1:
+        return False, "Replaced segment not removed"
+
+    return True, "Pages padded, old segment removed"
+
+@uses_note
+def test_staged_page():
+    """Test a staged page is visible before it is written"""
+    write_note("one\n---\ntwo")
+    store = PageStore(TEST_FILE)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "three"
+
+    token = store.stage_page(2, load)
+    if len(store) != 3 or store[2] != "three" or store[2] != "three":
+        return False, f"Got {list(store)}"
+    if len(calls) != 1:
+        return False, f"Loader called {len(calls)} times"
+    store.write_page(2, "three", token)
+    if store._staged or list(PageStore(TEST_FILE)) != ["one", "two", "three"]:
+        return False, "Staged page not written"
+
+    return True, "Staged text read once, then written"
+
+@uses_note
+def test_read_during_save():
+    """Test the other core can read while a segment is being written"""
+    write_note(journal(4))
+    store = PageStore(TEST_FILE)
+    token = store.stage_page(1, lambda: "new")
+    seen = []
+
+    def write(f):
+        # Runs between the two locked steps of write_page()
+        seen.append((len(store), store.read_page(1), store.read_page(2)))
+        return f.write(b"new")
+
+    store.write_page(1, write, token)
+    if seen != [(4, "new", "Day 2: words words words ")]:
+        return False, f"Read during save: {seen}"
+    if store._staged or store.read_page(1) != "new":
+        return False, "Saved page not swapped in"
+
+    return True, "Staged text read mid-save"
+
+@uses_note
+def test_compact():
+    """Test compacting folds saved pages into a plain note"""
+    content = journal(10)
+    write_note(content)
+    store = PageStore(TEST_FILE)
+    store.write_page(3, "new third")
+    store.write_page(11, "last")
+    expected = PageManager.split_into_pages(content) + ["", "last"]
+    expected[3] = "new third"
+
+    if not store.compact():
+        return False, "Nothing compacted"
+    with open(TEST_FILE, encoding="utf-8") as f:
+        folded = f.read()
+    if folded != PageManager.merge_pages(expected):
+        return False, "Note text differs"
+    if segment_paths(TEST_FILE) or list(store) != expected:
+        return False, "Segments left or pages differ"
+    try:
+        os.stat(TEST_FILE + ".man")
+        return False, "Manifest left behind"
+    except OSError:
+        pass
+
+    return True, f"{len(expected)} pages in one file"
+
+@uses_note
+def test_recover_interrupted_save():
+    """Test a save cut short before the manifest rename is rolled back"""
+    write_note(journal(4))
+    store = PageStore(TEST_FILE)
+    store.write_page(1, "saved")
+
+    # Power lost after writing the next segment and part of the manifest
+    with open(TEST_FILE + ".9.seg", "w") as f:
+        f.write("half writ")
+    with open(TEST_FILE + ".man.tmp", "w") as f:
+        f.write("PGM2 12")
+
+    store = PageStore(TEST_FILE)
+    pages = list(store)
+    if pages[1] != "saved" or len(pages) != 4:
+        return False, f"Got {pages}"
+    if len(segment_paths(TEST_FILE)) != 1:
+        return False, "Orphan segment not removed"
+    try:
+        os.stat(TEST_FILE + ".man.tmp")
+        return False, "Temporary manifest not removed"
+    except OSError:
+        pass
+
+    return True, "Last committed save kept, leftovers removed"
+
+@uses_note
+def test_recover_interrupted_compact():
+    """Test a compact cut short after replacing the note"""
+    write_note(journal(4))
+    store = PageStore(TEST_FILE)
+    store.write_page(1, "saved")
+    expected = list(store)
+    with open(TEST_FILE + ".man") as f:
+        manifest = f.read()
+    store.compact()
+
+    # Power lost after the rename, before the manifest was removed
+    with open(TEST_FILE + ".man", "w") as f:
+        f.write(manifest)
+    if list(PageStore(TEST_FILE)) != expected:
+        return False, "Pages differ"
+
+    return True, "Stale manifest ignored"
+
+@uses_note
+def test_manifest_same_size_edit():
+    """Test a manifest is dropped when the note changes but keeps its size"""
+    write_note(journal(4))
+    store = PageStore(TEST_FILE)
+    store.write_page(1, "saved")
+
+    # Edited elsewhere: same byte count, different text
+    with open(TEST_FILE, encoding="utf-8") as f:
+        content = f.read()
+    edited = content.replace("Day 0", "Day X")
+    with open(TEST_FILE, "w", encoding="utf-8") as f:
+        f.write(edited)
+
+    pages = list(PageStore(TEST_FILE))
+    if pages != PageManager.split_into_pages(edited):
+        return False, f"Got {pages}"
+    if segment_paths(TEST_FILE):
+        return False, "Stale segment not removed"
+
+    return True, "Stale manifest ignored"
+
+@uses_note
+def test_manifest_malformed():
+    """Test a manifest with a garbled header or entry is dropped"""
+    content = journal(4)
+    expected = PageManager.split_into_pages(content)
+    for bad in ("zz", "crc", "gen", "entry"):
+        write_note(content)
+        PageStore(TEST_FILE).write_page(1, "saved")
+        with open(TEST_FILE + ".man") as f:
+            lines = f.read().split("\n")
+        header = lines[0].split()
+        if bad == "zz":
+            header[2] = "zz"
+        elif bad == "crc":
+            header[2] = header[2] + "x"
+        elif bad == "gen":
+            header[3] = "?"
+        else:
+            lines[1] = "b1x"
+        lines[0] = " ".join(header)
+        with open(TEST_FILE + ".man", "w") as f:
+            f.write("\n".join(lines))
+
+        store = PageStore(TEST_FILE)
+        pages = [store.read_page(i) for i in range(len(store))]
+        if pages != expected:
+            return False, f"Bad {bad}: got {pages}"
+        if segment_paths(TEST_FILE):
+            return False, f"Bad {bad}: stale segment not removed"
+
+    return True, "Damaged manifests ignored"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all page store tests"""
+    print_header()
+
+    print("═ PageStore Tests ═")
+    print_test("Matches split_into_pages")
+    passed, details = test_matches_split_into_pages()
+    print_result(passed, details)
+
+    print_test("Marker across scan chunks")
+    passed, details = test_marker_across_chunks()
+    print_result(passed, details)
+
+    print_test("Index persisted")
+    passed, details = test_index_persisted()
+    print_result(passed, details)
+
+    print_test("Read only requested page")
+    passed, details = test_read_only_requested_page()
+    print_result(passed, details)
+
+    print_test("Rebuild on change")
+    passed, details = test_rebuild_on_change()
+    print_result(passed, details)
+
+    print_test("Corrupt index")
+    passed, details = test_corrupt_index()
+    print_result(passed, details)
+
+    print_test("Missing file")
+    passed, details = test_missing_file()
+    print_result(passed, details)
+
+    print("\n═ Page Saving Tests ═")
+    print_test("Save cost bounded by page")
+    passed, details = test_save_cost_bounded_by_page()
+    print_result(passed, details)
+
+    print_test("Save new pages")
+    passed, details = test_save_new_pages()
+    print_result(passed, details)
+
+    print_test("Staged page")
+    passed, details = test_staged_page()
+    print_result(passed, details)
+
+    print_test("Read during save")
+    passed, details = test_read_during_save()
+    print_result(passed, details)
+
+    print_test("Compact")
+    passed, details = test_compact()
+    print_result(passed, details)
+
+    print_test("Recover interrupted save")
+    passed, details = test_recover_interrupted_save()
+    print_result(passed, details)
+
+    print_test("Recover interrupted compact")
+    passed, details = test_recover_interrupted_compact()
+    print_result(passed, details)
+
+    print_test("Manifest same-size edit")
+    passed, details = test_manifest_same_size_edit()
+    print_result(passed, details)
+
+    print_test("Manifest malformed")
+    passed, details = test_manifest_malformed()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
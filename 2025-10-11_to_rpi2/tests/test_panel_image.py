@@ -0,0 +1,284 @@
+# test_panel_image.py - Panel Image Unit Tests
+# Tests make_panel_image.py's PBM/PGM conversion to the controller's RAM
+# layout, and panel_image.py streaming such a file to the EPD in chunks
+# Can run on Pico (with panel_image.py, make_panel_image.py and gray4.py
+# copied alongside) or desktop Python
+
+import sys
+import os
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the modules sit next to this file; on desktop they live in
+# the single_pico2w/ sibling directory
+try:
+    import panel_image
+    import make_panel_image
+    from gray4 import convert_plane, RAM_NEW, RAM_OLD
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    import panel_image
+    import make_panel_image
+    from gray4 import convert_plane, RAM_NEW, RAM_OLD
+
+WIDTH = 400
+HEIGHT = 300
+PLANE = WIDTH * HEIGHT // 8
+IMAGE_FILE = "test_panel_image.bin"
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  PANEL IMAGE UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+class Panel:
+    """The EPD_4in2 calls panel_image.py makes, recording RAM writes"""
+
+    def __init__(self):
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.dc_pin = 'dc'
+        self.cs_pin = 'cs'
+        self.spi = self
+        self.ram = {}        # Command -> bytes written after it
+        self.calls = []      # Init/refresh/command calls in order
+        self.writes = 0      # SPI writes of data
+        self._command = None
+
+    def send_command(self, command):
+        self._command = command
+        self.ram[command] = bytearray()
+        self.calls.append(command)
+
+    def digital_write(self, pin, value):
+        pass
+
+    def write(self, buf):
+        self.writes += 1
+        self.ram[self._command].extend(buf)
+
+    def leave_partial(self):
+        self.calls.append('leave_partial')
+
+    def EPD_4IN2_V2_Init_4Gray(self):
+        self.calls.append('init_4gray')
+
+    def TurnOnDisplay_Fast(self):
+        self.calls.append('fast')
+
+    def TurnOnDisplay_4GRAY(self):
+        self.calls.append('4gray')
+
+def pbm(pixels):
+    """P4 file for a WIDTH x HEIGHT list of 0/1 pixels (1 = black)"""
+    body = bytearray(PLANE)
+    for i, v in enumerate(pixels):
+        if v:
+            body[i >> 3] |= 0x80 >> (i & 7)
+    return b"P4\n# artwork\n%d %d\n" % (WIDTH, HEIGHT) + bytes(body)
+
+def pgm(pixels, maxval=255):
+    """P5 file for a WIDTH x HEIGHT list of gray values"""
+    return b"P5 %d %d %d\n" % (WIDTH, HEIGHT, maxval) + bytes(pixels)
+
+def write_file(data):
+    with open(IMAGE_FILE, 'wb') as f:
+        f.write(data)
+
+#───────────────────────────────────────────────#
+# ─────────── Conversion Tests ─────────────────#
+#───────────────────────────────────────────────#
+
+def test_mono_conversion():
+    """Test PBM and thresholded PGM pixels land on their RAM bits"""
+    pixels = [0] * (WIDTH * HEIGHT)
+    for x, y in ((0, 0), (9, 0), (399, 150), (200, 299)):
+        pixels[y * WIDTH + x] = 1
+    image = make_panel_image.convert(pbm(pixels))
+    if len(image) != PLANE:
+        return False, f"{len(image)} bytes"
+    if image[0] != 0x7F or image[1] != 0xBF or image[150 * 50 + 49] != 0xFE:
+        return False, f"Bits {image[0]:#x} {image[1]:#x} {image[150 * 50 + 49]:#x}"
+    if image.count(0xFF) != PLANE - 4:
+        return False, "Stray black pixels"
+
+    text = b"P1 %d %d\n" % (WIDTH, HEIGHT) + b" ".join(b"%d" % v for v in pixels)
+    if make_panel_image.convert(text) != image:
+        return False, "P1 differs from P4"
+
+    grays = [0 if v else 200 for v in pixels]
+    if make_panel_image.convert(pgm(grays), mono=True) != image:
+        return False, "Thresholded PGM differs"
+
+    return True, "PBM, P1 and --mono PGM agree"
+
+def test_gray_conversion():
+    """Test 4-gray planes match gray4.convert_plane()"""
+    values = (0, 85, 170, 255)
+    pixels = [values[(i * 7 + i // WIDTH) % 4] for i in range(WIDTH * HEIGHT)]
+    image = make_panel_image.convert(pgm(pixels))
+    if len(image) != 2 * PLANE:
+        return False, f"{len(image)} bytes"
+
+    # The same frame as GS2_HMSB, 4 pixels per byte, lowest bits first
+    frame = bytearray(WIDTH * HEIGHT // 4)
+    for i, v in enumerate(pixels):
+        frame[i >> 2] |= values.index(v) << (2 * (i & 3))
+    new = bytearray(PLANE)
+    old = bytearray(PLANE)
+    convert_plane(frame, new, RAM_NEW)
+    convert_plane(frame, old, RAM_OLD)
+    if image[:PLANE] != new or image[PLANE:] != old:
+        return False, "Planes differ from gray4"
+
+    return True, "Same planes as the runtime conversion"
+
+def test_rejected():
+    """Test artwork of the wrong size or format is refused"""
+    for data in (b"P4 10 10\n" + bytes(20), b"P6 400 300 255\n", b"P5 400 300 255\n"):
+        try:
+            make_panel_image.convert(data)
+            return False, f"Accepted {data[:14]}"
+        except ValueError:
+            pass
+
+    return True, "Wrong size, colour, truncated"
+
+#───────────────────────────────────────────────#
+# ─────────── Streaming Tests ──────────────────#
+#───────────────────────────────────────────────#
+
+def test_stream_mono():
+    """Test a mono image goes to both RAMs in chunks, then a fast refresh"""
+    image = bytes((i * 13) & 0xFF for i in range(PLANE))
+    write_file(image)
+    try:
+        panel = Panel()
+        if panel_image.show(panel, IMAGE_FILE) != panel_image.MONO:
+            return False, "Not shown as mono"
+    finally:
+        os.remove(IMAGE_FILE)
+    if panel.ram[0x24] != image or panel.ram[0x26] != image:
+        return False, "RAM differs from the file"
+    if panel.calls != ['leave_partial', 0x24, 0x26, 'fast']:
+        return False, f"Calls {panel.calls}"
+    if panel.writes != 2 * PLANE // panel_image.CHUNK:
+        return False, f"{panel.writes} writes"
+
+    return True, f"{panel.writes} writes of {panel_image.CHUNK} bytes"
+
+def test_stream_gray():
+    """Test a 4-gray image inits 4-gray and fills one plane per RAM"""
+    image = bytes(PLANE) + b"\xff" * PLANE
+    write_file(image)
+    try:
+        panel = Panel()
+        kind = panel_image.show(panel, IMAGE_FILE, chunk=4096)
+    finally:
+        os.remove(IMAGE_FILE)
+    if kind != panel_image.GRAY:
+        return False, f"Shown as {kind}"
+    if panel.ram[0x24] != image[:PLANE] or panel.ram[0x26] != image[PLANE:]:
+        return False, "Planes swapped or cut"
+    if panel.calls != ['init_4gray', 0x24, 0x26, '4gray']:
+        return False, f"Calls {panel.calls}"
+
+    write_file(bytes(100))
+    try:
+        if panel_image.show(Panel(), IMAGE_FILE) is not None:
+            return False, "Odd-sized file shown"
+    finally:
+        os.remove(IMAGE_FILE)
+    if panel_image.show(Panel(), IMAGE_FILE) is not None:
+        return False, "Missing file shown"
+
+    return True, "4-gray planes, fallback for other files"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all panel image tests"""
+    print_header()
+
+    print("═ Conversion Tests ═")
+    print_test("Mono conversion")
+    passed, details = test_mono_conversion()
+    print_result(passed, details)
+
+    print_test("4-gray conversion")
+    passed, details = test_gray_conversion()
+    print_result(passed, details)
+
+    print_test("Rejected artwork")
+    passed, details = test_rejected()
+    print_result(passed, details)
+
+    print("\n═ Streaming Tests ═")
+    print_test("Mono image")
+    passed, details = test_stream_mono()
+    print_result(passed, details)
+
+    print_test("4-gray image")
+    passed, details = test_stream_gray()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
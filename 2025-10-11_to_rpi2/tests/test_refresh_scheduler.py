@@ -0,0 +1,248 @@
+# test_refresh_scheduler.py - Refresh Scheduler Unit Tests
+# Tests the RefreshScheduler the display worker asks whether an update
+# gets a partial or a fast full refresh, and its per-mode stats
+# Can run on Pico (with refresh_scheduler.py copied alongside) or desktop Python
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    from refresh_scheduler import RefreshScheduler, PARTIAL, FULL, CLEAR, SKIPPED
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from refresh_scheduler import RefreshScheduler, PARTIAL, FULL, CLEAR, SKIPPED
+
+WIDTH = 400
+HEIGHT = 300
+ROW = 15                    # CHAR_HEIGHT
+LINE = (8, 5 * ROW, 392, ROW)   # One text row being typed on
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  REFRESH SCHEDULER UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def typed(scheduler, count, region=LINE):
+    """Record count partial refreshes of region, as the worker would"""
+    for _ in range(count):
+        scheduler.record(scheduler.choose(region), region, 10)
+
+#───────────────────────────────────────────────#
+# ─────────── RefreshScheduler Tests ───────────#
+#───────────────────────────────────────────────#
+
+def test_partial_within_budget():
+    """Test typing on one row stays partial until its band is used up"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW, max_partials=10)
+    typed(scheduler, 10)
+    if scheduler.counts[PARTIAL] != 10 or scheduler.counts[FULL]:
+        return False, f"Counted {scheduler.counts}"
+    if scheduler.debt() != 1.0:
+        return False, f"Debt {scheduler.debt()} at the budget"
+
+    # Another row still has budget left, the typed one doesn't
+    if scheduler.choose((8, 10 * ROW, 392, ROW)) != PARTIAL:
+        return False, "Fresh row escalated"
+    if scheduler.choose(LINE) != FULL:
+        return False, "Band over budget stayed partial"
+
+    return True, "10 partials, then a full refresh for that row"
+
+def test_area_budget():
+    """Test large partial redraws escalate on area alone"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW, max_area=WIDTH * HEIGHT * 2)
+    scheduler.record(PARTIAL, None)
+    if scheduler.choose() != PARTIAL:
+        return False, "Second screen escalated"
+    scheduler.record(PARTIAL, None)
+    if scheduler.choose() != FULL:
+        return False, "Third screen stayed partial"
+    if scheduler.choose((0, 0, 8, ROW)) != FULL:
+        return False, "Area at the budget not escalated"
+
+    return True, "Full refresh after 2 screens of partials"
+
+def test_full_resets():
+    """Test a full refresh or clear wipes the ghosting debt"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW, max_partials=10)
+    typed(scheduler, 10)
+    scheduler.record(FULL, None, 900)
+    if scheduler.debt() != 0 or scheduler.area:
+        return False, f"Debt {scheduler.debt()} after full refresh"
+    typed(scheduler, 3)
+    scheduler.record(CLEAR, None, 2000)
+    if scheduler.debt() != 0:
+        return False, "Debt left after clear"
+    if scheduler.choose(LINE) != PARTIAL:
+        return False, "Clean glass escalated"
+
+    return True, "Debt back to 0"
+
+def test_page_change_and_idle():
+    """Test page changes and idle pauses escalate only with enough debt"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW, max_partials=20,
+                                 page_debt=0.25, idle_debt=0.1)
+    if scheduler.choose(None, page_change=True) != PARTIAL:
+        return False, "Page change on clean glass escalated"
+    if scheduler.wants_cleanup():
+        return False, "Clean glass wants cleanup"
+
+    typed(scheduler, 2)   # Debt 0.1
+    if not scheduler.wants_cleanup():
+        return False, "Idle cleanup not wanted at idle_debt"
+    if scheduler.choose(None, page_change=True) != PARTIAL:
+        return False, "Page change escalated below page_debt"
+
+    typed(scheduler, 3)   # Debt 0.25
+    if scheduler.choose(None, page_change=True) != FULL:
+        return False, "Page change stayed partial at page_debt"
+    if scheduler.choose(LINE) != PARTIAL:
+        return False, "Typing escalated below the budget"
+
+    return True, "Page change full at 0.25, idle at 0.1"
+
+def test_stats():
+    """Test per-mode counts and time"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW)
+    typed(scheduler, 4)
+    scheduler.record(SKIPPED, LINE, 1)
+    scheduler.record(FULL, None, 500)
+    if scheduler.counts != {PARTIAL: 4, FULL: 1, CLEAR: 0, SKIPPED: 1}:
+        return False, f"Counted {scheduler.counts}"
+    if scheduler.time_ms[PARTIAL] != 40 or scheduler.time_ms[FULL] != 500:
+        return False, f"Timed {scheduler.time_ms}"
+
+    scheduler.record(SKIPPED, LINE, 1)
+    if scheduler.debt() != 0:
+        return False, "Skipped refresh added debt"
+
+    return True, f"{scheduler.counts}"
+
+def test_ghosting_weight():
+    """Test weighted partials (short waveform) use the budget up faster"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW, max_partials=10)
+    for _ in range(5):
+        if scheduler.choose(LINE, weight=2) != PARTIAL:
+            return False, "Escalated before the budget"
+        scheduler.record(PARTIAL, LINE, 10, weight=2)
+    if scheduler.debt() != 1.0:
+        return False, f"Debt {scheduler.debt()} after 5 x 2"
+    if scheduler.choose(LINE, weight=2) != FULL:
+        return False, "Weighted partial allowed over budget"
+    if scheduler.counts[PARTIAL] != 5:
+        return False, f"Counted {scheduler.counts[PARTIAL]}"
+
+    return True, "5 weight-2 partials fill a 10 budget"
+
+def test_deferred_full():
+    """Test typing defers the full refresh to idle, up to hard_debt"""
+    scheduler = RefreshScheduler(WIDTH, HEIGHT, ROW, max_partials=10)
+    for _ in range(20):
+        if scheduler.choose(LINE, defer=True) != PARTIAL:
+            return False, f"Escalated at debt {scheduler.debt()}"
+        scheduler.record(PARTIAL, LINE, 10)
+    if scheduler.choose(LINE, defer=True) != FULL:
+        return False, "Deferred past hard_debt"
+    if not scheduler.wants_cleanup():
+        return False, "Idle pause would not clean up"
+
+    return True, "Partial to 2.0, cleanup left to idle"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all refresh scheduler tests"""
+    print_header()
+
+    print("═ RefreshScheduler Tests ═")
+    print_test("Partial within budget")
+    passed, details = test_partial_within_budget()
+    print_result(passed, details)
+
+    print_test("Area budget")
+    passed, details = test_area_budget()
+    print_result(passed, details)
+
+    print_test("Full refresh resets")
+    passed, details = test_full_resets()
+    print_result(passed, details)
+
+    print_test("Page change and idle")
+    passed, details = test_page_change_and_idle()
+    print_result(passed, details)
+
+    print_test("Per-mode stats")
+    passed, details = test_stats()
+    print_result(passed, details)
+
+    print_test("Ghosting weight")
+    passed, details = test_ghosting_weight()
+    print_result(passed, details)
+
+    print_test("Deferred full refresh")
+    passed, details = test_deferred_full()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
@@ -0,0 +1,265 @@
+# test_row_renderer.py - Row Renderer Unit Tests
+# Tests RowRenderer, which redraws only the changed text rows of the frame
+# for single_pico2w/main_threaded.py and main_optimized.py
+# Can run on Pico (with row_renderer.py, glyph_atlas.py and editor_base.py
+# copied alongside) or desktop Python
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the modules sit next to this file; on desktop they live in
+# the single_pico2w/ sibling directory
+try:
+    from row_renderer import RowRenderer
+    from glyph_atlas import GlyphAtlas, GLYPH_COUNT, GLYPH_ROWS
+    from editor_base import LayoutEngine, CHAR_WIDTH, CHAR_HEIGHT, ALIGNED_MARGIN_LEFT
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from row_renderer import RowRenderer
+    from glyph_atlas import GlyphAtlas, GLYPH_COUNT, GLYPH_ROWS
+    from editor_base import LayoutEngine, CHAR_WIDTH, CHAR_HEIGHT, ALIGNED_MARGIN_LEFT
+
+WIDTH = 400
+HEIGHT = 300
+STRIDE = WIDTH // 8
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  ROW RENDERER UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+class ByteFrame:
+    """The fill()/fill_rect() part of a MONO_HLSB FrameBuffer, in Python"""
+    def __init__(self):
+        self.buf = bytearray(STRIDE * HEIGHT)
+        self.fills = 0
+
+    def fill(self, c):
+        self.fills += 1
+        self.fill_rect(0, 0, WIDTH, HEIGHT, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        for py in range(max(0, y), min(HEIGHT, y + h)):
+            for px in range(max(0, x), min(WIDTH, x + w)):
+                i = py * STRIDE + (px >> 3)
+                bit = 0x80 >> (px & 7)
+                if c:
+                    self.buf[i] |= bit
+                else:
+                    self.buf[i] &= ~bit
+
+def make_font():
+    font = bytearray(GLYPH_COUNT * GLYPH_ROWS)
+    for i in range(len(font)):
+        font[i] = ~(i * 37) & 0xFF
+    return font
+
+def make_renderer():
+    frame = ByteFrame()
+    atlas = GlyphAtlas(frame, frame.buf, WIDTH, HEIGHT, make_font())
+    return RowRenderer(frame, WIDTH, CHAR_HEIGHT, CHAR_WIDTH, atlas.text), frame
+
+def layout(text, cursor):
+    engine = LayoutEngine(WIDTH, HEIGHT, ALIGNED_MARGIN_LEFT)
+    engine.update(text)
+    x, y, _ = engine.cursor_position(cursor)
+    return engine.page_lines(0), (x, y)
+
+def fresh_frame(text, cursor):
+    """Frame as drawn from scratch"""
+    renderer, frame = make_renderer()
+    renderer.render(*layout(text, cursor))
+    return bytes(frame.buf)
+
+#───────────────────────────────────────────────#
+# ─────────── RowRenderer Tests ────────────────#
+#───────────────────────────────────────────────#
+
+def test_edit_sequence():
+    """Test incremental renders match drawing each state from scratch"""
+    states = [
+        ("First line\nSecond line", 22),
+        ("First line\nSecond lines", 23),      # Typed at the end
+        ("First line\nSecond lines", 5),       # Cursor moved up
+        ("First\nSecond lines", 5),            # Deleted in line 1
+        ("word " * 9 + "wrap", 49),
+        ("word " * 9 + "wrapped", 52),         # Word wraps to a new row
+        ("", 0),                               # Everything deleted
+    ]
+    renderer, frame = make_renderer()
+    for i, (text, cursor) in enumerate(states):
+        renderer.render(*layout(text, cursor))
+        if bytes(frame.buf) != fresh_frame(text, cursor):
+            return False, f"State {i} differs from a fresh render"
+    if frame.fills != 1:
+        return False, f"{frame.fills} full clears"
+
+    return True, f"{len(states)} states, 1 full clear"
+
+def test_changed_rows():
+    """Test only the rows with new text or cursor are redrawn"""
+    renderer, _ = make_renderer()
+    if renderer.render(*layout("One\nTwo\nThree", 13)) is not None:
+        return False, "First render not a full redraw"
+
+    rows = renderer.render(*layout("One\nTwo\nThrees", 14))
+    if rows != [5 + 2 * CHAR_HEIGHT]:
+        return False, f"Typing redrew rows {rows}"
+    rows = renderer.render(*layout("One\nTwo\nThrees", 0))
+    if rows != [5, 5 + 2 * CHAR_HEIGHT]:
+        return False, f"Cursor move redrew rows {rows}"
+    if renderer.render(*layout("One\nTwo\nThrees", 0)) != []:
+        return False, "Unchanged render redrew rows"
+
+    return True, "1 row per keystroke, 2 per cursor jump"
+
+def test_forget():
+    """Test forget() makes the next render start from a blank frame"""
+    renderer, frame = make_renderer()
+    renderer.render(*layout("Status over text", 3))
+    frame.fill_rect(0, 5, WIDTH, CHAR_HEIGHT, 0)  # Something drew over it
+    renderer.forget()
+    if renderer.render(*layout("Status over text", 3)) is not None:
+        return False, "Partial redraw after forget()"
+    if bytes(frame.buf) != fresh_frame("Status over text", 3):
+        return False, "Frame not restored"
+
+    return True, "Full redraw after forget()"
+
+def _window_bytes(rect):
+    """Bytes a windowed partial refresh sends for a rectangle"""
+    x, y, w, h = rect
+    return ((x + w + 7) // 8 - x // 8) * h
+
+def test_region_typing():
+    """Test typing at the end of a line changes a few cells only"""
+    renderer, _ = make_renderer()
+    text = "First line\nSecond line of a short note"
+    rows = renderer.render(*layout(text, len(text)))
+    if renderer.region(rows, HEIGHT) != (0, 0, WIDTH, HEIGHT):
+        return False, "First render is not the whole frame"
+
+    text += "s"
+    rect = renderer.region(renderer.render(*layout(text, len(text))), HEIGHT)
+    if rect is None or rect[1] != 5 + CHAR_HEIGHT or rect[3] != CHAR_HEIGHT:
+        return False, f"Changed rectangle {rect}"
+    sent = _window_bytes(rect)
+    if sent > 100:
+        return False, f"{sent} bytes for one character"
+    if rect[0] % 8:
+        return False, f"Rectangle starts mid-byte at x={rect[0]}"
+
+    if renderer.region(renderer.render(*layout(text, len(text))), HEIGHT) is not None:
+        return False, "Unchanged render reported changed"
+    renderer.forget()
+    rows = renderer.render(*layout(text, len(text)))
+    if renderer.region(rows, HEIGHT) != (0, 0, WIDTH, HEIGHT):
+        return False, "Forgotten frame is not the whole frame"
+
+    return True, f"{sent} of {WIDTH * HEIGHT // 8} bytes sent"
+
+def test_region_reflow():
+    """Test a word wrapping to the next row changes both rows"""
+    renderer, _ = make_renderer()
+    text = "word " * 9 + "wrap"  # 49 characters, last word ends the line
+    renderer.render(*layout(text, len(text)))
+
+    text += "ped"
+    rect = renderer.region(renderer.render(*layout(text, len(text))), HEIGHT)
+    top, bottom = rect[1], rect[1] + rect[3]
+    if top != 5 or bottom != 5 + 2 * CHAR_HEIGHT:
+        return False, f"Rows {top}-{bottom}"
+    if (rect[0] > ALIGNED_MARGIN_LEFT
+            or rect[0] + rect[2] < ALIGNED_MARGIN_LEFT + 49 * CHAR_WIDTH):
+        return False, f"Columns {rect[0]}-{rect[0] + rect[2]}"
+
+    return True, f"Rows {top}-{bottom} resent"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all row renderer tests"""
+    print_header()
+
+    print("═ RowRenderer Tests ═")
+    print_test("Edit sequence matches fresh renders")
+    passed, details = test_edit_sequence()
+    print_result(passed, details)
+
+    print_test("Changed rows only")
+    passed, details = test_changed_rows()
+    print_result(passed, details)
+
+    print_test("Forget")
+    passed, details = test_forget()
+    print_result(passed, details)
+
+    print_test("Region for typing")
+    passed, details = test_region_typing()
+    print_result(passed, details)
+
+    print_test("Region for a word wrap")
+    passed, details = test_region_reflow()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
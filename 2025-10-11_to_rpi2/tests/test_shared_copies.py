@@ -0,0 +1,130 @@
+# test_shared_copies.py - Shared Module Copy Tests
+# Checks the modules copied next to each entry point (root-level
+# main_optimized.py, rpi2/main.py) are byte-identical to their
+# single_pico2w/ originals, so a fix to one copy can't be left out of another
+# Desktop Python only (compares files across the project tree)
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+_here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+ROOT = _here + '/..'
+SOURCE = 'single_pico2w'
+
+# Module -> folders holding a copy of single_pico2w/<module> ('' is the
+# project root, next to main_optimized.py)
+SHARED = {
+    'text_buffer.py': [''],
+    'page_store.py': [''],
+    'epd_mode.py': [''],
+    'refresh_scheduler.py': [''],
+    'row_renderer.py': [''],
+    'panel_image.py': ['', 'rpi2'],
+    'tca8418.py': [''],
+}
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  SHARED MODULE COPY TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+def read(folder, name):
+    """Bytes of a project file, None if it doesn't exist"""
+    path = ROOT + '/' + folder + '/' + name if folder else ROOT + '/' + name
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+#───────────────────────────────────────────────#
+# ─────────── Copy Tests ───────────────────────#
+#───────────────────────────────────────────────#
+
+def test_copies_identical():
+    """Test every copy matches its single_pico2w original"""
+    checked = 0
+    for name, folders in SHARED.items():
+        source = read(SOURCE, name)
+        if source is None:
+            return False, f"{SOURCE}/{name} missing"
+        for folder in folders:
+            where = (folder + '/' if folder else '') + name
+            copy = read(folder, name)
+            if copy is None:
+                return False, f"{where} missing"
+            if copy != source:
+                return False, f"{where} differs from {SOURCE}/{name} - copy it over"
+            checked += 1
+
+    return True, f"{checked} copies of {len(SHARED)} modules"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all shared copy tests"""
+    print_header()
+
+    print("═ Shared Copy Tests ═")
+    print_test("Copies identical")
+    passed, details = test_copies_identical()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
@@ -0,0 +1,208 @@
+# test_status_bar.py - Status Bar Unit Tests
+# Tests the status line/footer strip main_threaded.py composites over the
+# published frame, so messages refresh only the bottom text row
+# Can run on Pico (with status_bar.py and frame_buffers.py copied
+# alongside) or desktop Python (drawing with a stand-in image - framebuf
+# isn't available there)
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the modules sit next to this file; on desktop they live in
+# the single_pico2w/ sibling directory
+try:
+    from status_bar import StatusBar
+    from frame_buffers import FrameBuffers
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from status_bar import StatusBar
+    from frame_buffers import FrameBuffers
+
+WIDTH = 400
+HEIGHT = 300
+STRIDE = WIDTH // 8
+ROW = 15           # CHAR_HEIGHT
+STRIP_Y = HEIGHT - ROW
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  STATUS BAR UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+class StripImage:
+    """fill()/text() of a FrameBuffer over the strip, recording the text"""
+    def __init__(self, buf):
+        self.buf = buf
+        self.texts = []
+
+    def fill(self, c):
+        self.texts = []
+        for i in range(len(self.buf)):
+            self.buf[i] = 0xFF if c else 0x00
+
+    def text(self, s, x, y, c):
+        # One black byte per label, at its column, to tell labels apart
+        self.texts.append((s, x))
+        self.buf[y * STRIDE + x // 8] = 0x00
+
+def make_bar():
+    bar = StatusBar(WIDTH, STRIP_Y, ROW, 8, 8)
+    bar.image = StripImage(bar.buffer)
+    return bar
+
+def text_frame():
+    """A frame with 'text' in every row, bottom row included"""
+    return bytearray(b'\x55' * (STRIDE * HEIGHT))
+
+#───────────────────────────────────────────────#
+# ─────────── StatusBar Tests ──────────────────#
+#───────────────────────────────────────────────#
+
+def test_composite_strip_only():
+    """Test compositing covers the strip rows and nothing else"""
+    bar = make_bar()
+    frame = text_frame()
+    bar.composite(frame)
+    if frame != text_frame():
+        return False, "Empty strip composited"
+
+    bar.show_message("Saved")
+    bar.composite(frame)
+    start = STRIP_Y * STRIDE
+    if frame[:start] != text_frame()[:start]:
+        return False, "Text area written"
+    if frame[start:] != bar.buffer:
+        return False, "Strip rows differ from the strip"
+    if bar.region != (0, STRIP_Y, WIDTH, ROW):
+        return False, f"Region {bar.region}"
+
+    return True, f"{len(bar.buffer)} bytes at row {STRIP_Y}"
+
+def test_message_over_footer():
+    """Test a message replaces the footer until it expires"""
+    bar = make_bar()
+    if not bar.set_footer("[Page View]", "1/3"):
+        return False, "Footer not drawn"
+    if bar.set_footer("[Page View]", "1/3"):
+        return False, "Same footer redrawn"
+    if bar.image.texts != [("[Page View]", 8), ("1/3", WIDTH - 3 * 8 - 10)]:
+        return False, f"Footer drawn as {bar.image.texts}"
+
+    bar.show_message("Already at last page")
+    if bar.set_footer("[Page View]", "2/3"):
+        return False, "Footer drawn over the message"
+    if bar.image.texts != [("Already at last page", 8)]:
+        return False, f"Message drawn as {bar.image.texts}"
+    if not bar.expire() or bar.image.texts[1] != ("2/3", WIDTH - 3 * 8 - 10):
+        return False, f"Footer not back: {bar.image.texts}"
+    if bar.expire():
+        return False, "Expired twice"
+
+    bar.set_footer(None)
+    if bar.visible():
+        return False, "Visible with no footer"
+
+    return True, "Footer, message, footer again"
+
+def test_publish_keeps_text():
+    """Test the text is under the strip again once the message expires"""
+    back = text_frame()
+    frames = FrameBuffers(back)
+    bar = make_bar()
+    frames.overlay = bar
+
+    bar.show_message("Saved")
+    frames.publish()
+    start = STRIP_Y * STRIDE
+    if frames.front[start:] != bar.buffer:
+        return False, "Message not in the front frame"
+    if back != text_frame():
+        return False, "Message drawn into the back frame"
+
+    bar.expire()
+    frames.publish()
+    if frames.front != back:
+        return False, "Text not back under the strip"
+
+    return True, "Back frame untouched, text restored"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all status bar tests"""
+    print_header()
+
+    print("═ StatusBar Tests ═")
+    print_test("Composite strip only")
+    passed, details = test_composite_strip_only()
+    print_result(passed, details)
+
+    print_test("Message over footer")
+    passed, details = test_message_over_footer()
+    print_result(passed, details)
+
+    print_test("Publish keeps text")
+    passed, details = test_publish_keeps_text()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
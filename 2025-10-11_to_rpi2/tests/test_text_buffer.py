@@ -0,0 +1,429 @@
+# test_text_buffer.py - Editor Text Store Unit Tests
+# Tests the GapBuffer (main_optimized.py) and the PieceTable with undo/redo
+# used by single_pico2w/main_threaded.py
+# Can run on Pico (with text_buffer.py copied alongside) or desktop Python
+
+import sys
+
+#───────────────────────────────────────────────#
+# ─────────── Test Configuration ───────────────#
+#───────────────────────────────────────────────#
+
+# On the Pico the module sits next to this file; on desktop it lives in
+# the single_pico2w/ sibling directory
+try:
+    from text_buffer import GapBuffer, PieceTable
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from text_buffer import GapBuffer, PieceTable
+
+# Test state
+tests_passed = 0
+tests_failed = 0
+
+#───────────────────────────────────────────────#
+# ─────────── Test Helper Functions ────────────#
+#───────────────────────────────────────────────#
+
+def print_header():
+    """Print test suite header"""
+    print("\n" + "="*55)
+    print("  TEXT BUFFER UNIT TEST SUITE")
+    print("="*55 + "\n")
+
+def print_test(name):
+    """Print test start message"""
+    print(f"Testing: {name}...", end=' ')
+
+def print_result(passed, details=""):
+    """Print test result"""
+    global tests_passed, tests_failed
+
+    if passed:
+        tests_passed += 1
+        print("✓ PASS")
+    else:
+        tests_failed += 1
+        print("✗ FAIL")
+
+    if details:
+        print(f"  {details}")
+
+def print_summary():
+    """Print test summary"""
+    total = tests_passed + tests_failed
+    print("\n" + "="*55)
+    print(f"  RESULTS: {tests_passed}/{total} PASSED")
+    if tests_failed > 0:
+        print(f"  FAILED: {tests_failed} tests")
+    print("="*55 + "\n")
+
+#───────────────────────────────────────────────#
+# ─────────── GapBuffer Tests ──────────────────#
+#───────────────────────────────────────────────#
+
+def test_gap_insert_at_end():
+    """Test typing characters at the end of the buffer"""
+    buf = GapBuffer(capacity=4)
+    cursor = 0
+    for ch in "Hello World":
+        cursor = buf.insert(cursor, ch)
+
+    if buf.text() == "Hello World" and cursor == 11 and len(buf) == 11:
+        return True, "Typed text grows buffer past initial capacity"
+    else:
+        return False, f"Got '{buf.text()}', cursor={cursor}"
+
+def test_gap_insert_middle():
+    """Test inserting in the middle moves the gap"""
+    buf = GapBuffer("Helo")
+    cursor = buf.insert(3, 'l')
+    cursor = buf.insert(len(buf), '!')
+
+    if buf.text() == "Hello!" and cursor == 6:
+        return True, "Mid-text insert then append"
+    else:
+        return False, f"Got '{buf.text()}', cursor={cursor}"
+
+def test_gap_backspace():
+    """Test backspace at cursor"""
+    buf = GapBuffer("Hello")
+    cursor = buf.backspace(5)
+    cursor = buf.backspace(cursor)
+
+    if buf.text() == "Hel" and cursor == 3:
+        return True, "Two backspaces remove two characters"
+    else:
+        return False, f"Got '{buf.text()}', cursor={cursor}"
+
+def test_gap_backspace_at_start():
+    """Test backspace at position 0 is a no-op"""
+    buf = GapBuffer("Hi")
+    cursor = buf.backspace(0)
+
+    if buf.text() == "Hi" and cursor == 0:
+        return True, "Backspace at start ignored"
+    else:
+        return False, f"Got '{buf.text()}', cursor={cursor}"
+
+def test_gap_backspace_multibyte():
+    """Test backspace removes a whole UTF-8 character"""
+    buf = GapBuffer("café")
+    cursor = buf.backspace(len(buf))
+
+    if buf.text() == "caf" and cursor == 3:
+        return True, "Multi-byte character removed in one step"
+    else:
+        return False, f"Got '{buf.text()}', cursor={cursor}"
+
+def test_gap_delete_word():
+    """Test Alt+Backspace word deletion"""
+    buf = GapBuffer("one two   ")
+    cursor = len(buf)
+    start = buf.word_start(cursor)
+    buf.delete(start, cursor)
+
+    if buf.text() == "one " and start == 4:
+        return True, "Trailing spaces and word deleted"
+    else:
+        return False, f"Got '{buf.text()}', start={start}"
+
+def test_gap_delete_word_newline():
+    """Test word deletion stops at newline"""
+    buf = GapBuffer("line\nword")
+    cursor = len(buf)
+    start = buf.word_start(cursor)
+    buf.delete(start, cursor)
+
+    if buf.text() == "line\n":
+        return True, "Deletion stops after newline"
+    else:
+        return False, f"Got {buf.text()!r}"
+
+def test_gap_view_zero_copy():
+    """Test view() shares memory with the backing store"""
+    buf = GapBuffer("abc")
+    view = buf.view()
+
+    if isinstance(view, memoryview) and bytes(view) == b"abc" and bytes(buf.view(1, 2)) == b"b":
+        return True, "memoryview slices of logical text"
+    else:
+        return False, f"Got {bytes(view)!r}"
+
+def test_gap_text_keeps_gap():
+    """Test text() reads around the gap instead of moving it"""
+    buf = GapBuffer("caf\u00e9 au lait")
+    cursor = buf.insert(6, "\u00e0 ")   # Typing in the middle
+    gap = buf._gap_start
+    full = buf.text()
+    parts = (buf.text(0, 3), buf.text(3, cursor), buf.text(cursor))
+    if buf._gap_start != gap:
+        return False, "Gap moved by text()"
+    if full != "caf\u00e9 \u00e0 au lait" or "".join(parts) != full:
+        return False, f"Got {full!r}, {parts!r}"
+
+    class Sink:
+        data = b""
+        def write(self, b):
+            self.data += bytes(b)
+            return len(b)
+    sink = Sink()
+    if buf.write_to(sink) != len(buf) or sink.data != full.encode('utf-8'):
+        return False, f"Wrote {sink.data!r}"
+    if buf._gap_start != gap:
+        return False, "Gap moved by write_to()"
+
+    return True, "Both sides decoded, gap left at the cursor"
+
+def test_gap_load_and_clear():
+    """Test load() replaces contents and clear() empties"""
+    buf = GapBuffer("old text")
+    buf.load("new")
+    loaded = buf.text()
+    buf.clear()
+
+    if loaded == "new" and len(buf) == 0 and buf.text() == "":
+        return True, "load/clear behave like list clear+extend"
+    else:
+        return False, f"Got '{loaded}', len after clear={len(buf)}"
+
+def test_gap_matches_list_model():
+    """Test a mixed edit sequence against a list-of-chars model"""
+    buf = GapBuffer(capacity=8)
+    model = []
+    cursor = 0
+    # '<' is backspace, '^' jumps the cursor back to offset 2
+    ops = "ab cd\nef<gh<< ij^xy<<<<<klm"
+    for op in ops:
+        if op == '<':
+            if cursor > 0:
+                model.pop(cursor - 1)
+            cursor = buf.backspace(cursor)
+        elif op == '^':
+            cursor = 2
+        else:
+            model.insert(cursor, op)
+            cursor = buf.insert(cursor, op)
+
+    if buf.text() == ''.join(model):
+        return True, f"Final text {buf.text()!r}"
+    else:
+        return False, f"Expected {''.join(model)!r}, got {buf.text()!r}"
+
+#───────────────────────────────────────────────#
+# ─────────── PieceTable Tests ─────────────────#
+#───────────────────────────────────────────────#
+
+def test_piece_typing_coalesces():
+    """Test typing at the cursor grows one piece instead of adding many"""
+    pt = PieceTable("Hello")
+    cursor = len(pt)
+    for ch in ", world":
+        cursor = pt.insert(cursor, ch)
+
+    if pt.text() == "Hello, world" and len(pt.snapshot()) == 2:
+        return True, "Original piece + one add piece"
+    else:
+        return False, f"Got {pt.text()!r} in {len(pt.snapshot())} pieces"
+
+def test_piece_undo_redo_words():
+    """Test undo steps back one word at a time and redo restores it"""
+    pt = PieceTable()
+    cursor = 0
+    for ch in "one two three":
+        cursor = pt.insert(cursor, ch)
+
+    steps = []
+    cursor = pt.undo()
+    steps.append((pt.text(), cursor))
+    cursor = pt.undo()
+    steps.append((pt.text(), cursor))
+    cursor = pt.redo()
+    steps.append((pt.text(), cursor))
+
+    expected = [("one two ", 8), ("one ", 4), ("one two ", 8)]
+    if steps == expected:
+        return True, "Word-sized undo groups"
+    else:
+        return False, f"Got {steps}"
+
+def test_piece_undo_backspace_run():
+    """Test a run of backspaces undoes in one step"""
+    pt = PieceTable("abcdef")
+    cursor = len(pt)
+    for _ in range(3):
+        cursor = pt.backspace(cursor)
+    after_delete = pt.text()
+    cursor = pt.undo()
+
+    if after_delete == "abc" and pt.text() == "abcdef" and cursor == 6:
+        return True, "Three backspaces restored together"
+    else:
+        return False, f"Got {after_delete!r} then {pt.text()!r}, cursor={cursor}"
+
+def test_piece_undo_history_bounded():
+    """Test the undo history keeps a bounded number of records"""
+    import text_buffer
+    pt = PieceTable("x" * 1000)
+    cursor = len(pt)
+    for _ in range(1000):
+        cursor = pt.backspace(cursor)
+        pt.close_group()
+        cursor = pt.insert(cursor, "y")
+        pt.close_group()
+
+    if pt._records <= text_buffer.UNDO_LIMIT and pt.can_undo():
+        return True, f"{pt._records} records kept"
+    else:
+        return False, f"{pt._records} records kept"
+
+def test_piece_snapshot_stable():
+    """Test a snapshot is unaffected by later edits"""
+    try:
+        from io import BytesIO
+    except ImportError:
+        from uio import BytesIO
+
+    pt = PieceTable("draft")
+    cursor = pt.insert(len(pt), " one")
+    snap = pt.snapshot()
+    cursor = pt.insert(cursor, " two")
+    pt.delete(0, 3)
+
+    f = BytesIO()
+    PieceTable.write_snapshot(f, snap)
+    if f.getvalue() == b"draft one" and pt.text() == "ft one two":
+        return True, "Snapshot written after further edits"
+    else:
+        return False, f"Got {f.getvalue()!r}"
+
+def test_piece_matches_gap_buffer():
+    """Test a mixed edit sequence gives the same text as GapBuffer"""
+    pt = PieceTable("start\n")
+    buf = GapBuffer("start\n")
+    pt_cursor = buf_cursor = len(buf)
+    # '<' is backspace, '^' jumps the cursor back to offset 2, '~' deletes a word
+    for op in "ab cd\nef<gh<< ij^xy<<<<<klm~ no pq~~":
+        if op == '<':
+            pt_cursor = pt.backspace(pt_cursor)
+            buf_cursor = buf.backspace(buf_cursor)
+        elif op == '^':
+            pt_cursor = buf_cursor = 2
+            pt.close_group()
+        elif op == '~':
+            pt_cursor = pt.delete_word(pt_cursor)
+            start = buf.word_start(buf_cursor)
+            buf.delete(start, buf_cursor)
+            buf_cursor = start
+        else:
+            pt_cursor = pt.insert(pt_cursor, op)
+            buf_cursor = buf.insert(buf_cursor, op)
+
+    if pt.text() == buf.text() and pt_cursor == buf_cursor:
+        # Undo everything back to the loaded text
+        while pt.undo() is not None:
+            pass
+        if pt.text() == "start\n":
+            return True, f"Final text {buf.text()!r}, fully undoable"
+        return False, f"Undo all left {pt.text()!r}"
+    else:
+        return False, f"Expected {buf.text()!r}, got {pt.text()!r}"
+
+#───────────────────────────────────────────────#
+# ─────────── Main Test Runner ─────────────────#
+#───────────────────────────────────────────────#
+
+def run_all_tests():
+    """Run all text buffer tests"""
+    print_header()
+
+    print("═ GapBuffer Tests ═")
+    print_test("Insert at end")
+    passed, details = test_gap_insert_at_end()
+    print_result(passed, details)
+
+    print_test("Insert in middle")
+    passed, details = test_gap_insert_middle()
+    print_result(passed, details)
+
+    print_test("Backspace")
+    passed, details = test_gap_backspace()
+    print_result(passed, details)
+
+    print_test("Backspace at start")
+    passed, details = test_gap_backspace_at_start()
+    print_result(passed, details)
+
+    print_test("Backspace multi-byte")
+    passed, details = test_gap_backspace_multibyte()
+    print_result(passed, details)
+
+    print_test("Delete word")
+    passed, details = test_gap_delete_word()
+    print_result(passed, details)
+
+    print_test("Delete word at newline")
+    passed, details = test_gap_delete_word_newline()
+    print_result(passed, details)
+
+    print_test("Zero-copy view")
+    passed, details = test_gap_view_zero_copy()
+    print_result(passed, details)
+
+    print_test("Text around the gap")
+    passed, details = test_gap_text_keeps_gap()
+    print_result(passed, details)
+
+    print_test("Load and clear")
+    passed, details = test_gap_load_and_clear()
+    print_result(passed, details)
+
+    print_test("Matches list model")
+    passed, details = test_gap_matches_list_model()
+    print_result(passed, details)
+
+    print("\n═ PieceTable Tests ═")
+    print_test("Typing coalesces pieces")
+    passed, details = test_piece_typing_coalesces()
+    print_result(passed, details)
+
+    print_test("Undo/redo by word")
+    passed, details = test_piece_undo_redo_words()
+    print_result(passed, details)
+
+    print_test("Undo backspace run")
+    passed, details = test_piece_undo_backspace_run()
+    print_result(passed, details)
+
+    print_test("Bounded undo history")
+    passed, details = test_piece_undo_history_bounded()
+    print_result(passed, details)
+
+    print_test("Snapshot stable after edits")
+    passed, details = test_piece_snapshot_stable()
+    print_result(passed, details)
+
+    print_test("Matches GapBuffer")
+    passed, details = test_piece_matches_gap_buffer()
+    print_result(passed, details)
+
+    # Print summary
+    print_summary()
+
+#───────────────────────────────────────────────#
+# ─────────── Entry Point ──────────────────────#
+#───────────────────────────────────────────────#
+
+if __name__ == "__main__":
+    try:
+        run_all_tests()
+    except KeyboardInterrupt:
+        print("\n\n⚠ Tests interrupted by user\n")
+    except Exception as e:
+        print(f"\n\n✗ Fatal error: {e}\n")
+        try:
+            import sys
+            sys.print_exception(e)
+        except:
+            print(str(e))
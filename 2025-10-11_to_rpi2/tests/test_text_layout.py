@@ -3,6 +3,8 @@
 # Can run on Pico or desktop Python
 # Tests shared logic used by both Master and Slave Picos
 
+import sys
+
 #───────────────────────────────────────────────#
 # ─────────── Test Configuration ───────────────#
 #───────────────────────────────────────────────#
@@ -15,6 +17,16 @@ MARGIN_TOP   = 5
 DISPLAY_WIDTH  = 400
 DISPLAY_HEIGHT = 300
 
+# LayoutEngine is checked against the reference TextLayout below. On the
+# Pico editor_base.py sits next to this file; on desktop it lives in the
+# single_pico2w/ sibling directory
+try:
+    from editor_base import LayoutEngine, PageViewCache
+except ImportError:
+    _here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.append(_here + '/../single_pico2w')
+    from editor_base import LayoutEngine, PageViewCache
+
 # Test state
 tests_passed = 0
 tests_failed = 0
@@ -452,6 +464,193 @@ def test_cursor_on_second_page():
     else:
         return False, f"Expected page 1, got page {page}"
 
+#───────────────────────────────────────────────#
+# ─────────── Incremental Layout Tests ─────────#
+#───────────────────────────────────────────────#
+
+def check_engine(engine, text, max_width, max_height):
+    """Compare LayoutEngine output with the reference TextLayout"""
+    engine.update(text)
+    if engine.lines() != TextLayout.calculate_lines(text, max_width):
+        return False
+    return engine.screen_pages() == TextLayout.get_screen_pages(text, max_width, max_height)
+
+def test_engine_typing():
+    """Test typing at the end re-wraps only the last line"""
+    engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    text = ""
+    for ch in "The quick brown fox jumps over the lazy dog. " * 20:
+        engine.edit(len(text), 0, 1)
+        text += ch
+        if not check_engine(engine, text, DISPLAY_WIDTH, DISPLAY_HEIGHT):
+            return False, f"Layout differs at length {len(text)}"
+
+    if engine.lines_wrapped <= 2:
+        return True, f"{engine.line_count()} lines, last update wrapped {engine.lines_wrapped}"
+    else:
+        return False, f"Last update wrapped {engine.lines_wrapped} lines"
+
+def test_engine_insert_reflows():
+    """Test an insert near the top reflows following lines correctly"""
+    engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    text = "word " * 300 + "\nend"
+    engine.update(text)
+
+    # Push a word onto the next line, then pull it back with a delete
+    engine.edit(3, 0, 4)
+    text = text[:3] + "XXXX" + text[3:]
+    inserted_ok = check_engine(engine, text, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    engine.edit(3, 4, 0)
+    text = text[:3] + text[7:]
+    deleted_ok = check_engine(engine, text, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+    if inserted_ok and deleted_ok:
+        return True, f"Reflow matches over {engine.page_count()} pages"
+    else:
+        return False, f"insert ok={inserted_ok}, delete ok={deleted_ok}"
+
+def test_engine_long_word_and_newlines():
+    """Test edits around hard-broken words and blank lines"""
+    width = 60  # 6 characters per line
+    engine = LayoutEngine(width, 50)
+    text = "ab\n\nxxxxxxxxxxxxxx cd\n\n\n"
+    engine.update(text)
+
+    edits = [(4, 0, "y"), (0, 2, ""), (len("\n\nyxxx"), 0, " "), (1, 0, "zz zz\n")]
+    for pos, removed, inserted in edits:
+        engine.edit(pos, removed, len(inserted))
+        text = text[:pos] + inserted + text[pos + removed:]
+        if not check_engine(engine, text, width, 50):
+            return False, f"Layout differs for {text!r}"
+
+    return True, "Hard breaks, blank lines and trailing newlines match"
+
+def test_engine_batched_edits():
+    """Test several edits recorded between two updates"""
+    engine = LayoutEngine(100, 60)
+    text = "alpha beta gamma delta epsilon zeta eta theta"
+    engine.update(text)
+
+    # Burst of typing and backspaces before the refresh pause expires
+    for pos, removed, inserted in [(6, 0, "new "), (30, 3, ""), (2, 0, "\n"), (len(text) - 3, 0, "zz")]:
+        engine.edit(pos, removed, len(inserted))
+        text = text[:pos] + inserted + text[pos + removed:]
+
+    if check_engine(engine, text, 100, 60):
+        return True, f"{engine.line_count()} lines after batched edits"
+    else:
+        return False, f"Layout differs for {text!r}"
+
+def test_engine_cursor_matches_prefix_layout():
+    """Test line-table cursor lookup against wrapping text[:cursor]"""
+    engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    text = "Hi " + "A" * 60 + " there " * 30 + "\n\nend"
+    engine.update(text)
+
+    # At the end of each word the prefix layout and the line table agree
+    for cursor in range(len(text) + 1):
+        if cursor < len(text) and text[cursor] not in ' \n':
+            continue
+        if text[cursor - 1:cursor] == '\n':
+            continue
+        expected = TextLayout.get_cursor_screen_pos(text, cursor, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+        got = engine.cursor_position(cursor)
+        if got != expected:
+            return False, f"cursor={cursor}: expected {expected}, got {got}"
+
+    return True, f"{engine.line_count()} lines checked"
+
+def test_engine_cursor_after_newline():
+    """Test cursor after a newline lands on the next line"""
+    engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    engine.update("Hello\n")
+    x, y, page = engine.cursor_position(6)
+
+    expected_y = MARGIN_TOP + CHAR_HEIGHT
+    if x == MARGIN_LEFT and y == expected_y and page == 0:
+        return True, "Cursor at start of the empty last line"
+    else:
+        return False, f"Expected ({MARGIN_LEFT}, {expected_y}, 0), got ({x}, {y}, {page})"
+
+def test_engine_page_lines():
+    """Test whole-line spans draw the same glyphs as per-character tuples"""
+    engine = LayoutEngine(DISPLAY_WIDTH, 100)
+    text = "Lorem ipsum dolor sit amet, " * 12 + "\n\n" + "B" * 70
+    engine.update(text)
+    pages = TextLayout.get_screen_pages(text, DISPLAY_WIDTH, 100)
+
+    for page_num in range(len(pages)):
+        expanded = []
+        for x, y, line in engine.page_lines(page_num):
+            for ch in line:
+                expanded.append((x, y, ch))
+                x += CHAR_WIDTH
+        if expanded != pages[page_num]:
+            return False, f"Page {page_num} differs"
+
+    span_bytes = engine.starts.itemsize * len(engine.starts) * 2
+    return True, f"{len(pages)} pages, spans use {span_bytes} bytes"
+
+def test_engine_visible_page_only():
+    """Test laying out only through the requested screen page"""
+    lines_per_page = (DISPLAY_HEIGHT - MARGIN_TOP) // CHAR_HEIGHT
+    text = ("word " * 40 + "\n") * 200  # Long note, ~1000 wrapped lines
+    pages = TextLayout.get_screen_pages(text, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+    engine = LayoutEngine(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    engine.update(text, 1)
+    wrapped = engine.lines_wrapped
+    if wrapped > 2 * lines_per_page:
+        return False, f"Wrapped {wrapped} lines for 2 screens"
+    if engine.page(1) != pages[1] or not engine.has_page(2):
+        return False, "Visible subpage differs from full layout"
+
+    # Subpage count finishes the layout once, then comes from the line count
+    if engine.page_count() != len(pages) or engine.page(len(pages) - 1) != pages[-1]:
+        return False, f"Expected {len(pages)} pages, got {engine.page_count()}"
+    engine.update(text, 0)
+    if engine.lines_wrapped != 0:
+        return False, "Unchanged text was wrapped again"
+
+    return True, f"{wrapped} of {engine.line_count()} lines wrapped for page 2"
+
+def test_page_view_cache():
+    """Test page view reuses page layouts until a page is saved"""
+    from page_store import PageStore
+    path = "_test_page_view.txt"
+    with open(path, "w") as f:
+        f.write("first page\n---\n" + "word " * 400 + "\n---\nlast")
+
+    try:
+        store = PageStore(path)
+        cache = PageViewCache(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+        # PgDn/PgUp back and forth over every page twice
+        for _ in range(2):
+            pages = cache.pages(store)
+            for i in range(len(pages)):
+                layout = cache.layout(i, pages[i])
+                layout.has_page(1)
+        if cache.layouts_built != 3:
+            return False, f"{cache.layouts_built} layouts built"
+        expected = TextLayout.get_screen_pages("word " * 400, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+        if cache.layout(1, cache.pages(store)[1]).screen_pages() != expected:
+            return False, "Cached layout differs from full layout"
+
+        # A saved page is a new layout; the others are kept
+        store.write_page(0, "edited")
+        pages = cache.pages(store)
+        cache.layout(0, pages[0])
+        cache.layout(2, pages[2])
+        if cache.layouts_built != 4:
+            return False, f"{cache.layouts_built} layouts after saving a page"
+        store.compact()
+    finally:
+        import os
+        os.remove(path)
+        PageStore.discard_sidecars(path)
+
+    return True, "3 layouts for 2 passes over 3 pages"
+
 #───────────────────────────────────────────────#
 # ─────────── Main Test Runner ─────────────────#
 #───────────────────────────────────────────────#
@@ -558,6 +757,44 @@ def run_all_tests():
     passed, details = test_cursor_on_second_page()
     print_result(passed, details)
 
+    # Incremental Layout Tests
+    print("\n═ Incremental Layout (LayoutEngine) ═")
+    print_test("Typing at end")
+    passed, details = test_engine_typing()
+    print_result(passed, details)
+
+    print_test("Insert reflows following lines")
+    passed, details = test_engine_insert_reflows()
+    print_result(passed, details)
+
+    print_test("Long words and blank lines")
+    passed, details = test_engine_long_word_and_newlines()
+    print_result(passed, details)
+
+    print_test("Batched edits")
+    passed, details = test_engine_batched_edits()
+    print_result(passed, details)
+
+    print_test("Page lines from spans")
+    passed, details = test_engine_page_lines()
+    print_result(passed, details)
+
+    print_test("Visible subpage only")
+    passed, details = test_engine_visible_page_only()
+    print_result(passed, details)
+
+    print_test("Cursor from line table")
+    passed, details = test_engine_cursor_matches_prefix_layout()
+    print_result(passed, details)
+
+    print_test("Cursor after newline (line table)")
+    passed, details = test_engine_cursor_after_newline()
+    print_result(passed, details)
+
+    print_test("Page view cache")
+    passed, details = test_page_view_cache()
+    print_result(passed, details)
+
     # Print summary
     print_summary()
 
@@ -98,6 +98,26 @@ def test_render_text_command():
 
     return True, "RENDER_TEXT command structure valid"
 
+def test_render_text_cursor_index_command():
+    """Test RENDER_TEXT with a cursor_index for the Slave to locate"""
+    cmd = {
+        "cmd": "RENDER_TEXT",
+        "text": "Hello World",
+        "cursor_index": 11
+    }
+
+    decoded = json.loads(json.dumps(cmd))
+    if "cursor_x" in decoded or "cursor_y" in decoded:
+        return False, "cursor coordinates should be left to the Slave"
+
+    if not isinstance(decoded["cursor_index"], int):
+        return False, "cursor_index must be an integer"
+
+    if not 0 <= decoded["cursor_index"] <= len(decoded["text"]):
+        return False, "cursor_index out of range"
+
+    return True, "RENDER_TEXT with cursor_index valid"
+
 def test_show_screensaver_command():
     """Test SHOW_SCREENSAVER command structure"""
     cmd = {"cmd": "SHOW_SCREENSAVER"}
@@ -469,6 +489,10 @@ def run_all_tests():
     passed, details = test_render_text_command()
     print_result(passed, details)
 
+    print_test("RENDER_TEXT with cursor_index")
+    passed, details = test_render_text_cursor_index_command()
+    print_result(passed, details)
+
     print_test("SHOW_SCREENSAVER command")
     passed, details = test_show_screensaver_command()
     print_result(passed, details)
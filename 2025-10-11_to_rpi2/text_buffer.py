@@ -0,0 +1,702 @@
+"""
+text_buffer.py - Gap-buffer text store for the editor
+Replaces the list-of-chars text_buffer used by the editor loops
+For Raspberry Pi Pico 2W e-ink typewriter
+
+The document is held as UTF-8 bytes in a single bytearray with a movable
+"gap" of free space at the cursor. Typing at the cursor writes into the gap
+and backspace widens it, so both are O(1) and allocate nothing until the
+gap is exhausted. Offsets used by this class are byte offsets; keyboard
+input is ASCII so they match character offsets for typed text.
+"""
+
+SPACE = 0x20
+NEWLINE = 0x0A
+
+
+class GapBuffer:
+    """
+    Editable text store backed by a bytearray with a gap at the cursor
+
+    Layout of the backing store:
+
+        [ text before gap | ...gap... | text after gap ]
+        0                 gap_start   gap_end          capacity
+    """
+
+    def __init__(self, text="", capacity=512):
+        """
+        Create a buffer, optionally preloaded with text
+
+        Args:
+            text: Initial contents (str)
+            capacity: Initial size of the backing bytearray in bytes
+        """
+        self._buf = bytearray(capacity)
+        self._gap_start = 0
+        self._gap_end = capacity
+        if text:
+            self.load(text)
+
+    # -------------------------------------------------------------------------
+    # Size and gap management
+    # -------------------------------------------------------------------------
+
+    def __len__(self):
+        """Logical text length in bytes (gap excluded)"""
+        return len(self._buf) - (self._gap_end - self._gap_start)
+
+    def _move_gap(self, pos):
+        """
+        Move the gap so that it starts at logical offset pos
+
+        Cost is proportional to the distance moved, which is zero while
+        the user keeps typing at the cursor.
+        """
+        gs = self._gap_start
+        ge = self._gap_end
+        if pos == gs:
+            return
+        buf = self._buf
+        if pos < gs:
+            # Shift text[pos:gs] to just before gap_end
+            n = gs - pos
+            buf[ge - n:ge] = buf[pos:gs]
+            self._gap_start = pos
+            self._gap_end = ge - n
+        else:
+            # Shift text after the gap down to close it up to pos
+            n = pos - gs
+            buf[gs:gs + n] = buf[ge:ge + n]
+            self._gap_start = gs + n
+            self._gap_end = ge + n
+
+    def _ensure_gap(self, needed):
+        """Grow the backing store so the gap holds at least needed bytes"""
+        gap = self._gap_end - self._gap_start
+        if gap >= needed:
+            return
+        old = self._buf
+        size = len(old)
+        new_size = size * 2 if size else 64
+        while new_size - (size - gap) < needed:
+            new_size *= 2
+        new = bytearray(new_size)
+        tail = size - self._gap_end
+        new[:self._gap_start] = memoryview(old)[:self._gap_start]
+        new[new_size - tail:] = memoryview(old)[self._gap_end:]
+        self._buf = new
+        self._gap_end = new_size - tail
+
+    def _compact(self):
+        """Move the gap to the end so the text is one contiguous run"""
+        self._move_gap(len(self))
+
+    # -------------------------------------------------------------------------
+    # Editing
+    # -------------------------------------------------------------------------
+
+    def insert(self, index, text):
+        """
+        Insert text at a logical offset
+
+        Args:
+            index: Byte offset to insert at (usually the cursor)
+            text: String to insert (normally a single typed character)
+
+        Returns:
+            Offset just after the inserted text (the new cursor position)
+        """
+        if len(text) == 1 and ord(text) < 0x80:
+            # Fast path for typed ASCII - no temporary bytes object
+            self._move_gap(index)
+            self._ensure_gap(1)
+            self._buf[self._gap_start] = ord(text)
+            self._gap_start += 1
+            return self._gap_start
+
+        data = text.encode('utf-8')
+        n = len(data)
+        self._move_gap(index)
+        self._ensure_gap(n)
+        gs = self._gap_start
+        self._buf[gs:gs + n] = data
+        self._gap_start = gs + n
+        return self._gap_start
+
+    def delete(self, start, end):
+        """
+        Delete the text in [start, end)
+
+        O(1) when end is at the current gap (deleting back from the cursor).
+
+        Args:
+            start: First byte offset to delete
+            end: Byte offset just past the deleted range
+        """
+        if end <= start:
+            return
+        self._move_gap(end)
+        self._gap_start = start
+
+    def backspace(self, index):
+        """
+        Delete the character before index
+
+        Removes a whole UTF-8 sequence when the previous character is
+        multi-byte, so loaded files with non-ASCII text stay valid.
+
+        Args:
+            index: Cursor offset
+
+        Returns:
+            New cursor offset
+        """
+        if index <= 0:
+            return 0
+        start = index - 1
+        while start > 0 and (self.byte_at(start) & 0xC0) == 0x80:
+            start -= 1
+        self.delete(start, index)
+        return start
+
+    def word_start(self, index):
+        """
+        Find where Alt+Backspace should delete back to
+
+        Skips trailing spaces before index, then the word itself, stopping
+        after the previous space or newline.
+
+        Args:
+            index: Cursor offset
+
+        Returns:
+            Offset of the start of the word before index
+        """
+        i = index - 1
+        while i >= 0 and self.byte_at(i) == SPACE:
+            i -= 1
+        while i >= 0:
+            b = self.byte_at(i)
+            if b == SPACE or b == NEWLINE:
+                break
+            i -= 1
+        return i + 1
+
+    def clear(self):
+        """Remove all text, keeping the allocated capacity"""
+        self._gap_start = 0
+        self._gap_end = len(self._buf)
+
+    def load(self, text):
+        """
+        Replace the whole contents with text
+
+        Args:
+            text: New contents (str)
+        """
+        data = text.encode('utf-8')
+        n = len(data)
+        self.clear()
+        self._ensure_gap(n + 64)
+        self._buf[:n] = data
+        self._gap_start = n
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def byte_at(self, index):
+        """Return the byte value at a logical offset"""
+        if index >= self._gap_start:
+            index += self._gap_end - self._gap_start
+        return self._buf[index]
+
+    def view(self, start=0, end=None):
+        """
+        Zero-copy view of the text in [start, end)
+
+        Moves the gap to the end first, which costs a memmove of the text
+        after the cursor - only for callers that need one contiguous run
+        (text() and write_to() read around the gap instead). The view is
+        only valid until the next edit.
+
+        Args:
+            start: First byte offset
+            end: End byte offset (default: end of text)
+
+        Returns:
+            memoryview into the backing bytearray
+        """
+        self._compact()
+        if end is None:
+            end = self._gap_start
+        return memoryview(self._buf)[start:end]
+
+    def _runs(self, start, end):
+        """
+        The text in [start, end) as up to two views, before and after the gap
+
+        The gap is left where it is, so the next insert at the cursor
+        doesn't have to move it back.
+        """
+        if end is None:
+            end = len(self)
+        gs = self._gap_start
+        shift = self._gap_end - gs
+        mv = memoryview(self._buf)
+        if end <= gs:
+            return (mv[start:end],)
+        if start >= gs:
+            return (mv[start + shift:end + shift],)
+        return (mv[start:gs], mv[self._gap_end:end + shift])
+
+    def text(self, start=0, end=None):
+        """
+        Decode [start, end) to a str
+
+        This is the single copy handed to the layout engine per refresh,
+        replacing ''.join() over a list of one-character strings. Edits
+        keep the gap on a character boundary, so each side decodes alone.
+        """
+        runs = self._runs(start, end)
+        if len(runs) == 1:
+            return str(runs[0], 'utf-8')
+        return str(runs[0], 'utf-8') + str(runs[1], 'utf-8')
+
+    def write_to(self, f):
+        """
+        Write the whole text to an open binary file without copying
+
+        Args:
+            f: File object opened in binary mode
+
+        Returns:
+            Number of bytes written
+        """
+        written = 0
+        for run in self._runs(0, None):
+            written += f.write(run)
+        return written
+
+
+# Size of each add-buffer chunk. Chunks are never resized or rewritten, so
+# pieces (and snapshots of them) stay valid while typing continues.
+ADD_CHUNK = 256
+
+# Maximum number of piece records kept in the undo history
+UNDO_LIMIT = 200
+
+
+class PieceTable:
+    """
+    Editable text store with undo/redo, built from pieces of two buffers
+
+    The text loaded from disk lives in an immutable original buffer and
+    typed text is appended to an add buffer; neither is ever modified in
+    place. The document is a list of pieces (buf, start, end) naming slices
+    of those buffers, and each edit just swaps a few pieces. Undo history
+    stores the swapped piece tuples, never text, so it stays small and
+    bounded. Offsets are byte offsets, as in GapBuffer, and the editing
+    methods take and return the same values so either can back the editor.
+
+    History record: [index, old_pieces, new_pieces, cursor_before, cursor_after]
+    meaning pieces[index:index + len(old)] was replaced by new_pieces.
+    """
+
+    def __init__(self, text=""):
+        """
+        Create a piece table, optionally preloaded with text
+
+        Args:
+            text: Initial contents (str)
+        """
+        self.load(text)
+
+    # -------------------------------------------------------------------------
+    # Buffers and pieces
+    # -------------------------------------------------------------------------
+
+    def __len__(self):
+        """Logical text length in bytes"""
+        return self._length
+
+    def _append(self, data):
+        """
+        Append bytes to the add buffer
+
+        Returns:
+            Piece (chunk, start, end) covering the appended bytes
+        """
+        n = len(data)
+        used = self._chunk_used
+        if used + n > len(self._chunk):
+            self._chunk = bytearray(max(ADD_CHUNK, n))
+            used = 0
+        self._chunk[used:used + n] = data
+        self._chunk_used = used + n
+        return (self._chunk, used, used + n)
+
+    def _can_extend(self, piece, n):
+        """Whether piece ends at the add-buffer tail with room for n bytes"""
+        return (piece[0] is self._chunk and piece[2] == self._chunk_used and
+                self._chunk_used + n <= len(self._chunk))
+
+    def _locate(self, pos):
+        """
+        Find the piece containing byte offset pos
+
+        Returns:
+            (index, offset) - offset into pieces[index], or
+            (len(pieces), 0) when pos is at the end of the text
+        """
+        for i, (_, start, end) in enumerate(self._pieces):
+            size = end - start
+            if pos < size:
+                return i, pos
+            pos -= size
+        return len(self._pieces), 0
+
+    def _replace(self, index, old, new):
+        """Replace pieces[index:index + len(old)] with new"""
+        self._pieces[index:index + len(old)] = new
+        for _, start, end in old:
+            self._length -= end - start
+        for _, start, end in new:
+            self._length += end - start
+
+    # -------------------------------------------------------------------------
+    # History
+    # -------------------------------------------------------------------------
+
+    def _record(self, kind, index, old, new, cursor_before, cursor_after):
+        """
+        Apply an edit and add it to the undo history
+
+        Consecutive edits of the same kind at the cursor join one undo
+        group; when the edit only changes the last piece of the previous
+        record (typing at the cursor, backspacing it away) that record is
+        amended instead of adding another.
+        """
+        self._replace(index, old, new)
+        self._redo = []
+
+        group = self._undo[-1] if self._group_open and self._undo else None
+        if group is not None and (self._group_kind != kind or
+                                  group[-1][4] != cursor_before):
+            group = None
+
+        if group is None:
+            self._undo.append([[index, old, new, cursor_before, cursor_after]])
+            self._records += 1
+        else:
+            last = group[-1]
+            if (len(old) == 1 and last[2] and
+                    index == last[0] + len(last[2]) - 1 and old[0] is last[2][-1]):
+                last[2] = last[2][:-1] + new
+                last[4] = cursor_after
+            else:
+                group.append([index, old, new, cursor_before, cursor_after])
+                self._records += 1
+
+        self._group_open = True
+        self._group_kind = kind
+
+        # Keep history bounded by dropping the oldest groups
+        while self._records > UNDO_LIMIT and len(self._undo) > 1:
+            self._records -= len(self._undo.pop(0))
+
+    def close_group(self):
+        """End the current undo group (e.g. after the cursor moves)"""
+        self._group_open = False
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """
+        Revert the last undo group
+
+        Returns:
+            Cursor offset before the reverted edits, or None if nothing to undo
+        """
+        self._group_open = False
+        if not self._undo:
+            return None
+        group = self._undo.pop()
+        self._records -= len(group)
+        for index, old, new, _, _ in reversed(group):
+            self._replace(index, new, old)
+        self._redo.append(group)
+        return group[0][3]
+
+    def redo(self):
+        """
+        Re-apply the last undone group
+
+        Returns:
+            Cursor offset after the edits, or None if nothing to redo
+        """
+        self._group_open = False
+        if not self._redo:
+            return None
+        group = self._redo.pop()
+        for index, old, new, _, _ in group:
+            self._replace(index, old, new)
+        self._undo.append(group)
+        self._records += len(group)
+        return group[-1][4]
+
+    # -------------------------------------------------------------------------
+    # Editing
+    # -------------------------------------------------------------------------
+
+    def insert(self, index, text):
+        """
+        Insert text at a logical offset
+
+        Args:
+            index: Byte offset to insert at (usually the cursor)
+            text: String to insert (normally a single typed character)
+
+        Returns:
+            Offset just after the inserted text (the new cursor position)
+        """
+        data = text.encode('utf-8')
+        n = len(data)
+        if not n:
+            return index
+        i, off = self._locate(index)
+        pieces = self._pieces
+
+        if off == 0 and i > 0 and self._can_extend(pieces[i - 1], n):
+            # Typing at the end of the last typed piece - grow it in place
+            buf, start, end = pieces[i - 1]
+            self._append(data)
+            self._record('insert', i - 1, (pieces[i - 1],), ((buf, start, end + n),),
+                         index, index + n)
+        elif off == 0:
+            self._record('insert', i, (), (self._append(data),), index, index + n)
+        else:
+            buf, start, end = pieces[i]
+            new = ((buf, start, start + off), self._append(data), (buf, start + off, end))
+            self._record('insert', i, (pieces[i],), new, index, index + n)
+
+        # A typed space or newline closes the word for undo
+        if data[-1] == SPACE or data[-1] == NEWLINE:
+            self._group_open = False
+        return index + n
+
+    def delete(self, start, end):
+        """
+        Delete the text in [start, end)
+
+        Args:
+            start: First byte offset to delete
+            end: Byte offset just past the deleted range
+        """
+        if end > self._length:
+            end = self._length
+        if end <= start:
+            return
+        i, off_i = self._locate(start)
+        j, off_j = self._locate(end)
+        pieces = self._pieces
+
+        new = ()
+        if off_i:
+            buf, s, _ = pieces[i]
+            new = ((buf, s, s + off_i),)
+        last = j
+        if off_j:
+            buf, s, e = pieces[j]
+            new += ((buf, s + off_j, e),)
+            last = j + 1
+        self._record('delete', i, tuple(pieces[i:last]), new, end, start)
+
+    def backspace(self, index):
+        """
+        Delete the character before index
+
+        Removes a whole UTF-8 sequence when the previous character is
+        multi-byte, so loaded files with non-ASCII text stay valid.
+
+        Args:
+            index: Cursor offset
+
+        Returns:
+            New cursor offset
+        """
+        if index <= 0:
+            return 0
+        start = index - 1
+        while start > 0 and (self.byte_at(start) & 0xC0) == 0x80:
+            start -= 1
+        self.delete(start, index)
+        return start
+
+    def word_start(self, index):
+        """
+        Find where Alt+Backspace should delete back to
+
+        Skips trailing spaces before index, then the word itself, stopping
+        after the previous space or newline.
+
+        Args:
+            index: Cursor offset
+
+        Returns:
+            Offset of the start of the word before index
+        """
+        i = index
+        in_word = False
+        for b in self._bytes_before(index):
+            if b == SPACE and not in_word:
+                i -= 1
+                continue
+            if b == SPACE or b == NEWLINE:
+                break
+            in_word = True
+            i -= 1
+        return i
+
+    def delete_word(self, index):
+        """
+        Delete the word before index as its own undo step
+
+        Returns:
+            New cursor offset
+        """
+        start = self.word_start(index)
+        self._group_open = False
+        self.delete(start, index)
+        self._group_open = False
+        return start
+
+    def clear(self):
+        """Remove all text and history"""
+        self.load("")
+
+    def load(self, text):
+        """
+        Replace the whole contents with text (becomes the original buffer)
+
+        History is reset; earlier snapshots stay valid because no buffer
+        they reference is modified.
+
+        Args:
+            text: New contents (str)
+        """
+        data = text.encode('utf-8')
+        self._original = data
+        self._chunk = bytearray(ADD_CHUNK)
+        self._chunk_used = 0
+        self._pieces = [(data, 0, len(data))] if data else []
+        self._length = len(data)
+        self._undo = []
+        self._redo = []
+        self._records = 0
+        self._group_open = False
+        self._group_kind = None
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def _bytes_before(self, index):
+        """Yield byte values walking backwards from index - 1"""
+        i, off = self._locate(index)
+        pieces = self._pieces
+        if off:
+            buf, start, _ = pieces[i]
+            for k in range(start + off - 1, start - 1, -1):
+                yield buf[k]
+        for p in range(i - 1, -1, -1):
+            buf, start, end = pieces[p]
+            for k in range(end - 1, start - 1, -1):
+                yield buf[k]
+
+    def byte_at(self, index):
+        """Return the byte value at a logical offset"""
+        i, off = self._locate(index)
+        buf, start, _ = self._pieces[i]
+        return buf[start + off]
+
+    def snapshot(self):
+        """
+        Capture the current document without copying its text
+
+        The result is an immutable tuple of pieces that stays valid after
+        further edits, so another thread can write it out at leisure.
+        """
+        return tuple(self._pieces)
+
+    def text(self, start=0, end=None):
+        """
+        Decode [start, end) to a str
+
+        Pieces are copied once into a single bytearray and decoded.
+        """
+        if end is None or end > self._length:
+            end = self._length
+        if end <= start:
+            return ""
+        out = bytearray(end - start)
+        pos = 0
+        skip = start
+        for buf, s, e in self._pieces:
+            size = e - s
+            if skip >= size:
+                skip -= size
+                continue
+            s += skip
+            skip = 0
+            take = min(e - s, len(out) - pos)
+            out[pos:pos + take] = memoryview(buf)[s:s + take]
+            pos += take
+            if pos >= len(out):
+                break
+        return str(out, 'utf-8')
+
+    def write_to(self, f):
+        """
+        Write the whole text to an open binary file without copying
+
+        Args:
+            f: File object opened in binary mode
+
+        Returns:
+            Number of bytes written
+        """
+        return PieceTable.write_snapshot(f, self._pieces)
+
+    @staticmethod
+    def snapshot_text(pieces):
+        """Decode a snapshot() to a str"""
+        out = bytearray(sum(end - start for _, start, end in pieces))
+        pos = 0
+        for buf, start, end in pieces:
+            out[pos:pos + end - start] = memoryview(buf)[start:end]
+            pos += end - start
+        return str(out, 'utf-8')
+
+    @staticmethod
+    def write_snapshot(f, pieces):
+        """
+        Write a snapshot() to an open binary file, one piece at a time
+
+        Args:
+            f: File object opened in binary mode
+            pieces: Result of snapshot()
+
+        Returns:
+            Number of bytes written
+        """
+        written = 0
+        for buf, start, end in pieces:
+            f.write(memoryview(buf)[start:end])
+            written += end - start
+        return written